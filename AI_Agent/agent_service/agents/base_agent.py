@@ -6,11 +6,22 @@ from abc import ABC, abstractmethod
 from vertexai.preview.generative_models import GenerativeModel, Part, Content
 from google.api_core.exceptions import GoogleAPIError, InvalidArgument, ResourceExhausted # Added specific exceptions
 import vertexai # Import vertexai for initialization
+from config import (
+    GEMINI_LIMITER_INITIAL,
+    GEMINI_LIMITER_MIN,
+    GEMINI_LIMITER_MAX,
+    GEMINI_LIMITER_SPIKE_FACTOR,
+    GEMINI_LIMITER_OVERLOAD_RETRIES
+)
+from gemini_limiter import AIMDLimiter
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Shared by every agent: all Gemini calls in this process go through one adaptive limit
+gemini_limiter = AIMDLimiter(GEMINI_LIMITER_INITIAL, GEMINI_LIMITER_MIN, GEMINI_LIMITER_MAX, latency_spike_factor=GEMINI_LIMITER_SPIKE_FACTOR)
+
 class BaseAgent(ABC):
     """
     Base class for all specialized AI agents.
@@ -44,12 +55,14 @@ class BaseAgent(ABC):
     async def _call_gemini(self, prompt: str) -> str:
         """
         Makes an asynchronous call to the Gemini API using GenerativeModel.
-        Returns the raw text response from the model.
+        Returns the raw text response from the model. Queued while the shared
+        concurrency limit is reached; requeued on ResourceExhausted.
         """
         try:
             # Use the higher-level generate_content method
             # It directly accepts a string prompt or a list of Content/Part objects
-            response = await self.model.generate_content_async(prompt)
+            response = await gemini_limiter.call(lambda: self.model.generate_content_async(prompt),
+                                                 overload_retries=GEMINI_LIMITER_OVERLOAD_RETRIES)
             
             # Access the text from the response
             if response.candidates:
@@ -0,0 +1,105 @@
+# codec.py
+import json
+import threading
+from datetime import date, datetime
+
+# Message attribute naming the payload encoding, e.g. "json", "msgpack" or "msgpack+zstd".
+# Messages without it are plain UTF-8 JSON (older publishers and the Node services).
+CODEC_ATTRIBUTE = 'codec'
+CODECS = ('json', 'msgpack')
+
+_ZSTD_MAGIC = b'\x28\xb5\x2f\xfd'
+_local = threading.local()  # zstd (de)compressors are not thread-safe; one pair per thread
+
+
+class MessageDecodeError(ValueError):
+    """A payload decode_message() cannot decode; redelivering it would fail the same way."""
+
+
+def _default(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not serializable")
+
+
+def _compressor(level):
+    compressor = getattr(_local, 'compressor', None)
+    if compressor is None or _local.level != level:
+        import zstandard
+        compressor = _local.compressor = zstandard.ZstdCompressor(level=level)
+        _local.level = level
+    return compressor
+
+
+def _decompressor():
+    decompressor = getattr(_local, 'decompressor', None)
+    if decompressor is None:
+        import zstandard
+        decompressor = _local.decompressor = zstandard.ZstdDecompressor()
+    return decompressor
+
+
+class MessageCodec:
+    """
+    Encodes Pub/Sub payloads as compact JSON or msgpack, zstd-compressing those of at
+    least `compress_threshold` bytes (0 disables compression). encode() returns the
+    bytes plus the message attributes that tell decode_message() how to read them.
+
+    msgpack and zstandard are only imported when configured, so a JSON-only service
+    does not need them. Only enable msgpack or compression on topics whose every
+    subscriber decodes with decode_message(); the Node services read plain JSON.
+    """
+
+    def __init__(self, codec='json', compress_threshold=0, compression_level=3):
+        if codec not in CODECS:
+            raise ValueError(f"Unknown message codec '{codec}'; use one of {CODECS}")
+        self.codec = codec
+        self.compress_threshold = compress_threshold
+        self.compression_level = compression_level
+        # Fail at startup rather than on the first message when a dependency is missing
+        if codec == 'msgpack':
+            import msgpack  # noqa: F401
+        if compress_threshold:
+            import zstandard  # noqa: F401
+
+    def encode(self, obj):
+        if self.codec == 'msgpack':
+            import msgpack
+            data = msgpack.packb(obj, use_bin_type=True, default=_default)
+        else:
+            data = json.dumps(obj, separators=(',', ':'), default=_default).encode('utf-8')
+        codec = self.codec
+        if self.compress_threshold and len(data) >= self.compress_threshold:
+            data = _compressor(self.compression_level).compress(data)
+            codec += '+zstd'
+        return data, {CODEC_ATTRIBUTE: codec}
+
+
+def decode_message(data, attributes=None):
+    """
+    Decodes a payload made by MessageCodec.encode() according to its codec attribute;
+    without one it is treated as plain JSON. Raises MessageDecodeError (a ValueError)
+    for undecodable payloads.
+    """
+    codec = (attributes or {}).get(CODEC_ATTRIBUTE) or 'json'
+    if codec.endswith('+zstd'):
+        if not data.startswith(_ZSTD_MAGIC):
+            raise MessageDecodeError("Message is marked zstd-compressed but is not a zstd frame")
+        import zstandard
+        try:
+            data = _decompressor().decompress(data)
+        except zstandard.ZstdError as e:
+            raise MessageDecodeError(f"Corrupt zstd message: {e}") from e
+        codec = codec[:-len('+zstd')]
+    if codec == 'msgpack':
+        import msgpack
+        try:
+            return msgpack.unpackb(data, raw=False)
+        except ValueError as e:  # msgpack's unpack errors are ValueErrors
+            raise MessageDecodeError(f"Corrupt msgpack message: {e!r}") from e
+    if codec != 'json':
+        raise MessageDecodeError(f"Unknown message codec '{codec}'")
+    try:
+        return json.loads(data)
+    except ValueError as e:  # json.JSONDecodeError, or UnicodeDecodeError for non-UTF-8 bytes
+        raise MessageDecodeError(f"Invalid JSON message: {e}") from e
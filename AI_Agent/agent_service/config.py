@@ -11,5 +11,21 @@ PROCESSED_EVENTS_TOPIC_NAME = os.environ.get('PROCESSED_EVENTS_TOPIC_NAME', 'pro
 # Output topic for this AI Agent service
 ANALYTICS_SUGGESTIONS_TOPIC_NAME = os.environ.get('ANALYTICS_SUGGESTIONS_TOPIC_NAME', 'analytics-and-suggestions')
 
+# Encoding of published messages (see codec.py): 'json' (compact) or 'msgpack', zstd-compressed
+# from PUBSUB_COMPRESS_THRESHOLD_BYTES up (0 = never). Firestore_Writer_Function reads plain JSON,
+# so keep the defaults for analytics-and-suggestions until it decodes the codec attribute.
+PUBSUB_MESSAGE_CODEC = os.environ.get('PUBSUB_MESSAGE_CODEC', 'json')
+PUBSUB_COMPRESS_THRESHOLD_BYTES = int(os.environ.get('PUBSUB_COMPRESS_THRESHOLD_BYTES', '0'))
+
 # Gemini Model Configuration
-GEMINI_MODEL_NAME = os.environ.get('GEMINI_MODEL_NAME', 'gemini-pro')
\ No newline at end of file
+GEMINI_MODEL_NAME = os.environ.get('GEMINI_MODEL_NAME', 'gemini-pro')
+
+# Adaptive (AIMD) limit on concurrent Gemini calls across all agents in this process: raised
+# additively while calls succeed, halved on ResourceExhausted or latency spikes
+# (GEMINI_LIMITER_SPIKE_FACTOR times the average latency). Calls over the limit queue;
+# ResourceExhausted calls are requeued up to GEMINI_LIMITER_OVERLOAD_RETRIES times.
+GEMINI_LIMITER_INITIAL = int(os.environ.get('GEMINI_LIMITER_INITIAL', '8'))
+GEMINI_LIMITER_MIN = int(os.environ.get('GEMINI_LIMITER_MIN', '1'))
+GEMINI_LIMITER_MAX = int(os.environ.get('GEMINI_LIMITER_MAX', '64'))
+GEMINI_LIMITER_SPIKE_FACTOR = float(os.environ.get('GEMINI_LIMITER_SPIKE_FACTOR', '3.0'))
+GEMINI_LIMITER_OVERLOAD_RETRIES = int(os.environ.get('GEMINI_LIMITER_OVERLOAD_RETRIES', '2'))
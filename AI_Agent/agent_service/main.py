@@ -1,7 +1,8 @@
 # main.py
 import asyncio
+import base64
 import os
-import json
+from datetime import datetime, timezone
 from flask import Flask, request, jsonify
 from dotenv import load_dotenv
 from google.cloud import pubsub_v1
@@ -9,7 +10,10 @@ from google.cloud import firestore
 from agents.incident_analyzer_agent import IncidentAnalyzerAgent
 from agents.mood_analyzer_agent import MoodAnalyzerAgent
 from agents.crime_analyzer_agent import CrimeAnalyzerAgent
+from agents.base_agent import gemini_limiter
 from config import GCP_PROJECT_ID, PROCESSED_EVENTS_TOPIC_NAME, ANALYTICS_SUGGESTIONS_TOPIC_NAME, GCP_LOCATION, GEMINI_MODEL_NAME
+from config import PUBSUB_MESSAGE_CODEC, PUBSUB_COMPRESS_THRESHOLD_BYTES
+from codec import MessageCodec, decode_message
 import vertexai
 from wsgi2asgi import WSGI2ASGI # <--- ADD THIS IMPORT
 
@@ -23,6 +27,9 @@ app = Flask(__name__)
 publisher = pubsub_v1.PublisherClient()
 db = firestore.Client(project=GCP_PROJECT_ID)
 
+# Encoder for the published insights (compact JSON unless configured otherwise)
+message_codec = MessageCodec(PUBSUB_MESSAGE_CODEC, PUBSUB_COMPRESS_THRESHOLD_BYTES)
+
 # Initialize Vertex AI
 vertexai.init(project=GCP_PROJECT_ID, location=GCP_LOCATION)
 
@@ -53,9 +60,8 @@ async def index():
         return ('Bad Request: no data in Pub/Sub message', 400)
 
     try:
-        # Decode the base64 encoded data
-        data = base64.b64decode(pubsub_message['data']).decode('utf-8')
-        incident_data = json.loads(data)
+        # Decode the base64 encoded data; the codec attribute says how (plain JSON without one)
+        incident_data = decode_message(base64.b64decode(pubsub_message['data']), pubsub_message.get('attributes'))
         print(f"Received incident for processing: {incident_data}")
 
         # Extract incident description
@@ -83,7 +89,7 @@ async def index():
             "location": incident_location,
             "mediaUrls": incident_data.get('mediaUrls', []),
             "ingestedAt": incident_data.get('ingestedAt'),
-            "aiProcessedAt": firestore.SERVER_TIMESTAMP, # Use server timestamp for consistency
+            "aiProcessedAt": datetime.now(timezone.utc).isoformat(), # SERVER_TIMESTAMP is a Firestore sentinel and cannot be serialized into a message
             "status": "AI_Analyzed",
             "incidentAnalysis": incident_insights,
             "moodAnalysis": mood_insights,
@@ -92,7 +98,8 @@ async def index():
 
         # Publish consolidated insights to analytics-and-suggestions topic
         topic_path = publisher.topic_path(GCP_PROJECT_ID, ANALYTICS_SUGGESTIONS_TOPIC_NAME)
-        future = publisher.publish(topic_path, json.dumps(consolidated_insights).encode('utf-8'))
+        message_data, codec_attributes = message_codec.encode(consolidated_insights)
+        future = publisher.publish(topic_path, message_data, **codec_attributes)
         message_id = future.result()
         print(f"Published consolidated insights with ID: {message_id}")
 
@@ -104,6 +111,11 @@ async def index():
         traceback.print_exc() # Print full traceback to logs
         return (f'Error: {e}', 500)
 
+@app.route('/limiter/stats', methods=['GET'])
+def limiter_stats():
+    """Current Gemini concurrency limit, calls in flight, queue depth and queue wait times."""
+    return jsonify(gemini_limiter.stats())
+
 # Wrap the Flask app with WSGI2ASGI to make it compatible with Uvicorn
 asgi_app = WSGI2ASGI(app) # <--- ADD THIS LINE
 
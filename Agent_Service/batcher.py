@@ -0,0 +1,88 @@
+# batcher.py
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class MicroBatcher:
+    """
+    Gathers items submitted by concurrent requests for up to `max_wait_seconds` or
+    `max_batch_size` items, whichever comes first, and resolves them with one
+    `call_batch(items)` (a coroutine returning one result per item, in order).
+
+    A batch of one item goes to `call_one(item)` directly. If call_batch raises ValueError
+    (a response that could not be parsed), each item of that batch is retried with
+    call_one; any other exception is raised to every waiting request, and cancelling the
+    batch call cancels them.
+    """
+
+    def __init__(self, call_batch, call_one, max_batch_size=10, max_wait_seconds=0.02):
+        self.call_batch = call_batch
+        self.call_one = call_one
+        self.max_batch_size = max_batch_size
+        self.max_wait_seconds = max_wait_seconds
+        self._pending = []  # (item, future) waiting for the next flush
+        self._timer = None
+        self._tasks = set()
+        self.items = self.batches = self.batch_calls = self.fallbacks = 0
+
+    async def submit(self, item):
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((item, future))
+        self.items += 1
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_wait_seconds, self._flush)
+        return await future
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if batch:
+            task = asyncio.get_running_loop().create_task(self._run(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch):
+        self.batches += 1
+        items = [item for item, _ in batch]
+        results = None
+        try:
+            if len(items) == 1:
+                results = [await self.call_one(items[0])]
+            else:
+                try:
+                    self.batch_calls += 1
+                    results = await self.call_batch(items)
+                except ValueError as e:
+                    self.fallbacks += 1
+                    logger.warning(f"Batch of {len(items)} could not be parsed, retrying per item: {e}")
+                    results = await asyncio.gather(*(self.call_one(item) for item in items), return_exceptions=True)
+        except Exception as e:
+            results = [e] * len(items)
+        finally:
+            if results is None:  # cancelled (e.g. at shutdown): don't leave the waiting requests hanging
+                for _, future in batch:
+                    future.cancel()
+
+        for (_, future), result in zip(batch, results):
+            if future.done():  # the waiting request was cancelled
+                continue
+            if isinstance(result, BaseException):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+    def stats(self):
+        return {
+            "items": self.items,
+            "batches": self.batches,
+            "batch_calls": self.batch_calls,
+            "parse_fallbacks": self.fallbacks,
+            "mean_batch_size": round(self.items / self.batches, 2) if self.batches else None,
+        }
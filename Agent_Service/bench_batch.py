@@ -0,0 +1,90 @@
+# bench_batch.py
+# Throughput of the push handler with and without Gemini micro-batching, against a fake model
+# (no cloud calls) that allows QUOTA calls in flight; each call takes LATENCY seconds plus
+# PER_ITEM seconds for every complaint in it. A share of batch responses is malformed to
+# exercise the per-item fallback.
+# Usage: python bench_batch.py [num_messages] [concurrency] [quota] [malformed_share]
+import asyncio
+import base64
+import json
+import os
+import random
+import sys
+import time
+
+import httpx
+
+os.environ['LLM_CACHE_ENABLED'] = 'false'  # every complaint is distinct anyway
+import main  # noqa: E402
+from bench_load import FakePublisher, FakeResponse  # noqa: E402
+
+LATENCY = 0.5
+PER_ITEM = 0.05
+
+
+class FakeQuotaModel:
+    def __init__(self, quota, malformed_share):
+        self.slots = asyncio.Semaphore(quota)
+        self.malformed_share = malformed_share
+        self.calls = 0
+
+    async def generate_content_async(self, prompt):
+        self.calls += 1
+        _, marker, complaints = prompt.rpartition("Complaints: ")
+        items = json.loads(complaints) if marker else None
+        async with self.slots:
+            await asyncio.sleep(LATENCY + PER_ITEM * (len(items) if items else 1))
+        if items is None:
+            return FakeResponse("Pothole reported on the main road.")
+        if random.random() < self.malformed_share:
+            return FakeResponse("Sure! Here are the summaries: [")
+        return FakeResponse(json.dumps([{"id": item["id"], "valid": True, "summary": item["description"][:40]} for item in items]))
+
+
+def make_envelope(index):
+    incident = {"id": f"report-{index}", "type": "Road Hazard", "firestoreDocId": f"doc{index}",
+                "description": f"There is a huge pothole on street number {index} near the park entrance."}
+    data = base64.b64encode(json.dumps(incident).encode('utf-8')).decode('ascii')
+    return {"message": {"data": data, "messageId": str(index)}, "subscription": "bench"}
+
+
+async def measure(batching, num_messages, concurrency, quota, malformed_share):
+    main.GEMINI_BATCH_ENABLED = batching
+    main._summary_batcher = None
+    model = FakeQuotaModel(quota, malformed_share)
+    main._cached_gemini_model = model
+    main._publisher = FakePublisher()
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=main.app), base_url='http://agent') as client:
+        async def one(index):
+            async with semaphore:
+                started = time.perf_counter()
+                response = await client.post('/', json=make_envelope(index))
+                assert response.text.startswith('OK - Message Processed and AI'), response.text
+                return time.perf_counter() - started
+
+        start = time.perf_counter()
+        latencies = sorted(await asyncio.gather(*(one(index) for index in range(num_messages))))
+        elapsed = time.perf_counter() - start
+
+    label = "batched" if batching else "per-item"
+    print(f"{label:9} {num_messages / elapsed:7.1f} msg/s  Gemini calls: {model.calls:5}  "
+          f"p50 {latencies[len(latencies) // 2] * 1000:6.0f} ms  p99 {latencies[int(len(latencies) * 0.99)] * 1000:6.0f} ms")
+    if batching:
+        print(f"          {main._summary_batcher.stats()}")
+
+
+async def run(num_messages, concurrency, quota, malformed_share):
+    print(f"messages: {num_messages}, in flight: {concurrency}, model calls in flight: {quota}, "
+          f"malformed batch responses: {malformed_share:.0%}, batch: {main.GEMINI_BATCH_MAX_SIZE} items / {main.GEMINI_BATCH_MAX_WAIT_MS:.0f} ms")
+    await measure(False, num_messages, concurrency, quota, malformed_share)
+    await measure(True, num_messages, concurrency, quota, malformed_share)
+
+
+if __name__ == '__main__':
+    import logging
+    logging.disable(logging.WARNING)
+    args = sys.argv[1:]
+    asyncio.run(run(int(args[0]) if args else 1000, int(args[1]) if len(args) > 1 else 200,
+                    int(args[2]) if len(args) > 2 else 20, float(args[3]) if len(args) > 3 else 0.05))
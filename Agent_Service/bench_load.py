@@ -0,0 +1,130 @@
+# bench_load.py
+# Load test of the push handler against a fake Gemini model and a fake publisher (no cloud
+# calls): N push envelopes are posted with C in flight, every Gemini call takes LATENCY seconds.
+#
+# - "threaded (before)": the old request path. Flask behind uvicorn's WSGIMiddleware runs each
+#   request on its pool of 10 threads, and each request starts a ThreadPoolExecutor for the
+#   blocking generate_content call and another for the publish.
+# - "asyncio (after)": the current app, driven in-process through httpx's ASGI transport.
+# Usage: python bench_load.py [num_messages] [concurrency] [gemini_latency_seconds]
+import asyncio
+import base64
+import concurrent.futures
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import httpx
+
+# Every envelope carries the same complaint; measure the request path, not the summary cache.
+# The fake model answers single-complaint prompts only (see bench_batch.py for batching).
+os.environ['LLM_CACHE_ENABLED'] = 'false'
+os.environ['GEMINI_BATCH_ENABLED'] = 'false'
+# The fake model has no quota to adapt to; keep the concurrency limiter out of the way
+os.environ['GEMINI_LIMITER_INITIAL'] = os.environ['GEMINI_LIMITER_MAX'] = '100000'
+import main  # noqa: E402
+
+WSGI_MIDDLEWARE_THREADS = 10  # uvicorn.middleware.wsgi.WSGIMiddleware's default worker count
+
+
+class FakeResponse:
+    def __init__(self, text):
+        self.text = text
+        self.candidates = [text]
+
+
+class FakeGeminiModel:
+    def __init__(self, latency):
+        self.latency = latency
+        self.calls = 0
+
+    async def generate_content_async(self, prompt):
+        self.calls += 1
+        await asyncio.sleep(self.latency)
+        return FakeResponse("Large pothole on the main road causing traffic delays.")
+
+    def generate_content(self, prompt):
+        self.calls += 1
+        time.sleep(self.latency)
+        return FakeResponse("Large pothole on the main road causing traffic delays.")
+
+
+class FakePublisher:
+    def __init__(self):
+        self.published = 0
+
+    def topic_path(self, project, topic):
+        return f"projects/{project}/topics/{topic}"
+
+    def publish(self, topic, data, **attributes):
+        self.published += 1
+        future = concurrent.futures.Future()
+        future.set_result(str(self.published))
+        return future
+
+
+def make_envelope(index):
+    incident = {"id": f"report-{index}", "type": "Road Hazard", "firestoreDocId": f"doc{index}",
+                "description": "There's a huge pothole on Main Street near the central park entrance."}
+    data = base64.b64encode(json.dumps(incident).encode('utf-8')).decode('ascii')
+    return {"message": {"data": data, "messageId": str(index), "publishTime": "2025-10-01T10:00:00Z"}, "subscription": "bench"}
+
+
+def legacy_handle(envelope, model, publisher):
+    """The old handler's blocking steps, as each WSGI worker thread ran them."""
+    incident = json.loads(base64.b64decode(envelope['message']['data']).decode('utf-8'))
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        response = executor.submit(model.generate_content, incident['description']).result(timeout=30)
+    result = {"originalReportId": incident['id'], "aiGeneratedSummary": response.text}
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        future = executor.submit(publisher.publish, 'topic', json.dumps(result).encode('utf-8'))
+        future.result(timeout=10).result()
+
+
+async def drive(send, num_messages, concurrency):
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(index):
+        async with semaphore:
+            await send(make_envelope(index))
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(index) for index in range(num_messages)))
+    return time.perf_counter() - start
+
+
+async def run(num_messages, concurrency, latency):
+    model = FakeGeminiModel(latency)
+    publisher = FakePublisher()
+
+    wsgi_threads = ThreadPoolExecutor(max_workers=WSGI_MIDDLEWARE_THREADS)
+    loop = asyncio.get_running_loop()
+
+    async def send_threaded(envelope):
+        await loop.run_in_executor(wsgi_threads, legacy_handle, envelope, model, publisher)
+
+    before = await drive(send_threaded, num_messages, concurrency)
+    wsgi_threads.shutdown()
+
+    main._cached_gemini_model = model
+    main._publisher = publisher
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=main.app), base_url='http://agent') as client:
+        async def send_async(envelope):
+            response = await client.post('/', json=envelope)
+            assert response.status_code == 200 and response.text.startswith('OK'), response.text
+
+        after = await drive(send_async, num_messages, concurrency)
+
+    print(f"messages: {num_messages}, in flight: {concurrency}, fake Gemini latency: {latency * 1000:.0f} ms")
+    print(f"threaded (before)   {num_messages / before:8.1f} msg/s  ({before:.2f} s)")
+    print(f"asyncio (after)     {num_messages / after:8.1f} msg/s  ({after:.2f} s)")
+    print(f"published: {publisher.published}")
+
+
+if __name__ == '__main__':
+    import logging
+    logging.disable(logging.INFO)
+    args = sys.argv[1:]
+    asyncio.run(run(int(args[0]) if args else 2000, int(args[1]) if len(args) > 1 else 500, float(args[2]) if len(args) > 2 else 0.5))
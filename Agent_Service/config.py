@@ -11,6 +11,66 @@ GCP_LOCATION = os.environ.get('GCP_LOCATION', 'us-central1')
 PROCESSED_EVENTS_TOPIC_NAME = os.environ.get('PROCESSED_EVENTS_TOPIC_NAME', 'processed-events') 
 ANALYTICS_SUGGESTIONS_TOPIC_NAME = os.environ.get('ANALYTICS_SUGGESTIONS_TOPIC_NAME', 'analytics-and-suggestions')
 
+# Encoding of published messages (see codec.py): 'json' (compact) or 'msgpack', zstd-compressed
+# from PUBSUB_COMPRESS_THRESHOLD_BYTES up (0 = never). Firestore_Writer_Function reads plain JSON,
+# so keep the defaults for analytics-and-suggestions until it decodes the codec attribute.
+PUBSUB_MESSAGE_CODEC = os.environ.get('PUBSUB_MESSAGE_CODEC', 'json')
+PUBSUB_COMPRESS_THRESHOLD_BYTES = int(os.environ.get('PUBSUB_COMPRESS_THRESHOLD_BYTES', '0'))
+
 # Gemini Model Configuration
 # Ensure this matches the model name you want to use (e.g., 'gemini-2.5-pro' or 'gemini-pro')
-GEMINI_MODEL_NAME = os.environ.get('GEMINI_MODEL_NAME', 'gemini-2.5-pro')
\ No newline at end of file
+GEMINI_MODEL_NAME = os.environ.get('GEMINI_MODEL_NAME', 'gemini-2.5-pro')
+
+# Timeouts inside the push handler, well within the 60-second Pub/Sub ack deadline:
+# GEMINI_TIMEOUT_SECONDS bounds one Gemini call, GEMINI_DEADLINE_SECONDS the whole summary
+# (queueing in the limiter and overload retries included), so with publishing it stays under 60s
+GEMINI_TIMEOUT_SECONDS = float(os.environ.get('GEMINI_TIMEOUT_SECONDS', '30'))
+GEMINI_DEADLINE_SECONDS = float(os.environ.get('GEMINI_DEADLINE_SECONDS', '45'))
+PUBLISH_TIMEOUT_SECONDS = float(os.environ.get('PUBLISH_TIMEOUT_SECONDS', '10'))
+
+
+# Two-tier cache of Gemini complaint summaries, keyed by the normalized description, the prompt
+# version and the model: an in-process LRU in front of LLM_CACHE_BACKEND, which is 'firestore'
+# (collection LLM_CACHE_COLLECTION, shared by all instances), 'sqlite' (local runs) or 'memory'
+LLM_CACHE_ENABLED = os.environ.get('LLM_CACHE_ENABLED', 'true').lower() == 'true'
+LLM_CACHE_BACKEND = os.environ.get('LLM_CACHE_BACKEND', 'firestore')
+LLM_CACHE_COLLECTION = os.environ.get('LLM_CACHE_COLLECTION', 'llm_summary_cache')
+LLM_CACHE_SQLITE_PATH = os.environ.get('LLM_CACHE_SQLITE_PATH', 'llm_cache.sqlite3')
+LLM_CACHE_MAX_ENTRIES = int(os.environ.get('LLM_CACHE_MAX_ENTRIES', '10000'))
+LLM_CACHE_TTL_SECONDS = int(os.environ.get('LLM_CACHE_TTL_SECONDS', str(7 * 24 * 3600)))
+
+# Local pre-filter run before any Gemini call (see prefilter.py): clear gibberish / non-complaints
+# are discarded without reaching the model. PREFILTER_WORDS_FILE is its vocabulary; a report with
+# no vocabulary word is gibberish above PREFILTER_MAX_BITS_PER_CHAR (character bigram cross-entropy)
+PREFILTER_ENABLED = os.environ.get('PREFILTER_ENABLED', 'true').lower() == 'true'
+PREFILTER_WORDS_FILE = os.environ.get('PREFILTER_WORDS_FILE', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'prefilter_words.txt'))
+PREFILTER_MIN_LETTERS = int(os.environ.get('PREFILTER_MIN_LETTERS', '3'))
+PREFILTER_MAX_BITS_PER_CHAR = float(os.environ.get('PREFILTER_MAX_BITS_PER_CHAR', '5.0'))
+
+# Micro-batching of Gemini summaries: complaints arriving together are gathered for up to
+# GEMINI_BATCH_MAX_WAIT_MS or GEMINI_BATCH_MAX_SIZE items and summarized with one prompt
+GEMINI_BATCH_ENABLED = os.environ.get('GEMINI_BATCH_ENABLED', 'true').lower() == 'true'
+GEMINI_BATCH_MAX_SIZE = int(os.environ.get('GEMINI_BATCH_MAX_SIZE', '10'))
+GEMINI_BATCH_MAX_WAIT_MS = float(os.environ.get('GEMINI_BATCH_MAX_WAIT_MS', '20'))
+
+# Streaming-pull worker (worker.py), an alternative to the push endpoint. Flow control bounds
+# the messages / bytes leased at once; the client keeps extending each message's ack deadline
+# (by at least WORKER_MIN_LEASE_EXTENSION_SECONDS) for up to WORKER_MAX_LEASE_SECONDS while it
+# is processed. WORKER_CONCURRENCY bounds the messages processed at the same time.
+PROCESSED_EVENTS_SUBSCRIPTION_NAME = os.environ.get('PROCESSED_EVENTS_SUBSCRIPTION_NAME', 'processed-events-agent-worker')
+WORKER_MAX_MESSAGES = int(os.environ.get('WORKER_MAX_MESSAGES', '200'))
+WORKER_MAX_BYTES = int(os.environ.get('WORKER_MAX_BYTES', str(20 * 1024 * 1024)))
+WORKER_CONCURRENCY = int(os.environ.get('WORKER_CONCURRENCY', '100'))
+WORKER_MAX_LEASE_SECONDS = int(os.environ.get('WORKER_MAX_LEASE_SECONDS', '600'))
+WORKER_MIN_LEASE_EXTENSION_SECONDS = int(os.environ.get('WORKER_MIN_LEASE_EXTENSION_SECONDS', '60'))
+WORKER_STATS_INTERVAL_SECONDS = int(os.environ.get('WORKER_STATS_INTERVAL_SECONDS', '60'))
+
+# Adaptive (AIMD) limit on concurrent Gemini calls in this process: raised additively while
+# calls succeed, halved on ResourceExhausted, timeouts or latency spikes (GEMINI_LIMITER_SPIKE_FACTOR
+# times the average latency). Calls over the limit queue; ResourceExhausted calls are requeued
+# up to GEMINI_LIMITER_OVERLOAD_RETRIES times while GEMINI_DEADLINE_SECONDS allow.
+GEMINI_LIMITER_INITIAL = int(os.environ.get('GEMINI_LIMITER_INITIAL', '8'))
+GEMINI_LIMITER_MIN = int(os.environ.get('GEMINI_LIMITER_MIN', '1'))
+GEMINI_LIMITER_MAX = int(os.environ.get('GEMINI_LIMITER_MAX', '64'))
+GEMINI_LIMITER_SPIKE_FACTOR = float(os.environ.get('GEMINI_LIMITER_SPIKE_FACTOR', '3.0'))
+GEMINI_LIMITER_OVERLOAD_RETRIES = int(os.environ.get('GEMINI_LIMITER_OVERLOAD_RETRIES', '2'))
@@ -0,0 +1,191 @@
+# gemini_limiter.py
+import asyncio
+import logging
+import random
+import threading
+import time
+from collections import deque
+
+from google.api_core.exceptions import ResourceExhausted
+
+logger = logging.getLogger(__name__)
+
+
+class AIMDLimiter:
+    """
+    Adaptive limit on the Gemini calls in flight in one process (additive increase,
+    multiplicative decrease). Calls beyond the limit queue in FIFO order instead of failing.
+
+    - Every success while the limit is fully used raises it by `increase / limit`, i.e. by
+      about `increase` per limit's worth of calls, up to `max_limit`.
+    - ResourceExhausted, a timeout, or a success slower than `latency_spike_factor` times the
+      moving-average latency multiplies the limit by `decrease_factor` (not below `min_limit`).
+      Calls that were already in flight at the last cut do not cut it again, so one burst
+      of quota errors halves the limit once.
+
+    Thread-safe: waiters may run on different event loops (Flask runs each async view on its
+    own loop), each is woken on its own loop.
+    """
+
+    def __init__(self, initial_limit=8, min_limit=1, max_limit=64, increase=1.0, decrease_factor=0.5,
+                 latency_spike_factor=3.0, latency_alpha=0.1, warmup_calls=10, overload_backoff_seconds=0.5):
+        self.limit = float(initial_limit)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.increase = increase
+        self.decrease_factor = decrease_factor
+        self.latency_spike_factor = latency_spike_factor
+        self.latency_alpha = latency_alpha
+        self.warmup_calls = warmup_calls
+        self.overload_backoff_seconds = overload_backoff_seconds
+        self.in_flight = 0
+        self._lock = threading.Lock()
+        self._waiters = deque()  # (loop, future) in arrival order
+        self._latency_avg = None
+        self._last_decrease = 0.0
+        self.successes = self.overloads = self.timeouts = self.latency_spikes = self.decreases = 0
+        self.waits = self.deadlines_exceeded = 0
+        self.wait_seconds_total = self.wait_seconds_max = 0.0
+
+    def _capacity(self):
+        return max(self.min_limit, int(self.limit))
+
+    def _wake(self):
+        """Hands free slots to queued callers; called with the lock held."""
+        while self._waiters and self.in_flight < self._capacity():
+            loop, future = self._waiters.popleft()
+            self.in_flight += 1
+            loop.call_soon_threadsafe(_grant, future)
+
+    async def acquire(self):
+        loop = asyncio.get_running_loop()
+        queued_at = time.monotonic()
+        with self._lock:
+            if not self._waiters and self.in_flight < self._capacity():
+                self.in_flight += 1
+                self._record_wait(0.0)
+                return
+            future = loop.create_future()
+            self._waiters.append((loop, future))
+        try:
+            await future
+        except asyncio.CancelledError:
+            with self._lock:
+                try:
+                    self._waiters.remove((loop, future))
+                except ValueError:
+                    # A slot was granted as the caller was cancelled; pass it on
+                    self.in_flight -= 1
+                    self._wake()
+            raise
+        with self._lock:
+            self._record_wait(time.monotonic() - queued_at)
+
+    def _record_wait(self, seconds):
+        self.waits += 1
+        self.wait_seconds_total += seconds
+        self.wait_seconds_max = max(self.wait_seconds_max, seconds)
+
+    def release(self, started, outcome):
+        """Frees a slot and adapts the limit. `outcome` is 'success', 'overload', 'timeout' or 'error' (no change)."""
+        latency = time.monotonic() - started
+        with self._lock:
+            saturated = self.in_flight >= self._capacity()
+            self.in_flight -= 1
+            if outcome == 'success':
+                self.successes += 1
+                average = self._latency_avg
+                if average is not None and self.successes > self.warmup_calls and latency > self.latency_spike_factor * average:
+                    self.latency_spikes += 1
+                    self._decrease(started)
+                elif saturated:
+                    self.limit = min(self.max_limit, self.limit + self.increase / self.limit)
+                self._latency_avg = latency if average is None else average + self.latency_alpha * (latency - average)
+            elif outcome == 'overload':
+                self.overloads += 1
+                self._decrease(started)
+            elif outcome == 'timeout':
+                self.timeouts += 1
+                self._decrease(started)
+            self._wake()
+
+    def _decrease(self, started):
+        if started < self._last_decrease:
+            return
+        self.limit = max(self.min_limit, self.limit * self.decrease_factor)
+        self._last_decrease = time.monotonic()
+        self.decreases += 1
+        logger.warning(f"Gemini concurrency limit cut to {self.limit:.1f} ({self.in_flight} in flight, {len(self._waiters)} queued)")
+
+    async def call(self, make_call, overload_retries=0, timeout=None, deadline=None):
+        """
+        Awaits `make_call()` (a coroutine function) within the limit, each attempt bounded by
+        `timeout` seconds. On ResourceExhausted the call is queued again, after a jittered
+        backoff, up to `overload_retries` times.
+
+        `deadline` (seconds) bounds the whole call, queueing and retries included:
+        asyncio.TimeoutError is raised once it passes, and a retry whose backoff would end
+        after it is not made (the ResourceExhausted is raised instead).
+        """
+        expires = time.monotonic() + deadline if deadline is not None else None
+        for attempt in range(overload_retries + 1):
+            try:
+                await asyncio.wait_for(self.acquire(), self._remaining(expires))
+            except asyncio.TimeoutError:
+                self._expire()
+                raise
+            remaining = self._remaining(expires)
+            attempt_timeout = timeout if remaining is None or (timeout is not None and timeout <= remaining) else remaining
+            started = time.monotonic()
+            try:
+                result = await asyncio.wait_for(make_call(), attempt_timeout)
+            except ResourceExhausted:
+                self.release(started, 'overload')
+                backoff = self.overload_backoff_seconds * 2 ** attempt * random.uniform(0.5, 1.5)
+                if attempt == overload_retries or (expires is not None and time.monotonic() + backoff >= expires):
+                    raise
+                await asyncio.sleep(backoff)
+                continue
+            except asyncio.TimeoutError:
+                if attempt_timeout == timeout:
+                    self.release(started, 'timeout')
+                else:
+                    # Cut short by the deadline: says nothing about Gemini's latency
+                    self.release(started, 'error')
+                    self._expire()
+                raise
+            except BaseException:
+                self.release(started, 'error')
+                raise
+            self.release(started, 'success')
+            return result
+
+    @staticmethod
+    def _remaining(expires):
+        return None if expires is None else max(0.0, expires - time.monotonic())
+
+    def _expire(self):
+        with self._lock:
+            self.deadlines_exceeded += 1
+
+    def stats(self):
+        with self._lock:
+            return {
+                "limit": round(self.limit, 2),
+                "in_flight": self.in_flight,
+                "queue_depth": len(self._waiters),
+                "wait_seconds_avg": round(self.wait_seconds_total / self.waits, 4) if self.waits else None,
+                "wait_seconds_max": round(self.wait_seconds_max, 4),
+                "latency_seconds_avg": round(self._latency_avg, 4) if self._latency_avg is not None else None,
+                "successes": self.successes,
+                "overloads": self.overloads,
+                "timeouts": self.timeouts,
+                "latency_spikes": self.latency_spikes,
+                "decreases": self.decreases,
+                "deadlines_exceeded": self.deadlines_exceeded,
+            }
+
+
+def _grant(future):
+    if not future.done():
+        future.set_result(None)
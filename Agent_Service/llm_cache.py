@@ -0,0 +1,206 @@
+# llm_cache.py
+import asyncio
+import hashlib
+import logging
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from datetime import datetime, timezone
+
+logger = logging.getLogger(__name__)
+
+_SPACE_RE = re.compile(r"\s+")
+_EDGE_PUNCTUATION = " \t\n.,;:!?\"'()[]-"
+
+
+def normalize_description(text):
+    """Case-, whitespace- and edge-punctuation-insensitive form of a complaint, so resubmitted copies share a key."""
+    text = unicodedata.normalize('NFKC', text or '').casefold()
+    return _SPACE_RE.sub(' ', text).strip(_EDGE_PUNCTUATION)
+
+
+def cache_key(description, prompt_version, model_name):
+    """sha256 of the normalized description, the prompt template version and the model name."""
+    material = '\x1f'.join((prompt_version, model_name, normalize_description(description)))
+    return hashlib.sha256(material.encode('utf-8')).hexdigest()
+
+
+class LRUCache:
+    """In-process LRU with a per-entry TTL. Counts hits, misses and evictions (expired or over capacity)."""
+
+    def __init__(self, max_entries=10000, ttl_seconds=86400):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries = OrderedDict()  # key -> (value, expires_at)
+        self.hits = self.misses = self.evictions = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        value, expires_at = entry
+        if expires_at <= time.time():
+            del self._entries[key]
+            self.evictions += 1
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key, value, expires_at=None):
+        self._entries[key] = (value, expires_at or time.time() + self.ttl_seconds)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+
+class FirestoreCacheStore:
+    """
+    One document per key in `collection_name`: {value, expiresAt, createdAt}. expiresAt is a
+    timestamp so a Firestore TTL policy on that field can delete stale entries server-side;
+    reads also ignore expired documents.
+    """
+
+    def __init__(self, db, collection_name='llm_summary_cache'):
+        self.collection = db.collection(collection_name)
+
+    def get(self, key):
+        snapshot = self.collection.document(key).get()
+        if not snapshot.exists:
+            return None
+        data = snapshot.to_dict() or {}
+        expires_at = data.get('expiresAt')
+        if expires_at is None or expires_at.timestamp() <= time.time():
+            return None
+        return data.get('value'), expires_at.timestamp()
+
+    def put(self, key, value, expires_at):
+        self.collection.document(key).set({
+            'value': value,
+            'expiresAt': datetime.fromtimestamp(expires_at, timezone.utc),
+            'createdAt': datetime.now(timezone.utc),
+        })
+
+
+class SQLiteCacheStore:
+    """Local persistent tier for development runs: one table in a SQLite file."""
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("CREATE TABLE IF NOT EXISTS llm_cache (key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)")
+        self._conn.commit()
+
+    def get(self, key):
+        with self._lock:
+            row = self._conn.execute("SELECT value, expires_at FROM llm_cache WHERE key = ? AND expires_at > ?", (key, time.time())).fetchone()
+        return (row[0], row[1]) if row else None
+
+    def put(self, key, value, expires_at):
+        with self._lock:
+            self._conn.execute("INSERT OR REPLACE INTO llm_cache (key, value, expires_at) VALUES (?, ?, ?)", (key, value, expires_at))
+            # Expired rows are cleared on write so the file does not grow without bound
+            self._conn.execute("DELETE FROM llm_cache WHERE expires_at <= ?", (time.time(),))
+            self._conn.commit()
+
+
+class TwoTierCache:
+    """
+    LLM responses keyed by cache_key(): an in-process LRUCache in front of an optional
+    persistent store (FirestoreCacheStore / SQLiteCacheStore) shared by every instance.
+    Store calls run in the default executor; store errors are logged and treated as misses,
+    so the cache can only ever save a model call, never fail a request.
+    """
+
+    def __init__(self, memory, store=None):
+        self.memory = memory
+        self.store = store
+        self.store_hits = self.store_misses = self.store_errors = 0
+        self.coalesced = 0
+        self._in_flight = {}  # key -> future of the model call already running for it
+
+    async def get(self, key):
+        value = self.memory.get(key)
+        if value is not None or self.store is None:
+            return value
+        loop = asyncio.get_running_loop()
+        try:
+            entry = await loop.run_in_executor(None, self.store.get, key)
+        except Exception as e:
+            self.store_errors += 1
+            logger.warning(f"LLM cache store read failed: {e}")
+            return None
+        if entry is None:
+            self.store_misses += 1
+            return None
+        self.store_hits += 1
+        value, expires_at = entry
+        self.memory.put(key, value, expires_at)
+        return value
+
+    async def put(self, key, value):
+        expires_at = time.time() + self.memory.ttl_seconds
+        self.memory.put(key, value, expires_at)
+        if self.store is None:
+            return
+        try:
+            await asyncio.get_running_loop().run_in_executor(None, self.store.put, key, value, expires_at)
+        except Exception as e:
+            self.store_errors += 1
+            logger.warning(f"LLM cache store write failed: {e}")
+
+    async def get_or_compute(self, key, compute):
+        """
+        Cached value for `key`, else awaits `compute()` and caches its result. Concurrent
+        misses for the same key share one compute() call. Exceptions and None results are
+        not cached. Returns (value, hit).
+        """
+        value = await self.get(key)
+        if value is not None:
+            return value, True
+        in_flight = self._in_flight.get(key)
+        if in_flight is not None:
+            self.coalesced += 1
+            return await asyncio.shield(in_flight), True
+
+        future = asyncio.get_running_loop().create_future()
+        self._in_flight[key] = future
+        try:
+            value = await compute()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()  # mark retrieved when no other request was waiting
+            raise
+        finally:
+            del self._in_flight[key]
+        future.set_result(value)
+        if value is not None:
+            await self.put(key, value)
+        return value, False
+
+    def stats(self):
+        hits = self.memory.hits + self.store_hits + self.coalesced
+        lookups = self.memory.hits + self.memory.misses
+        return {
+            "memory_hits": self.memory.hits,
+            "store_hits": self.store_hits,
+            "coalesced": self.coalesced,
+            "misses": lookups - hits,
+            "hit_rate": round(hits / lookups, 3) if lookups else None,
+            "evictions": self.memory.evictions,
+            "store_errors": self.store_errors,
+            "memory_entries": len(self.memory),
+        }
@@ -1,19 +1,16 @@
-# main.py (Flask Version - Older)
+# main.py (FastAPI - native asyncio push handler)
 import os
 import json
 import base64
+import asyncio
 import logging
-from flask import Flask, request, jsonify
-import firebase_admin # type: ignore
-from firebase_admin import firestore # type: ignore
+import threading
 
-# Import Uvicorn's WSGIMiddleware
-from uvicorn.middleware.wsgi import WSGIMiddleware
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, PlainTextResponse
 
-# Import Google Cloud clients and Vertex AI SDK components
+# Import Google Cloud clients (Vertex AI and Firebase are imported lazily, on first use)
 from google.cloud import pubsub_v1 # For publishing messages
-import vertexai
-from vertexai.preview.generative_models import GenerativeModel
 from google.api_core.exceptions import GoogleAPIError, InvalidArgument, ResourceExhausted
 from datetime import datetime
 
@@ -23,42 +20,178 @@ from config import (
     GCP_LOCATION,
     PROCESSED_EVENTS_TOPIC_NAME,
     ANALYTICS_SUGGESTIONS_TOPIC_NAME,
-    GEMINI_MODEL_NAME as CONFIG_GEMINI_MODEL_NAME
+    GEMINI_MODEL_NAME as CONFIG_GEMINI_MODEL_NAME,
+    PUBSUB_MESSAGE_CODEC,
+    PUBSUB_COMPRESS_THRESHOLD_BYTES,
+    GEMINI_TIMEOUT_SECONDS,
+    GEMINI_DEADLINE_SECONDS,
+    PUBLISH_TIMEOUT_SECONDS,
+    LLM_CACHE_ENABLED,
+    LLM_CACHE_BACKEND,
+    LLM_CACHE_COLLECTION,
+    LLM_CACHE_SQLITE_PATH,
+    LLM_CACHE_MAX_ENTRIES,
+    LLM_CACHE_TTL_SECONDS,
+    PREFILTER_ENABLED,
+    PREFILTER_WORDS_FILE,
+    PREFILTER_MIN_LETTERS,
+    PREFILTER_MAX_BITS_PER_CHAR,
+    GEMINI_BATCH_ENABLED,
+    GEMINI_BATCH_MAX_SIZE,
+    GEMINI_BATCH_MAX_WAIT_MS,
+    GEMINI_LIMITER_INITIAL,
+    GEMINI_LIMITER_MIN,
+    GEMINI_LIMITER_MAX,
+    GEMINI_LIMITER_SPIKE_FACTOR,
+    GEMINI_LIMITER_OVERLOAD_RETRIES
 )
+from batcher import MicroBatcher
+from codec import MessageCodec, decode_message
+from gemini_limiter import AIMDLimiter
+from llm_cache import FirestoreCacheStore, LRUCache, SQLiteCacheStore, TwoTierCache, cache_key
+from prefilter import REJECT, ComplaintPrefilter
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
-# Initialize Flask app
-app = Flask(__name__)
+# Initialize FastAPI app. The handler is a coroutine end to end: Gemini calls, Pub/Sub
+# publishes and Firestore updates are awaited, so one worker holds many messages in flight
+# instead of blocking a thread per message.
+app = FastAPI()
 
-# Initialize Google Cloud Pub/Sub Publisher Client globally
-publisher = pubsub_v1.PublisherClient()
+# Encoder for the published AI results (compact JSON unless configured otherwise)
+message_codec = MessageCodec(PUBSUB_MESSAGE_CODEC, PUBSUB_COMPRESS_THRESHOLD_BYTES)
+
+# Every Gemini call in this process (push handler and worker.py) goes through this limiter
+gemini_limiter = AIMDLimiter(GEMINI_LIMITER_INITIAL, GEMINI_LIMITER_MIN, GEMINI_LIMITER_MAX, latency_spike_factor=GEMINI_LIMITER_SPIKE_FACTOR)
 
 # Set the Gemini model name
 GEMINI_MODEL_NAME = CONFIG_GEMINI_MODEL_NAME  # Use config value for consistency
 
-# Global variables for lazy initialization of GenerativeModel per worker process
-_cached_gemini_model = None
-_vertexai_initialized_flag = False
+# Summary prompt. Bump SUMMARY_PROMPT_VERSION whenever the template changes, so cached
+# summaries made with the old prompt are no longer used.
+SUMMARY_PROMPT_VERSION = 'v1'
+SUMMARY_PROMPT_TEMPLATE = """
+        You are an expert complaint analyst. You will be given a description of an urban complaint.
+        If the complaint is valid, provide a concise summary without changing the meaning.
+        If it is not a valid complaint, say "Summary unavailable - insufficient data. Reason: <Whatever the reason is for discarding the complaint>".
+        Summarize the following urban incident: {description}
+
+        Example:
+        Input: "There is a large pothole on 5th Avenue causing traffic delays."
+        Output: "Large pothole on 5th Avenue causing traffic delays."
+
+        Input: "Streetlight not working."
+        Output: "Streetlight malfunction reported."
+
+        Input: "No issues, just a routine check."
+        Output: "Summary unavailable - insufficient data. Reason: Not a valid complaint."
+
+        Input: "oquehfqnl"
+        Output: "Summary unavailable - insufficient data. Reason: The Complaint has no valid information."
+        """
 
-if not firebase_admin._apps:
-    firebase_admin.initialize_app()
+# Prompt for a micro-batch of complaints (see summarize_batch); same task as SUMMARY_PROMPT_TEMPLATE
+SUMMARY_BATCH_PROMPT_TEMPLATE = """
+        You are an expert complaint analyst. You will be given a JSON array of urban complaints, each with an "id" and a "description".
+        For each complaint, decide whether it is a valid complaint. If it is, provide a concise summary without changing the meaning.
+        Reply with only a JSON array holding one object per complaint, in the same order:
+        {{"id": <id>, "valid": true, "summary": "<summary>"}} for a valid complaint, or
+        {{"id": <id>, "valid": false, "reason": "<the reason for discarding the complaint>"}} otherwise.
 
+        Example:
+        Input: [{{"id": 0, "description": "There is a large pothole on 5th Avenue causing traffic delays."}}, {{"id": 1, "description": "Streetlight not working."}}, {{"id": 2, "description": "No issues, just a routine check."}}, {{"id": 3, "description": "oquehfqnl"}}]
+        Output: [{{"id": 0, "valid": true, "summary": "Large pothole on 5th Avenue causing traffic delays."}}, {{"id": 1, "valid": true, "summary": "Streetlight malfunction reported."}}, {{"id": 2, "valid": false, "reason": "Not a valid complaint."}}, {{"id": 3, "valid": false, "reason": "The Complaint has no valid information."}}]
 
-def update_specific_report(document_id, new_status, reason=None):
+        Complaints: {complaints}
+        """
+
+# Global variables for lazy initialization of GenerativeModel per worker process
+_client_lock = threading.Lock()
+_cached_gemini_model = None
+_vertexai_initialized_flag = False
+_firestore_db = None
+_publisher = None
+_summary_cache = None
+_prefilter = None
+_summary_batcher = None
+
+
+def get_publisher():
+    """Pub/Sub publisher client, created on first use (credential discovery blocks)."""
+    global _publisher
+    with _client_lock:
+        if _publisher is None:
+            _publisher = pubsub_v1.PublisherClient()
+            logger.info("Pub/Sub publisher client initialized.")
+    return _publisher
+
+
+def get_firestore_db():
+    """Firestore client from the Firebase Admin SDK, initialized on first use."""
+    global _firestore_db
+    with _client_lock:
+        if _firestore_db is None:
+            import firebase_admin # type: ignore
+            from firebase_admin import firestore # type: ignore
+            if not firebase_admin._apps:
+                firebase_admin.initialize_app()
+            _firestore_db = firestore.client()
+    return _firestore_db
+
+
+def get_summary_cache_instance():
+    """The two-tier summary cache, with the persistent tier selected by LLM_CACHE_BACKEND; None when disabled."""
+    global _summary_cache
+    if not LLM_CACHE_ENABLED:
+        return None
+    if _summary_cache is None:
+        if LLM_CACHE_BACKEND == 'firestore':
+            store = FirestoreCacheStore(get_firestore_db(), LLM_CACHE_COLLECTION)
+        elif LLM_CACHE_BACKEND == 'sqlite':
+            store = SQLiteCacheStore(LLM_CACHE_SQLITE_PATH)
+        else:
+            store = None
+        with _client_lock:
+            if _summary_cache is None:
+                _summary_cache = TwoTierCache(LRUCache(LLM_CACHE_MAX_ENTRIES, LLM_CACHE_TTL_SECONDS), store)
+                logger.info(f"LLM summary cache enabled (backend: {LLM_CACHE_BACKEND}).")
+    return _summary_cache
+
+
+async def get_summary_cache():
+    if _summary_cache is not None or not LLM_CACHE_ENABLED:
+        return _summary_cache
+    return await asyncio.get_running_loop().run_in_executor(None, get_summary_cache_instance)
+
+
+def get_prefilter():
+    """The local complaint pre-filter, loaded from PREFILTER_WORDS_FILE on first use; None when disabled."""
+    global _prefilter
+    if not PREFILTER_ENABLED:
+        return None
+    with _client_lock:
+        if _prefilter is None:
+            _prefilter = ComplaintPrefilter.from_file(PREFILTER_WORDS_FILE, min_letters=PREFILTER_MIN_LETTERS,
+                                                      max_bits_per_char=PREFILTER_MAX_BITS_PER_CHAR)
+            logger.info(f"Complaint pre-filter loaded ({len(_prefilter.vocabulary)} words).")
+    return _prefilter
+
+
+def update_specific_report(document_id, new_status, reason=None, raise_errors=False):
     """
     Finds a specific document by its ID in the UserReports collection
-    and updates its status.
+    and updates its status. Blocking; the handler runs it in the default executor.
 
     Args:
         document_id (str): The unique ID of the document to update.
         new_status (str): The new status value (e.g., 'resolved', 'under_review').
+        raise_errors (bool): Re-raise a failed update instead of logging it and returning the error.
     """
     try:
-        db = firestore.client()
-        
+        db = get_firestore_db()
+
         # 1. Get a direct reference to the specific document using its ID
         doc_ref = db.collection('UserReports').document(document_id)
 
@@ -74,6 +207,8 @@ def update_specific_report(document_id, new_status, reason=None):
 
     except Exception as e:
         logger.info(f"An error occurred while updating {document_id}: {e}")
+        if raise_errors:
+            raise
         return f"An error occurred: {e}"
 
 
@@ -82,36 +217,251 @@ def update_specific_report(document_id, new_status, reason=None):
 def get_gemini_model_instance():
     """
     Lazily initializes Vertex AI and instantiates the GenerativeModel.
-    Synchronous version for compatibility with Flask/Gunicorn.
+    Blocking (credential discovery, channel setup); see get_gemini_model().
     """
     global _cached_gemini_model, _vertexai_initialized_flag
 
-    if not _vertexai_initialized_flag:
-        try:
-            # vertexai.init() is generally safe to call multiple times,
-            # but we guard it to log only once per worker.
-            vertexai.init(project=GCP_PROJECT_ID, location=GCP_LOCATION)
-            _vertexai_initialized_flag = True
-            logger.info(f"Vertex AI initialized for project '{GCP_PROJECT_ID}' in location '{GCP_LOCATION}'.")
-        except Exception as e:
-            logger.error(f"Failed to initialize Vertex AI: {e}", exc_info=True)
-            raise # Re-raise to indicate a critical startup failure
+    with _client_lock:
+        if not _vertexai_initialized_flag:
+            try:
+                import vertexai
+                # vertexai.init() is generally safe to call multiple times,
+                # but we guard it to log only once per worker.
+                vertexai.init(project=GCP_PROJECT_ID, location=GCP_LOCATION)
+                _vertexai_initialized_flag = True
+                logger.info(f"Vertex AI initialized for project '{GCP_PROJECT_ID}' in location '{GCP_LOCATION}'.")
+            except Exception as e:
+                logger.error(f"Failed to initialize Vertex AI: {e}", exc_info=True)
+                raise # Re-raise to indicate a critical startup failure
 
-    if _cached_gemini_model is None:
-        try:
-            # Instantiate GenerativeModel. This might internally set up gRPC clients.
-            _cached_gemini_model = GenerativeModel(GEMINI_MODEL_NAME)
-            logger.info(f"GenerativeModel '{GEMINI_MODEL_NAME}' instantiated.")
-        except Exception as e:
-            logger.error(f"Failed to instantiate GenerativeModel '{GEMINI_MODEL_NAME}': {e}", exc_info=True)
-            _cached_gemini_model = None # Reset on failure
-            raise # Re-raise to indicate a critical startup failure
+        if _cached_gemini_model is None:
+            try:
+                from vertexai.preview.generative_models import GenerativeModel
+                # Instantiate GenerativeModel. This might internally set up gRPC clients.
+                _cached_gemini_model = GenerativeModel(GEMINI_MODEL_NAME)
+                logger.info(f"GenerativeModel '{GEMINI_MODEL_NAME}' instantiated.")
+            except Exception as e:
+                logger.error(f"Failed to instantiate GenerativeModel '{GEMINI_MODEL_NAME}': {e}", exc_info=True)
+                _cached_gemini_model = None # Reset on failure
+                raise # Re-raise to indicate a critical startup failure
 
     return _cached_gemini_model
 
 
+class GeminiInitError(Exception):
+    """Initializing Vertex AI or the GenerativeModel failed (the cause is chained)."""
+
+
+async def get_gemini_model():
+    """
+    The cached GenerativeModel; the first call initializes it in the default executor so the
+    event loop never blocks. Raises GeminiInitError when initialization fails.
+    """
+    if _cached_gemini_model is not None:
+        return _cached_gemini_model
+    try:
+        return await asyncio.get_running_loop().run_in_executor(None, get_gemini_model_instance)
+    except Exception as e:
+        raise GeminiInitError(f"Gemini model could not be initialized: {e}") from e
+
+
+def response_text(gemini_response):
+    return gemini_response.text if hasattr(gemini_response, 'candidates') and gemini_response.candidates else "No summary generated."
+
+
+async def generate_content(gemini_model, prompt):
+    """
+    One Gemini call within the adaptive concurrency limit; queued while the limit is reached.
+    asyncio.TimeoutError once GEMINI_DEADLINE_SECONDS pass, however long it queued or retried.
+    """
+    return await gemini_limiter.call(
+        lambda: gemini_model.generate_content_async(prompt),
+        overload_retries=GEMINI_LIMITER_OVERLOAD_RETRIES,
+        timeout=GEMINI_TIMEOUT_SECONDS,
+        deadline=GEMINI_DEADLINE_SECONDS,
+    )
+
+
+async def summarize_one(description):
+    """One Gemini call for one complaint. None for an empty response (returned but not cached)."""
+    gemini_model = await get_gemini_model()
+    prompt = SUMMARY_PROMPT_TEMPLATE.format(description=description)
+    gemini_response = await generate_content(gemini_model, prompt)
+    return gemini_response.text if hasattr(gemini_response, 'candidates') and gemini_response.candidates else None
+
+
+def parse_batch_summaries(text, count):
+    """
+    Per-complaint results of a SUMMARY_BATCH_PROMPT_TEMPLATE response, in the single-prompt
+    format (discards as "Summary unavailable - insufficient data. Reason: ..."). Raises
+    ValueError unless the response is a JSON array with exactly one entry per id.
+    """
+    text = (text or '').strip()
+    if text.startswith('```'):
+        text = text.strip('`').removeprefix('json').strip()
+    entries = json.loads(text)
+    if not isinstance(entries, list) or len(entries) != count:
+        raise ValueError(f"expected a JSON array of {count} results")
+    by_id = {entry.get('id'): entry for entry in entries if isinstance(entry, dict)}
+    if set(by_id) != set(range(count)):
+        raise ValueError(f"result ids do not match complaint ids 0-{count - 1}")
+
+    summaries = []
+    for index in range(count):
+        entry = by_id[index]
+        if entry.get('valid'):
+            summaries.append(entry.get('summary') or None)
+        else:
+            summaries.append(f"Summary unavailable - insufficient data. Reason: {entry.get('reason') or 'Unknown'}")
+    return summaries
+
+
+async def summarize_batch(descriptions):
+    """One Gemini call for a micro-batch of complaints; ValueError when the response cannot be parsed."""
+    gemini_model = await get_gemini_model()
+    complaints = json.dumps([{"id": index, "description": description} for index, description in enumerate(descriptions)])
+    prompt = SUMMARY_BATCH_PROMPT_TEMPLATE.format(complaints=complaints)
+    gemini_response = await generate_content(gemini_model, prompt)
+    if not (hasattr(gemini_response, 'candidates') and gemini_response.candidates):
+        raise ValueError("empty response")
+    return parse_batch_summaries(gemini_response.text, len(descriptions))
+
+
+def get_summary_batcher():
+    """The micro-batcher for summary calls (one per worker, bound to its event loop); None when disabled."""
+    global _summary_batcher
+    if GEMINI_BATCH_ENABLED and _summary_batcher is None:
+        _summary_batcher = MicroBatcher(summarize_batch, summarize_one, GEMINI_BATCH_MAX_SIZE, GEMINI_BATCH_MAX_WAIT_MS / 1000)
+    return _summary_batcher
+
+
+async def summarize_description(description):
+    """
+    Gemini summary of a complaint description, served from the summary cache when the same
+    (normalized) complaint was summarized before, and batched with concurrent complaints
+    when GEMINI_BATCH_ENABLED. Returns (summary, cache_hit).
+    """
+    summary_batcher = get_summary_batcher()
+
+    async def call_gemini():
+        if summary_batcher is None:
+            return await summarize_one(description)
+        return await summary_batcher.submit(description)
+
+    summary_cache = await get_summary_cache()
+    if summary_cache is None:
+        summary, hit = await call_gemini(), False
+    else:
+        summary, hit = await summary_cache.get_or_compute(cache_key(description, SUMMARY_PROMPT_VERSION, GEMINI_MODEL_NAME), call_gemini)
+    return summary or "No summary generated.", hit
+
+
+async def publish_message(topic_name, data, **attributes):
+    """Publishes one message and awaits its Pub/Sub future through asyncio, without holding a thread."""
+    publisher = _publisher or await asyncio.get_running_loop().run_in_executor(None, get_publisher)
+    future = publisher.publish(publisher.topic_path(GCP_PROJECT_ID, topic_name), data, **attributes)
+    return await asyncio.wrap_future(future)
+
+
+class PublishError(Exception):
+    """Publishing the AI result failed or timed out (the cause is chained); the report was left as is."""
+
+
+PUBLISHED = 'published'
+DISCARDED = 'discarded'
+
+
+async def process_incident(incident_data, message_id, gemini_fallback=True, raise_status_errors=False):
+    """
+    Pre-filters, summarizes and publishes (or discards) one decoded complaint; shared by the
+    push handler and the streaming-pull worker (worker.py). Returns PUBLISHED or DISCARDED.
+    Raises PublishError when the result could not be published and GeminiInitError when the
+    model could not be initialized (on a cache miss). Other Gemini errors and timeouts
+    are raised only with gemini_fallback=False; by default a "Summary unavailable" fallback
+    summary is used, as the push handler always did. Complaints the model rejects or cannot
+    answer (InvalidArgument, ValueError) are discarded either way. Likewise, a failed 'Discarded' status
+    update is raised only with raise_status_errors=True; by default it is logged.
+    """
+    incident_id = incident_data.get('id', 'N/A')
+    incident_type = incident_data.get('type', 'General Incident')
+    doc_id = incident_data.get('firestoreDocId')
+    description_snippet = incident_data.get('description', '')[:50]
+    logger.info(f"Processing incident ID: {incident_id} from message {message_id} - Content: {description_snippet}")
+
+    # Clear gibberish / non-complaints are discarded here, without initializing or calling Gemini
+    description = incident_data.get('description', 'No description provided.')
+    prefilter = get_prefilter()
+    if prefilter is not None:
+        verdict, reason, scores = prefilter.check(description)
+        if verdict == REJECT:
+            logger.info(f"Pre-filter discarded incident {incident_id}. Reason: {reason} Scores: {scores}")
+            await asyncio.get_running_loop().run_in_executor(None, update_specific_report, doc_id, 'Discarded', reason, raise_status_errors)
+            return DISCARDED
+        logger.info(f"Pre-filter verdict for incident {incident_id}: {verdict}")
+
+    # Make Gemini call with timeout handling (or reuse the summary of an identical complaint;
+    # the model is only initialized on a cache miss)
+    logger.info(f"Making Gemini call for incident {incident_id}")
+    try:
+        summary_from_gemini, cache_hit = await summarize_description(description)
+        logger.info(f"Received Gemini summary for {incident_id}{' (cached)' if cache_hit else ''}: {summary_from_gemini[:100]}...")
+
+    except GeminiInitError:
+        raise  # fails the request in either mode; it is not a discard
+
+    except asyncio.TimeoutError:
+        if not gemini_fallback:
+            raise
+        logger.warning(f"Gemini call timed out for incident {incident_id}, using fallback summary")
+        summary_from_gemini = f"Summary unavailable - processing timeout for incident: {incident_id}"
+    except (ValueError, InvalidArgument) as e:
+        # The model rejected the request or returned no usable text (e.g. a safety-blocked
+        # candidate): a retry would only repeat it, so the report is discarded in either mode
+        logger.warning(f"Gemini could not summarize incident {incident_id}: {e!r}")
+        summary_from_gemini = "Summary unavailable - insufficient data. Reason: The complaint could not be processed."
+    except Exception as e:
+        if not gemini_fallback:
+            raise
+        logger.error(f"Gemini call failed for incident {incident_id}: {e}")
+        summary_from_gemini = f"Summary unavailable - processing error for incident: {incident_id}"
+
+    # Prepare AI result
+    simplified_ai_result = {
+        "originalReportId": incident_id,
+        "description": incident_data.get('description'),
+        "aiGeneratedSummary": summary_from_gemini,
+        "aiProcessedAt": datetime.utcnow().isoformat() + 'Z',
+        "eventType": incident_type,
+        "status": "Simplified_AI_Analyzed"
+    }
+
+    # Publish to Pub/Sub with timeout
+    if not summary_from_gemini.startswith("Summary unavailable"):
+        message_data, codec_attributes = message_codec.encode(simplified_ai_result)
+        try:
+            # 10-second timeout by default (well within 60-second ack deadline)
+            published_message_id = await asyncio.wait_for(publish_message(ANALYTICS_SUGGESTIONS_TOPIC_NAME, message_data, **codec_attributes), timeout=PUBLISH_TIMEOUT_SECONDS)
+
+            logger.info(f"Published AI result with ID: {published_message_id} for incident {incident_id}")
+            logger.info(f"Input message ID: {message_id} -> Output message ID: {published_message_id}")
+
+        except asyncio.TimeoutError as e:
+            logger.error(f"Pub/Sub publishing timed out for incident {incident_id}")
+            raise PublishError(f"publishing timed out for incident {incident_id}") from e
+        except Exception as e:
+            logger.error(f"Pub/Sub publishing failed for incident {incident_id}: {e}")
+            raise PublishError(f"publishing failed for incident {incident_id}: {e}") from e
+        return PUBLISHED
+    else:
+        reason = summary_from_gemini.split("Reason:")[-1].strip() if "Reason:" in summary_from_gemini else "Unknown"
+        logger.info(f"Gemini indicated to discard incident {incident_id}. Reason: {reason}")
+        await asyncio.get_running_loop().run_in_executor(None, update_specific_report, doc_id, 'Discarded', reason, raise_status_errors)
+        logger.info(f"Skipping publishing for incident {incident_id} due to insufficient summary.   ")
+        return DISCARDED
+
+
 @app.post("/")
-def index():
+async def index(request: Request):
     """
     Receives Pub/Sub messages (or any POST request), logs it,
     makes a simple Gemini call, and publishes a simplified result.
@@ -119,26 +469,26 @@ def index():
     try:
         start_time = datetime.utcnow()
         logger.info(f"Starting message processing at {start_time.isoformat()}")
-        
-        # Get the Gemini model instance (sync)
-        gemini_model = get_gemini_model_instance()
 
-        envelope = request.get_json()
-        
+        try:
+            envelope = await request.json()
+        except ValueError:
+            envelope = None
+
         # Handle direct POST requests (for testing)
-        if not envelope or 'message' not in envelope:
+        if not isinstance(envelope, dict) or 'message' not in envelope:
             logger.info("Received non-Pub/Sub POST request or malformed Pub/Sub envelope.")
             if envelope:
                 logger.info(f"Request body: {json.dumps(envelope)}")
-            
+
             # For direct testing, provide a dummy prompt and simplified output
             test_prompt = "What is the capital of France?"
             logger.info(f"Making a dummy Gemini call with: '{test_prompt}'")
-            
-            # Use the sync method
-            gemini_response = gemini_model.generate_content(test_prompt)
-            
-            summary_from_gemini = gemini_response.text if hasattr(gemini_response, 'candidates') and gemini_response.candidates else "No summary generated."
+
+            gemini_model = await get_gemini_model()
+            gemini_response = await generate_content(gemini_model, test_prompt)
+
+            summary_from_gemini = response_text(gemini_response)
             logger.info(f"Dummy Gemini response: {summary_from_gemini[:100]}...")
 
             simplified_output = {
@@ -146,125 +496,77 @@ def index():
                 "summary": summary_from_gemini,
                 "source": "Direct_Test_Request"
             }
-            return jsonify(simplified_output), 200
+            return JSONResponse(simplified_output, status_code=200)
 
         # Process Pub/Sub message
         pubsub_message = envelope['message']
         message_id = pubsub_message.get('messageId', 'unknown')
         publish_time = pubsub_message.get('publishTime', 'unknown')
         logger.info(f"Received Pub/Sub message ID: {message_id}, publish time: {publish_time}")
-        
-        data = base64.b64decode(pubsub_message.get('data', '')).decode('utf-8')
-        incident_data = json.loads(data)
-        
-        incident_id = incident_data.get('id', 'N/A')
-        incident_type = incident_data.get('type', 'General Incident') 
-        doc_id = incident_data.get('firestoreDocId')
-        description_snippet = incident_data.get('description', '')[:50]
-        logger.info(f"Processing incident ID: {incident_id} from message {message_id} - Content: {description_snippet}")
-        
-        # Make Gemini call synchronously with timeout handling
-        prompt_for_gemini = f"""
-        You are an expert complaint analyst. You will be given a description of an urban complaint.
-        If the complaint is valid, provide a concise summary without changing the meaning.
-        If it is not a valid complaint, say "Summary unavailable - insufficient data. Reason: <Whatever the reason is for discarding the complaint>".
-        Summarize the following urban incident: {incident_data.get('description', 'No description provided.')}
-        
-        Example:
-        Input: "There is a large pothole on 5th Avenue causing traffic delays."
-        Output: "Large pothole on 5th Avenue causing traffic delays."
 
-        Input: "Streetlight not working."
-        Output: "Streetlight malfunction reported."
+        # Decoded by the message's codec attribute; messages without one are plain JSON
+        incident_data = decode_message(base64.b64decode(pubsub_message.get('data', '')), pubsub_message.get('attributes'))
 
-        Input: "No issues, just a routine check."
-        Output: "Summary unavailable - insufficient data. Reason: Not a valid complaint."
-
-        Input: "oquehfqnl"
-        Output: "Summary unavailable - insufficient data. Reason: The Complaint has no valid information."
-        """
-        logger.info(f"Making Gemini call for incident {incident_id}")
-        
         try:
-            # Use concurrent.futures for timeout handling (works in threads)
-            from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
-            
-            # Set a 30-second timeout for Gemini calls (well within 60-second ack deadline)
-            with ThreadPoolExecutor(max_workers=1) as executor:
-                future = executor.submit(gemini_model.generate_content, prompt_for_gemini)
-                gemini_response = future.result(timeout=30)
-            
-            summary_from_gemini = gemini_response.text if hasattr(gemini_response, 'candidates') and gemini_response.candidates else "No summary generated."
-            logger.info(f"Received Gemini summary for {incident_id}: {summary_from_gemini[:100]}...")
-            
-        except FutureTimeoutError:
-            logger.warning(f"Gemini call timed out for incident {incident_id}, using fallback summary")
-            summary_from_gemini = f"Summary unavailable - processing timeout for incident: {incident_id}"
-        except Exception as e:
-            logger.error(f"Gemini call failed for incident {incident_id}: {e}")
-            summary_from_gemini = f"Summary unavailable - processing error for incident: {incident_id}"
-        
-        # Prepare AI result
-        simplified_ai_result = {
-            "originalReportId": incident_id,
-            "description": incident_data.get('description'),
-            "aiGeneratedSummary": summary_from_gemini,
-            "aiProcessedAt": datetime.utcnow().isoformat() + 'Z',
-            "eventType": incident_type,
-            "status": "Simplified_AI_Analyzed"
-        }
-        
-        # Publish to Pub/Sub (synchronous) with timeout
-        if not summary_from_gemini.startswith("Summary unavailable"):
-            topic_path = publisher.topic_path(GCP_PROJECT_ID, ANALYTICS_SUGGESTIONS_TOPIC_NAME)
-            message_data = json.dumps(simplified_ai_result).encode('utf-8')
-            try:
-                # Set a 10-second timeout for publishing (well within 60-second ack deadline)
-                with ThreadPoolExecutor(max_workers=1) as executor:
-                    future = executor.submit(publisher.publish, topic_path, message_data)
-                    pubsub_future = future.result(timeout=10)
-                    published_message_id = pubsub_future.result()  # Get the actual message ID
-                
-                logger.info(f"Published AI result with ID: {published_message_id} for incident {incident_id}")
-                logger.info(f"Input message ID: {message_id} -> Output message ID: {published_message_id}")
-                
-            except FutureTimeoutError:
-                logger.error(f"Pub/Sub publishing timed out for incident {incident_id}")
-                return 'Message Acknowledged (Publishing Timeout)', 200
-            except Exception as e:
-                logger.error(f"Pub/Sub publishing failed for incident {incident_id}: {e}")
-                return 'Message Acknowledged (Publishing Error)', 200
-            
+            outcome = await process_incident(incident_data, message_id)
+        except PublishError as e:
+            if isinstance(e.__cause__, asyncio.TimeoutError):
+                return PlainTextResponse('Message Acknowledged (Publishing Timeout)', status_code=200)
+            return PlainTextResponse('Message Acknowledged (Publishing Error)', status_code=200)
+
+        if outcome == PUBLISHED:
             end_time = datetime.utcnow()
             processing_duration = (end_time - start_time).total_seconds()
             logger.info(f"Message processing completed in {processing_duration:.2f} seconds")
-            
-            return 'OK - Message Processed and AI Result Published (Simplified)', 200
-        else:
-            reason = summary_from_gemini.split("Reason:")[-1].strip() if "Reason:" in summary_from_gemini else "Unknown"
-            logger.info(f"Gemini indicated to discard incident {incident_id}. Reason: {reason}")
-            # Initialize the Firebase Admin SDK if not already done
-            update_specific_report(doc_id,'Discarded',reason)
-            logger.info(f"Skipping publishing for incident {incident_id} due to insufficient summary.   ")
-            return 'OK - Message Processed but No Valid Summary to Publish', 200
+
+            return PlainTextResponse('OK - Message Processed and AI Result Published (Simplified)', status_code=200)
+        return PlainTextResponse('OK - Message Processed but No Valid Summary to Publish', status_code=200)
     except (InvalidArgument, ResourceExhausted) as e:
         logger.error(f"Gemini API error: {e}", exc_info=True)
         # Return 200 OK for Pub/Sub to prevent retries on application errors
-        return 'Internal Server Error: Gemini API Issue', 200
+        return PlainTextResponse('Internal Server Error: Gemini API Issue', status_code=200)
     except GoogleAPIError as e:
         logger.error(f"Gemini API general error: {e}", exc_info=True)
-        return 'Internal Server Error: Gemini API General Issue', 200
-    except json.JSONDecodeError as e:
-        logger.error(f"JSON decoding error: {e}", exc_info=True)
+        return PlainTextResponse('Internal Server Error: Gemini API General Issue', status_code=200)
+    except ValueError as e:
+        # json.JSONDecodeError and the codec's decoding errors are ValueErrors
+        logger.error(f"Message decoding error: {e}", exc_info=True)
         # Return 200 OK for Pub/Sub to prevent retries, even on malformed messages
-        return 'Message Acknowledged (JSON Error)', 200
+        return PlainTextResponse('Message Acknowledged (JSON Error)', status_code=200)
     except Exception as e:
         logger.error(f"Unexpected error: {e}", exc_info=True)
         # Return 200 OK for Pub/Sub to prevent retries
-        return 'Message Acknowledged (Internal Error)', 200
+        return PlainTextResponse('Message Acknowledged (Internal Error)', status_code=200)
+
+@app.get("/cache/stats")
+async def cache_stats():
+    """Hit / miss / eviction counters of this instance's summary cache."""
+    summary_cache = _summary_cache
+    return summary_cache.stats() if summary_cache is not None else {"enabled": LLM_CACHE_ENABLED}
+
 
-# Wrap the Flask app with WSGIMiddleware to make it compatible with Uvicorn
-asgi_app = WSGIMiddleware(app)
+@app.get("/limiter/stats")
+async def limiter_stats():
+    """Current Gemini concurrency limit, calls in flight, queue depth and queue wait times."""
+    return gemini_limiter.stats()
+
+
+@app.get("/batcher/stats")
+async def batcher_stats():
+    """Items, batches and parse fallbacks of this instance's Gemini micro-batcher."""
+    summary_batcher = _summary_batcher
+    return summary_batcher.stats() if summary_batcher is not None else {"enabled": GEMINI_BATCH_ENABLED}
+
+
+@app.get("/prefilter/stats")
+async def prefilter_stats():
+    """Pre-filter verdict counts of this instance; llm_calls_avoided_share is the share of reports discarded without a Gemini call."""
+    prefilter = _prefilter
+    return prefilter.stats() if prefilter is not None else {"enabled": PREFILTER_ENABLED}
+
+
+# The Dockerfile's gunicorn command serves 'main:asgi_app'; the app is native ASGI now, no WSGI wrapper
+asgi_app = app
 
 # For local development
 if __name__ == '__main__':
@@ -272,7 +574,6 @@ if __name__ == '__main__':
     # Load environment variables for local run
     from dotenv import load_dotenv
     load_dotenv()
-    
+
     port = int(os.environ.get('PORT', 8080))
-    # Run the Flask app directly with Uvicorn
-    uvicorn.run(asgi_app, host='0.0.0.0',port=port)
\ No newline at end of file
+    uvicorn.run(asgi_app, host='0.0.0.0',port=port)
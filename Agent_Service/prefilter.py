@@ -0,0 +1,142 @@
+# prefilter.py
+import math
+import re
+from collections import Counter
+
+_WORD_RE = re.compile(r"[a-z]+(?:'[a-z]+)?")
+_CLAUSE_RE = re.compile(r"[.,;:!?\n]+")
+_ALPHABET = "abcdefghijklmnopqrstuvwxyz'^$"  # ^ / $ mark word boundaries in the bigram model
+
+REJECT = 'reject'
+AMBIGUOUS = 'ambiguous'
+VALID = 'valid'
+
+# Stock non-complaints; a report made up only of these clauses is rejected ("No issues, just a routine check.")
+DEFAULT_BLOCKLIST = (
+    "no issues", "no issue", "no problem", "no problems", "no complaints", "nothing", "nothing to report",
+    "routine check", "just a routine check", "just checking", "test", "testing", "test report", "this is a test",
+    "hello", "hi", "hey", "ok", "okay", "thanks", "thank you", "ignore", "ignore this", "please ignore",
+    "asdf", "qwerty", "none", "na", "n a", "nil", "blah", "blah blah", "blah blah blah",
+)
+
+
+def _words(text):
+    return _WORD_RE.findall(text.lower())
+
+
+class ComplaintPrefilter:
+    """
+    Local checks that reject obvious non-complaints before a Gemini call. Only clear
+    cases are rejected; everything else is 'valid' or 'ambiguous' and still goes to the
+    model. Signals:
+
+    - length: fewer than `min_letters` letters (in any script);
+    - blocklist: every clause of the report is a stock non-complaint ("No issues, just a routine check.");
+    - dictionary-word ratio: share of words found in the vocabulary;
+    - character n-gram entropy: cross-entropy, in bits per character, of the text under a
+      character bigram model trained on the vocabulary. Keyboard mashes ("oquehfqnl") score
+      far above English or transliterated Tamil words. A report is gibberish only when no
+      word is in the vocabulary and it scores above `max_bits_per_char`;
+    - repetition: Shannon entropy of the letter distribution below `min_letter_entropy`
+      ("aaaaaaa", "hahahaha").
+
+    The vocabulary and bigram model only cover ASCII letters, so a report with any other
+    letters (Tamil or Hindi script, accented words) is never rejected past the length check:
+    it is 'ambiguous' and goes to the model.
+    """
+
+    def __init__(self, vocabulary, blocklist=DEFAULT_BLOCKLIST, min_letters=3, max_bits_per_char=5.0,
+                 min_letter_entropy=1.5, valid_word_ratio=0.5):
+        self.vocabulary = frozenset(word.lower() for word in vocabulary)
+        self.blocklist = frozenset(' '.join(_words(phrase)) for phrase in blocklist)
+        self.min_letters = min_letters
+        self.max_bits_per_char = max_bits_per_char
+        self.min_letter_entropy = min_letter_entropy
+        self.valid_word_ratio = valid_word_ratio
+        self._log_probs = self._train(self.vocabulary)
+        self.checked = 0
+        self.verdicts = Counter()
+
+    @classmethod
+    def from_file(cls, path, **kwargs):
+        with open(path, 'r', encoding='utf-8') as f:
+            words = [word for line in f if not line.startswith('#') for word in _words(line)]
+        return cls(words, **kwargs)
+
+    @staticmethod
+    def _train(vocabulary):
+        """log2 P(next char | char) with add-one smoothing over the vocabulary's words."""
+        counts = Counter()
+        for word in vocabulary:
+            padded = f"^{word}$"
+            counts.update(zip(padded, padded[1:]))
+        totals = Counter()
+        for (first, _), count in counts.items():
+            totals[first] += count
+        return {(first, second): math.log2((counts[(first, second)] + 1) / (totals[first] + len(_ALPHABET)))
+                for first in _ALPHABET for second in _ALPHABET}
+
+    def bits_per_char(self, words):
+        bits = 0.0
+        transitions = 0
+        for word in words:
+            padded = f"^{word}$"
+            for pair in zip(padded, padded[1:]):
+                bits -= self._log_probs.get(pair, -math.log2(len(_ALPHABET)))
+                transitions += 1
+        return bits / transitions if transitions else 0.0
+
+    @staticmethod
+    def letter_entropy(letters):
+        counts = Counter(letters)
+        total = len(letters)
+        return -sum(count / total * math.log2(count / total) for count in counts.values()) if total else 0.0
+
+    def check(self, text):
+        """
+        Returns (verdict, reason, scores): verdict is 'reject' (do not call the model;
+        `reason` says why), 'ambiguous' or 'valid'.
+        """
+        text = text or ''
+        all_letters = [char for char in text if char.isalpha()]
+        other_letters = sum(1 for char in all_letters if not char.isascii())
+        words = _words(text)
+        letters = ''.join(words).replace("'", '')
+        scores = {"letters": len(all_letters), "words": len(words)}
+
+        if len(all_letters) < self.min_letters:
+            return self._verdict(REJECT, "The Complaint has no valid information.", scores)
+        if other_letters:
+            scores["non_ascii_letters"] = other_letters
+            return self._verdict(AMBIGUOUS, None, scores)
+        clauses = [' '.join(_words(clause)) for clause in _CLAUSE_RE.split(text.lower())]
+        if all(clause in self.blocklist for clause in clauses if clause):
+            return self._verdict(REJECT, "Not a valid complaint.", scores)
+
+        known = sum(1 for word in words if word in self.vocabulary)
+        scores["word_ratio"] = round(known / len(words), 3)
+        scores["bits_per_char"] = round(self.bits_per_char(words), 3)
+        scores["letter_entropy"] = round(self.letter_entropy(letters), 3)
+
+        if known == 0 and scores["bits_per_char"] > self.max_bits_per_char:
+            return self._verdict(REJECT, "The Complaint has no valid information.", scores)
+        if len(letters) >= 6 and scores["letter_entropy"] < self.min_letter_entropy:
+            return self._verdict(REJECT, "The Complaint has no valid information.", scores)
+        if scores["word_ratio"] >= self.valid_word_ratio:
+            return self._verdict(VALID, None, scores)
+        return self._verdict(AMBIGUOUS, None, scores)
+
+    def _verdict(self, verdict, reason, scores):
+        self.checked += 1
+        self.verdicts[verdict] += 1
+        return verdict, reason, scores
+
+    def stats(self):
+        """Verdict counts and the share of checked reports that never reached the model."""
+        return {
+            "checked": self.checked,
+            "rejected": self.verdicts[REJECT],
+            "ambiguous": self.verdicts[AMBIGUOUS],
+            "valid": self.verdicts[VALID],
+            "llm_calls_avoided_share": round(self.verdicts[REJECT] / self.checked, 3) if self.checked else None,
+        }
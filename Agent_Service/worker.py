@@ -0,0 +1,132 @@
+# worker.py (streaming-pull entry point: python worker.py)
+# Alternative to the push endpoint in main.py: one long-lived process pulls processed-events
+# over a streaming-pull subscription and runs the same process_incident() on one asyncio loop,
+# so Gemini calls from many messages share the summary cache and the micro-batcher.
+import asyncio
+import concurrent.futures
+import logging
+import signal
+import threading
+from collections import Counter
+
+from google.cloud import pubsub_v1
+
+from config import (
+    GCP_PROJECT_ID,
+    PROCESSED_EVENTS_SUBSCRIPTION_NAME,
+    WORKER_MAX_MESSAGES,
+    WORKER_MAX_BYTES,
+    WORKER_CONCURRENCY,
+    WORKER_MAX_LEASE_SECONDS,
+    WORKER_MIN_LEASE_EXTENSION_SECONDS,
+    WORKER_STATS_INTERVAL_SECONDS
+)
+from codec import MessageDecodeError, decode_message
+from main import gemini_limiter, get_gemini_model, process_incident
+
+logger = logging.getLogger(__name__)
+
+# Failures a redelivery would only repeat: acked and dropped. Complaints the model rejects or
+# cannot answer are not among them; process_incident() marks those reports Discarded.
+PERMANENT_ERRORS = (MessageDecodeError,)
+
+
+class StreamingWorker:
+    """
+    Processes streamed messages on an asyncio loop running in a background thread, at most
+    `concurrency` at a time. The subscriber's callback threads only hand messages over.
+
+    A message is acked once it was published or discarded, or when it fails with one of
+    PERMANENT_ERRORS. Any other failure (Gemini timeout or quota, publish error, failed
+    'Discarded' status write) nacks it for redelivery, paced by the subscription's retry
+    policy; with a dead-letter topic configured, delivery_attempt is logged.
+    """
+
+    def __init__(self, concurrency=WORKER_CONCURRENCY):
+        self.concurrency = concurrency
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self.loop.run_forever, name='agent-worker-loop', daemon=True)
+        self._slots = None
+        self.in_flight = 0
+        self.counts = Counter()
+
+    def start(self):
+        """Starts the loop and initializes Gemini before any message is pulled, so a bad setup fails fast."""
+        self._thread.start()
+        asyncio.run_coroutine_threadsafe(self._setup(), self.loop).result()
+
+    async def _setup(self):
+        self._slots = asyncio.Semaphore(self.concurrency)
+        await get_gemini_model()
+
+    def stop(self):
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join(timeout=5)
+
+    def callback(self, message):
+        asyncio.run_coroutine_threadsafe(self.handle(message), self.loop)
+
+    async def handle(self, message):
+        self.in_flight += 1
+        try:
+            async with self._slots:
+                incident_data = decode_message(message.data, dict(message.attributes))
+                outcome = await process_incident(incident_data, message.message_id, gemini_fallback=False,
+                                                 raise_status_errors=True)
+        except PERMANENT_ERRORS as e:
+            logger.error(f"Dropping message {message.message_id}: {e}", exc_info=True)
+            self.counts['dropped'] += 1
+            message.ack()
+        except Exception as e:
+            logger.warning(f"Message {message.message_id} failed (delivery attempt {message.delivery_attempt}), nacking for redelivery: {e!r}")
+            self.counts['nacked'] += 1
+            message.nack()
+        else:
+            self.counts[outcome] += 1
+            message.ack()
+        finally:
+            self.in_flight -= 1
+
+    def stats(self):
+        return {"in_flight": self.in_flight, **self.counts, "gemini_limiter": gemini_limiter.stats()}
+
+
+def main():
+    worker = StreamingWorker()
+    worker.start()
+
+    subscriber = pubsub_v1.SubscriberClient()
+    subscription_path = subscriber.subscription_path(GCP_PROJECT_ID, PROCESSED_EVENTS_SUBSCRIPTION_NAME)
+    flow_control = pubsub_v1.types.FlowControl(
+        max_messages=WORKER_MAX_MESSAGES,
+        max_bytes=WORKER_MAX_BYTES,
+        max_lease_duration=WORKER_MAX_LEASE_SECONDS,
+        min_duration_per_lease_extension=WORKER_MIN_LEASE_EXTENSION_SECONDS,
+    )
+    streaming_pull_future = subscriber.subscribe(subscription_path, callback=worker.callback, flow_control=flow_control)
+    logger.info(f"Listening on {subscription_path} (max {WORKER_MAX_MESSAGES} messages / {WORKER_MAX_BYTES} bytes outstanding, "
+                f"{WORKER_CONCURRENCY} processed at a time).")
+
+    # Stop pulling on SIGTERM; messages still in flight are not acked and get redelivered
+    signal.signal(signal.SIGTERM, lambda signum, frame: streaming_pull_future.cancel())
+    with subscriber:
+        try:
+            while True:
+                try:
+                    streaming_pull_future.result(timeout=WORKER_STATS_INTERVAL_SECONDS)
+                    break
+                except concurrent.futures.TimeoutError:
+                    logger.info(f"Worker stats: {worker.stats()}")
+        except KeyboardInterrupt:
+            streaming_pull_future.cancel()
+            streaming_pull_future.result()
+        except Exception as e:
+            logger.error(f"Streaming pull stopped: {e}", exc_info=True)
+            raise
+        finally:
+            logger.info(f"Worker stopped: {worker.stats()}")
+            worker.stop()
+
+
+if __name__ == '__main__':
+    main()
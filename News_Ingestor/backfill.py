@@ -0,0 +1,134 @@
+# backfill.py
+# Resumable historical backfill for one query from queries.json.
+# Usage: python backfill.py --query default_search_query --start 2025-09-01 --end 2025-10-01 [--window day|hour]
+import argparse
+import asyncio
+import json
+import logging
+import os
+from datetime import datetime, timedelta, timezone
+
+import main
+from newsapi_client import RequestBudget, RequestBudgetExceeded
+from watermark import format_timestamp, parse_timestamp
+
+logger = logging.getLogger(__name__)
+
+WINDOW_SIZES = {'day': timedelta(days=1), 'hour': timedelta(hours=1)}
+
+# Page cap per window; historical windows are usually much larger than what the live run
+# (NEWS_MAX_PAGES) sees. A window with more results than this is not checkpointed: rerun
+# with a larger cap or a smaller --window.
+BACKFILL_MAX_PAGES = int(os.environ.get('BACKFILL_MAX_PAGES', '50'))
+
+
+def split_windows(start, end, window):
+    """Splits [start, end) into consecutive (from, to) windows; NewsAPI's 'to' is inclusive, so it stops 1s short."""
+    step = WINDOW_SIZES[window]
+    windows = []
+    current = start
+    while current < end:
+        window_end = min(current + step, end)
+        windows.append((format_timestamp(current), format_timestamp(window_end - timedelta(seconds=1))))
+        current = window_end
+    return windows
+
+
+class BackfillCheckpoint:
+    """Completed windows (window start -> articles written), saved atomically after each window."""
+
+    def __init__(self, path):
+        self.path = path
+        self.completed = {}
+        if os.path.exists(path):
+            with open(path, 'r') as f:
+                self.completed = json.load(f).get('completed', {})
+            logger.info(f"Resuming backfill: {len(self.completed)} windows already done per {path}")
+        self._lock = asyncio.Lock()
+
+    async def mark_done(self, window_start, written):
+        async with self._lock:
+            self.completed[window_start] = written
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, 'w') as f:
+                json.dump({"completed": self.completed}, f, indent=2, sort_keys=True)
+            os.replace(tmp_path, self.path)
+
+
+async def backfill_window(query_name, query, window_from, window_to, budget, checkpoint, max_pages=BACKFILL_MAX_PAGES):
+    articles, complete = await main.fetch_all_articles(query, window_from, page_size=main.NEWS_PAGE_SIZE, max_pages=max_pages,
+                                                       budget=budget, to_date=window_to)
+    if not articles and complete:
+        logger.info(f"[{window_from} .. {window_to}] no articles; skipping")
+        await checkpoint.mark_done(window_from, 0)
+        return 0
+
+    result = await main.store_articles([(article, [query_name]) for article in articles], {query_name: query})
+    if result["sinks"]["docs_failed"]:
+        logger.warning(f"[{window_from} .. {window_to}] {result['sinks']['docs_failed']} writes failed; window left for the next resume")
+        return result["sinks"]["docs_written"]
+    if not complete:
+        # A page failed (or ran out of request budget) or max_pages stopped short of totalResults
+        logger.warning(f"[{window_from} .. {window_to}] fetched only part of the window; window left for the next resume")
+        return result["sinks"]["docs_written"]
+
+    await checkpoint.mark_done(window_from, result["sinks"]["docs_written"])
+    logger.info(f"[{window_from} .. {window_to}] fetched {len(articles)}, wrote {result['sinks']['docs_written']}")
+    return result["sinks"]["docs_written"]
+
+
+async def run_backfill(query_name, start, end, window='day', concurrency=4, checkpoint_path=None, max_requests=1000, max_pages=BACKFILL_MAX_PAGES):
+    query = main._queries.get(query_name)
+    if not query:
+        raise SystemExit(f"Unknown query name '{query_name}'; choose one of {list(main._queries)}")
+
+    checkpoint_path = checkpoint_path or f"backfill_{query_name}_{start:%Y%m%d%H}_{end:%Y%m%d%H}_{window}.json"
+    checkpoint = BackfillCheckpoint(checkpoint_path)
+    windows = [(window_from, window_to) for window_from, window_to in split_windows(start, end, window) if window_from not in checkpoint.completed]
+    logger.info(f"Backfilling '{query_name}' over {len(windows)} remaining {window} windows with concurrency={concurrency}")
+
+    budget = RequestBudget(max_requests)
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+
+    async def run_window(window_from, window_to):
+        async with semaphore:
+            return await backfill_window(query_name, query, window_from, window_to, budget, checkpoint, max_pages)
+
+    try:
+        results = await asyncio.gather(*(run_window(*w) for w in windows), return_exceptions=True)
+    finally:
+        await main.close_clients()
+
+    written = sum(result for result in results if isinstance(result, int))
+    failures = [result for result in results if isinstance(result, BaseException)]
+    for failure in failures:
+        if isinstance(failure, RequestBudgetExceeded):
+            logger.warning(f"{failure}; rerun the same command to resume.")
+        else:
+            logger.error(f"Window failed: {failure!r}")
+    logger.info(f"Backfill finished: {written} articles written, {len(failures)} windows failed, {budget.used} NewsAPI requests used.")
+    return written, failures
+
+
+def _parse_args():
+    parser = argparse.ArgumentParser(description="Backfill historical news for one query from queries.json.")
+    parser.add_argument('--query', required=True, help="Query name from queries.json")
+    parser.add_argument('--start', required=True, help="Range start (ISO date or timestamp, UTC)")
+    parser.add_argument('--end', default=None, help="Range end, exclusive (default: now)")
+    parser.add_argument('--window', choices=sorted(WINDOW_SIZES), default='day')
+    parser.add_argument('--concurrency', type=int, default=main.NEWS_FETCH_CONCURRENCY)
+    parser.add_argument('--checkpoint', default=None, help="Checkpoint file (default derived from the arguments)")
+    parser.add_argument('--max-requests', type=int, default=1000, help="NewsAPI request budget for this run")
+    parser.add_argument('--max-pages', type=int, default=BACKFILL_MAX_PAGES, help="Page cap per window; larger windows are not checkpointed")
+    return parser.parse_args()
+
+
+if __name__ == '__main__':
+    args = _parse_args()
+    start = parse_timestamp(args.start)
+    end = parse_timestamp(args.end) if args.end else datetime.now(timezone.utc)
+    if start is None or end is None or start >= end:
+        raise SystemExit("--start must be a valid timestamp before --end")
+
+    _, failures = asyncio.run(run_backfill(args.query, start, end, args.window, args.concurrency, args.checkpoint, args.max_requests, args.max_pages))
+    raise SystemExit(1 if failures else 0)
@@ -0,0 +1,96 @@
+# bench_codec.py
+# Compares Pub/Sub payload encodings on realistic messages: raw news articles (as the
+# ingestor publishes them) and AI-analyzed incidents (as AI_Agent publishes them).
+# Reports payload bytes, bytes in a base64 push envelope and encode / decode time.
+# Usage: python bench_codec.py [num_messages]
+import base64
+import json
+import random
+import sys
+import time
+
+import main
+from bench_near_duplicates import make_story
+from codec import MessageCodec, decode_message
+
+AREAS = ["Velachery", "Anna Nagar", "T. Nagar", "Adyar", "Tambaram", "Guindy", "Porur", "Perambur"]
+ISSUES = [
+    "Huge pothole near the bus stop, two-wheelers are skidding every evening",
+    "Streetlights on the main road have been off for a week and the stretch is very dark",
+    "Garbage has not been collected for days and is spilling onto the footpath",
+    "Waterlogging after last night's rain, the subway is completely flooded",
+    "Chain snatching reported near the market, residents are scared to walk at night",
+]
+
+
+def make_article(index, rng):
+    story = make_story(rng)
+    return {
+        "title": f"{story['title']} {rng.choice(AREAS)}",
+        "description": story["description"],
+        "content": story["content"],
+        "url": f"https://news.example.com/chennai/{index}",
+        "publishedAt": "2025-10-01T09:30:00Z",
+        "source": {"name": "Example News"},
+        "author": "Staff Reporter",
+    }
+
+
+def make_incident(index, rng):
+    area = rng.choice(AREAS)
+    description = f"{rng.choice(ISSUES)} in {area}. {make_story(rng)['description']}"
+    return {
+        "originalReportId": f"report-{index:06d}",
+        "firestoreDocId": f"{rng.getrandbits(80):020x}",
+        "description": description,
+        "location": {"latitude": round(12.9 + rng.random() * 0.3, 6), "longitude": round(80.1 + rng.random() * 0.2, 6)},
+        "mediaUrls": [f"https://storage.googleapis.com/urbanlytic-media/{rng.getrandbits(64):016x}.jpg" for _ in range(rng.randint(0, 3))],
+        "ingestedAt": "2025-10-01T10:00:00Z",
+        "aiProcessedAt": "2025-10-01T10:00:04.512Z",
+        "status": "AI_Analyzed",
+        "incidentAnalysis": {
+            "category": "Road Hazard", "severity": rng.choice(["low", "medium", "high"]), "confidence": round(rng.random(), 3),
+            "summary": description[:160], "affectedArea": area, "recommendedActions": ["Dispatch road maintenance crew", "Place warning signage"],
+            "predictedImpact": {"duration": "2-4 hours", "affectedCommuters": rng.randint(100, 5000), "spreadDirection": "N/A"},
+        },
+        "moodAnalysis": {"sentiment": "negative", "score": round(-rng.random(), 3), "emotions": {"anger": 0.41, "fear": 0.22, "frustration": 0.67}},
+        "crimeAnalysis": {"isCrime": rng.random() < 0.2, "crimeType": None, "riskLevel": "low", "keywords": ["snatching", "theft"]},
+    }
+
+
+def measure(encode, decode, payloads):
+    start = time.perf_counter()
+    encoded = [encode(payload) for payload in payloads]
+    encode_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    for data, attributes in encoded:
+        decode(data, attributes)
+    decode_seconds = time.perf_counter() - start
+    size = sum(len(data) for data, _ in encoded)
+    push_size = sum(len(base64.b64encode(data)) for data, _ in encoded)
+    return size / len(payloads), push_size / len(payloads), encode_seconds / len(payloads) * 1e6, decode_seconds / len(payloads) * 1e6
+
+
+def run(num_messages):
+    rng = random.Random(5)
+    articles = [main.normalize_article(make_article(index, rng), ['q'], {'q': 'Chennai'}) for index in range(num_messages)]
+    incidents = [make_incident(index, rng) for index in range(num_messages)]
+
+    # What every hop does today: json.dumps(...).encode('utf-8') with the default separators
+    variants = [("json.dumps (current)", lambda payload: (json.dumps(payload).encode('utf-8'), {}), lambda data, attributes: json.loads(data.decode('utf-8')))]
+    for name, codec in [("compact json", MessageCodec('json')), ("msgpack", MessageCodec('msgpack')),
+                        ("json + zstd", MessageCodec('json', compress_threshold=1)), ("msgpack + zstd", MessageCodec('msgpack', compress_threshold=1))]:
+        variants.append((name, codec.encode, decode_message))
+
+    for label, payloads in (("news articles", articles), ("analyzed incidents", incidents)):
+        print(f"\n{label} ({num_messages} messages)")
+        print(f"{'codec':<22}{'bytes':>9}{'push (b64)':>12}{'encode us':>11}{'decode us':>11}")
+        baseline = None
+        for name, encode, decode in variants:
+            size, push_size, encode_us, decode_us = measure(encode, decode, payloads)
+            baseline = baseline or size
+            print(f"{name:<22}{size:>9.0f}{push_size:>12.0f}{encode_us:>11.1f}{decode_us:>11.1f}   ({size / baseline:.0%})")
+
+
+if __name__ == '__main__':
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 5000)
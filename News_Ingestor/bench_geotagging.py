@@ -0,0 +1,81 @@
+# bench_geotagging.py
+# Benchmarks gazetteer geotagging over synthetic news articles, against a naive
+# per-name substring scan, with the real gazetteer padded out to thousands of places.
+# Usage: python bench_geotagging.py [num_articles] [num_places]
+import os
+import random
+import sys
+import time
+
+from geotagging import Gazetteer, tokenize
+
+FILLER = (
+    "chennai traffic accident crime pothole flood pollution infrastructure police residents "
+    "commuters rain waterlogging bridge signal junction diversion repair works drainage canal "
+    "garbage collision lorry two-wheeler pedestrian injured arrested hospital minister announced "
+    "project crore tender completed delayed monsoon alert schools closed corporation ward officials"
+).split()
+SUFFIXES = ["Nagar", "Street", "Main Road", "Colony", "Extension", "Cross Street", "Salai", "Junction"]
+
+
+def synthetic_places(base_places, count, rng):
+    """Real places plus generated '<Place> <n>th <suffix>' style names near them."""
+    places = list(base_places)
+    while len(places) < count:
+        base = rng.choice(base_places)
+        places.append({
+            "name": f"{base['name']} {rng.randint(1, 40)}th {rng.choice(SUFFIXES)}",
+            "type": "road",
+            "lat": base['lat'] + rng.uniform(-0.01, 0.01),
+            "lng": base['lng'] + rng.uniform(-0.01, 0.01),
+        })
+    return places
+
+
+def make_article(places, rng):
+    def sentence(words, mentions):
+        tokens = rng.choices(FILLER, k=words)
+        for _ in range(mentions):
+            tokens.insert(rng.randrange(len(tokens) + 1), rng.choice(places)['name'])
+        return ' '.join(tokens)
+    return {
+        "title": sentence(10, rng.randint(0, 1)),
+        "description": sentence(30, rng.randint(0, 2)),
+        "content": sentence(40, rng.randint(0, 2)),
+    }
+
+
+def naive_tag(names, article):
+    text = ' '.join(filter(None, (article.get('title'), article.get('description'), article.get('content')))).lower()
+    return [name for name in names if name in text]
+
+
+def main(num_articles=20000, num_places=5000, seed=7):
+    rng = random.Random(seed)
+    base = Gazetteer.from_file(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'gazetteer.json')).places
+    places = synthetic_places(base, num_places, rng)
+    articles = [make_article(places, rng) for _ in range(num_articles)]
+
+    start = time.perf_counter()
+    gazetteer = Gazetteer(places)
+    build_ms = (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    tagged = sum(1 for article in articles if gazetteer.tag(article)["location"] is not None)
+    elapsed = time.perf_counter() - start
+
+    names = [' '.join(tokenize(place['name'])) for place in places]
+    naive_sample = articles[:max(1, num_articles // 20)]
+    start = time.perf_counter()
+    for article in naive_sample:
+        naive_tag(names, article)
+    naive_elapsed = time.perf_counter() - start
+
+    print(f"places:            {len(gazetteer)} ({len(gazetteer._goto)} automaton states, built in {build_ms:.1f} ms)")
+    print(f"articles:          {num_articles}, {tagged} geotagged")
+    print(f"aho-corasick:      {elapsed / num_articles * 1e6:.1f} us/article ({num_articles / elapsed:,.0f} articles/s)")
+    print(f"naive substring:   {naive_elapsed / len(naive_sample) * 1e6:.1f} us/article (sample of {len(naive_sample)})")
+
+
+if __name__ == '__main__':
+    main(*(int(arg) for arg in sys.argv[1:3]))
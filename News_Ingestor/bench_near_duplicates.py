@@ -0,0 +1,74 @@
+# bench_near_duplicates.py
+# Benchmarks MinHash/LSH near-duplicate clustering over synthetic news articles.
+# Usage: python bench_near_duplicates.py [num_articles]
+import random
+import sys
+import time
+from itertools import accumulate
+
+from near_duplicates import NearDuplicateIndex, article_text
+
+WORDS = (
+    "chennai traffic accident crime pothole flood pollution infrastructure road metro bus "
+    "police station corporation ward commissioner residents commuters rain waterlogging "
+    "anna salai omr ecr velachery adyar tambaram guindy porur t nagar mylapore egmore "
+    "bridge flyover signal junction diversion repair works drainage canal lake garbage "
+    "collision lorry two-wheeler pedestrian injured arrested theft chain snatching hospital "
+    "minister announced project crore tender completed delayed monsoon alert schools closed"
+).split()
+# Pad the topical words with a Zipf-ish tail of synthetic tokens so stories differ like real copy does
+VOCABULARY = WORDS + [f"w{index}" for index in range(5000)]
+CUM_WEIGHTS = list(accumulate([50] * len(WORDS) + [20 / (rank + 1) ** 0.5 for rank in range(5000)]))
+SOURCES = ["The Hindu", "Times of India", "DT Next", "New Indian Express", "News18", "India Today"]
+
+
+def make_story(rng):
+    return {
+        "title": ' '.join(rng.choices(VOCABULARY, cum_weights=CUM_WEIGHTS, k=10)),
+        "description": ' '.join(rng.choices(VOCABULARY, cum_weights=CUM_WEIGHTS, k=30)),
+        "content": ' '.join(rng.choices(VOCABULARY, cum_weights=CUM_WEIGHTS, k=40)),
+    }
+
+
+def rewrite(story, rng):
+    """A wire-copy variant: a slightly different title from another source."""
+    title = story["title"].split()
+    title[rng.randrange(len(title))] = rng.choice(WORDS)
+    return {**story, "title": ' '.join(title), "source_name": rng.choice(SOURCES)}
+
+
+def main(num_articles=100000, duplicate_ratio=0.3, seed=42):
+    rng = random.Random(seed)
+    articles = []
+    originals = []
+    for index in range(num_articles):
+        if originals and rng.random() < duplicate_ratio:
+            origin = rng.randrange(len(originals))
+            articles.append((f"a{index}", rewrite(originals[origin][1], rng), originals[origin][0]))
+        else:
+            story = make_story(rng)
+            originals.append((f"a{index}", story))
+            articles.append((f"a{index}", story, None))
+
+    index = NearDuplicateIndex(max_entries=num_articles)
+    start = time.perf_counter()
+    detected = false_merges = expected = 0
+    for key, story, origin in articles:
+        cluster_id, _ = index.assign_cluster(key, article_text(story))
+        if origin is not None:
+            expected += 1
+            if cluster_id == origin:
+                detected += 1
+        elif cluster_id != key:
+            false_merges += 1
+    elapsed = time.perf_counter() - start
+
+    print(f"articles:          {num_articles}")
+    print(f"elapsed:           {elapsed:.2f} s ({num_articles / elapsed:,.0f} articles/s, {elapsed / num_articles * 1e6:.1f} us/article)")
+    print(f"near-dups found:   {detected}/{expected} ({detected / max(expected, 1):.1%})")
+    print(f"false merges:      {false_merges}")
+    print(f"index entries:     {len(index)}")
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
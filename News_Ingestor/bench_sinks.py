@@ -0,0 +1,66 @@
+# bench_sinks.py
+# Local throughput benchmark with no cloud services: synthetic NewsAPI articles go through
+# the full store_articles() pipeline into the JSONL sink, then straight into the sinks alone.
+# Usage: python bench_sinks.py [num_articles]
+import asyncio
+import os
+import random
+import sys
+import tempfile
+import time
+
+OUTPUT_DIR = tempfile.mkdtemp(prefix='bench_sinks_')
+os.environ['NEWS_SINKS'] = 'jsonl'
+os.environ['NEWS_OUTPUT_DIR'] = OUTPUT_DIR
+os.environ['PREWARM_CLIENTS'] = 'false'
+
+import main  # noqa: E402
+from bench_near_duplicates import make_story  # noqa: E402
+from sinks import FanOutSink, JsonlFileSink  # noqa: E402
+
+PLACES = ["Velachery", "Anna Salai", "T. Nagar", "OMR", "Tambaram", "Marina Beach", "Adyar", "Koyambedu"]
+
+
+def make_articles(num_articles, rng):
+    articles = []
+    for index in range(num_articles):
+        story = make_story(rng)
+        articles.append({
+            "title": f"{story['title']} {rng.choice(PLACES)}",
+            "description": story["description"],
+            "content": story["content"],
+            "url": f"https://news.example.com/chennai/{index}?utm_source=feed",
+            "publishedAt": f"2025-10-{1 + index % 28:02d}T{index % 24:02d}:00:00Z",
+            "source": {"name": "Example News"},
+            "author": None,
+        })
+    return articles
+
+
+async def bench_sink(sink, records):
+    start = time.perf_counter()
+    for data, doc_id in records:
+        await sink.add(data, doc_id=doc_id)
+    await sink.close()
+    return time.perf_counter() - start
+
+
+async def run(num_articles):
+    articles = make_articles(num_articles, random.Random(3))
+
+    start = time.perf_counter()
+    result = await main.store_articles([(article, ['default_search_query']) for article in articles], {'default_search_query': 'Chennai'})
+    pipeline_elapsed = time.perf_counter() - start
+
+    records = [(main.normalize_article(article, ['q'], {'q': 'Chennai'}), f"id{index}") for index, article in enumerate(articles)]
+    single = await bench_sink(JsonlFileSink(os.path.join(OUTPUT_DIR, 'single.jsonl')), records)
+    fan_out = await bench_sink(FanOutSink([JsonlFileSink(os.path.join(OUTPUT_DIR, f'fan_{n}.jsonl')) for n in range(3)]), records)
+
+    print(f"articles:              {num_articles} (output in {OUTPUT_DIR})")
+    print(f"store_articles -> jsonl {num_articles / pipeline_elapsed:10,.0f} articles/s  ({result['sinks']['docs_written']} written)")
+    print(f"jsonl sink alone       {num_articles / single:10,.0f} records/s")
+    print(f"fan-out to 3 jsonl     {num_articles / fan_out:10,.0f} records/s")
+
+
+if __name__ == '__main__':
+    asyncio.run(run(int(sys.argv[1]) if len(sys.argv) > 1 else 20000))
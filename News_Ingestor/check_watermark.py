@@ -0,0 +1,68 @@
+# check_watermark.py
+# Runs run_ingestion() twice with the default paging settings against a fake NewsAPI (no cloud
+# calls: file watermarks, jsonl sink) and checks that the watermark advances to the newest
+# article and that the second run only fetches what is newer.
+# Usage: python check_watermark.py [num_articles]
+import asyncio
+import os
+import sys
+import tempfile
+from datetime import datetime, timedelta, timezone
+
+_workdir = tempfile.mkdtemp(prefix='check_watermark_')
+os.environ.update({'WATERMARK_BACKEND': 'file', 'WATERMARK_FILE': os.path.join(_workdir, 'watermarks.json'),
+                   'NEWS_SINKS': 'jsonl', 'NEWS_OUTPUT_DIR': _workdir, 'PREWARM_CLIENTS': 'false'})
+import main  # noqa: E402
+from watermark import format_timestamp, parse_timestamp  # noqa: E402
+
+
+class FakeNewsApi:
+    """Serves `articles` (newest first, like sortBy=publishedAt) filtered by 'from' and paged."""
+
+    def __init__(self, articles):
+        self.articles = articles
+        self.requests = 0
+
+    async def get_json(self, params, budget=None):
+        if budget is not None:
+            budget.consume()
+        self.requests += 1
+        since = parse_timestamp(params.get('from'))
+        matching = [article for article in self.articles if since is None or parse_timestamp(article['publishedAt']) >= since]
+        page, page_size = params['page'], params['pageSize']
+        return {"status": "ok", "totalResults": len(matching), "articles": matching[(page - 1) * page_size:page * page_size]}
+
+
+def make_articles(count, newest, prefix='story'):
+    return [{"url": f"https://news.example.com/{prefix}-{index}", "title": f"Story {index}",
+             "description": "Waterlogging reported on the main road.", "source": {"name": "Example"},
+             "publishedAt": format_timestamp(newest - timedelta(minutes=2 * index))}
+            for index in range(count)]
+
+
+async def run(num_articles):
+    newest = datetime.now(timezone.utc).replace(microsecond=0) - timedelta(minutes=30)
+    news_api = FakeNewsApi(make_articles(num_articles, newest))
+    main._news_api = news_api
+    query_name = main.resolve_named_queries()[0][0]
+    store = main.get_watermark_store()
+    print(f"paginated={main.PAGINATED_FETCH}, pageSize={main.NEWS_PAGE_SIZE}, max_pages={main.NEWS_MAX_PAGES}, articles={num_articles}")
+
+    content, status = await main.run_ingestion()
+    watermark = (await store.load()).get(query_name)
+    print(f"run 1: {status} {content.get('status')}, {news_api.requests} requests, watermark {watermark}")
+    assert status == 200, content
+    assert parse_timestamp(watermark) == newest, f"watermark {watermark} did not advance to {format_timestamp(newest)}"
+
+    news_api.articles = make_articles(3, newest + timedelta(minutes=20), prefix='later') + news_api.articles
+    requests_before = news_api.requests
+    content, status = await main.run_ingestion()
+    watermark = (await store.load()).get(query_name)
+    print(f"run 2: {status} {content.get('status')}, {news_api.requests - requests_before} requests, watermark {watermark}")
+    assert parse_timestamp(watermark) == newest + timedelta(minutes=20), f"watermark {watermark} did not advance"
+    assert content['sinks']['docs_written'] == 3, content
+    print("OK")
+
+
+if __name__ == '__main__':
+    asyncio.run(run(int(sys.argv[1]) if len(sys.argv) > 1 else 250))
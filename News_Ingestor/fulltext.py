@@ -0,0 +1,167 @@
+# fulltext.py
+import asyncio
+import html
+import logging
+import re
+import time
+from urllib.parse import urlsplit
+
+import httpx
+
+from article_ids import article_id_for_url, canonicalize_url
+
+logger = logging.getLogger(__name__)
+
+_DROP_BLOCKS_RE = re.compile(r"<(script|style|noscript|template|svg|iframe|header|footer|nav|aside|form|figure)\b.*?</\1\s*>", re.IGNORECASE | re.DOTALL)
+_COMMENT_RE = re.compile(r"<!--.*?-->", re.DOTALL)
+_ARTICLE_RE = re.compile(r"<article\b[^>]*>(.*?)</article\s*>", re.IGNORECASE | re.DOTALL)
+_PARAGRAPH_RE = re.compile(r"<p\b[^>]*>(.*?)</p\s*>", re.IGNORECASE | re.DOTALL)
+_TAG_RE = re.compile(r"<[^>]+>")
+_SPACE_RE = re.compile(r"\s+")
+_HTML_CONTENT_TYPES = ('text/html', 'application/xhtml+xml')
+
+
+def html_to_text(document, min_paragraph_chars=40, max_chars=20000):
+    """
+    Main text of an HTML page with regexes only (no DOM): drops scripts, styles and
+    page chrome (header / footer / nav / aside ...), keeps the <p> paragraphs inside
+    <article> when the page has one (else anywhere), and discards short paragraphs,
+    which on news sites are almost always bylines, captions and link lists.
+    """
+    document = _DROP_BLOCKS_RE.sub(' ', _COMMENT_RE.sub(' ', document))
+    scopes = _ARTICLE_RE.findall(document) or [document]
+    paragraphs = []
+    length = 0
+    for scope in scopes:
+        for raw in _PARAGRAPH_RE.findall(scope):
+            paragraph = _SPACE_RE.sub(' ', html.unescape(_TAG_RE.sub(' ', raw))).strip()
+            if len(paragraph) < min_paragraph_chars:
+                continue
+            paragraphs.append(paragraph)
+            length += len(paragraph) + 2
+            if length >= max_chars:
+                return '\n\n'.join(paragraphs)[:max_chars]
+    return '\n\n'.join(paragraphs)
+
+
+class SkipList:
+    """
+    robots.txt-style Disallow rules: "example.com" skips the whole site (and its
+    subdomains), "example.com/premium/" skips paths starting with /premium/.
+    """
+
+    def __init__(self, rules=()):
+        self._rules = {}  # host -> [path prefixes]; '/' blocks the whole host
+        for rule in rules:
+            rule = rule.strip().lower()
+            if not rule:
+                continue
+            host, _, path = rule.partition('/')
+            self._rules.setdefault(host.removeprefix('www.'), []).append('/' + path)
+
+    def __len__(self):
+        return sum(len(prefixes) for prefixes in self._rules.values())
+
+    def is_blocked(self, url):
+        parts = urlsplit(url)
+        host = (parts.hostname or '').removeprefix('www.')
+        path = (parts.path or '/').lower()
+        labels = host.split('.')
+        for index in range(len(labels) - 1):
+            for prefix in self._rules.get('.'.join(labels[index:]), ()):
+                if path.startswith(prefix):
+                    return True
+        return False
+
+
+class FullTextFetcher:
+    """
+    Downloads article pages on the shared httpx.AsyncClient and extracts their main text.
+
+    - at most `per_domain_concurrency` downloads run against one host at a time
+      (and `max_concurrency` overall);
+    - bodies are streamed and cut off after `max_bytes`; non-HTML responses are ignored;
+    - URLs matching the skip list are never requested;
+    - extracted text is cached by canonical URL in `store` (a response_cache.DiskResponseStore),
+      including permanent misses (4xx, non-HTML, no text), so re-ingesting an article never
+      downloads it again. Timeouts, network errors and 5xx responses are not cached.
+    """
+
+    def __init__(self, http_client, store=None, skip_list=None, per_domain_concurrency=2, max_concurrency=16,
+                 max_bytes=2 * 1024 * 1024, timeout=10.0, max_chars=20000, user_agent='UrbanlyticNewsBot/1.0'):
+        self.http_client = http_client
+        self.store = store
+        self.skip_list = skip_list or SkipList()
+        self.per_domain_concurrency = per_domain_concurrency
+        self.max_bytes = max_bytes
+        self.timeout = timeout
+        self.max_chars = max_chars
+        self.headers = {'User-Agent': user_agent, 'Accept': 'text/html,application/xhtml+xml'}
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._domain_semaphores = {}
+        self.downloaded = self.cache_hits = self.skipped = self.failed = 0
+
+    def _domain_semaphore(self, url):
+        host = urlsplit(url).hostname or ''
+        semaphore = self._domain_semaphores.get(host)
+        if semaphore is None:
+            semaphore = self._domain_semaphores[host] = asyncio.Semaphore(self.per_domain_concurrency)
+        return semaphore
+
+    async def _download(self, url):
+        """Returns (status_code, decoded body or None); the body is None for non-HTML responses."""
+        async with self.http_client.stream('GET', url, headers=self.headers, timeout=self.timeout, follow_redirects=True) as response:
+            content_type = response.headers.get('Content-Type', '').split(';')[0].strip().lower()
+            if response.status_code != 200 or content_type not in _HTML_CONTENT_TYPES:
+                return response.status_code, None
+            chunks = []
+            size = 0
+            async for chunk in response.aiter_bytes():
+                chunks.append(chunk)
+                size += len(chunk)
+                if size >= self.max_bytes:
+                    logger.info(f"Truncated {url} at {self.max_bytes} bytes")
+                    break
+            return response.status_code, b''.join(chunks)[:self.max_bytes].decode(response.encoding or 'utf-8', errors='replace')
+
+    async def fetch(self, url):
+        """Main text of the article at `url`, or None if it is skipped, unavailable or has no text."""
+        if self.skip_list.is_blocked(url):
+            self.skipped += 1
+            return None
+
+        loop = asyncio.get_running_loop()
+        key = article_id_for_url(url)
+        if self.store is not None:
+            entry = await loop.run_in_executor(None, self.store.get, key)
+            if entry is not None:
+                self.cache_hits += 1
+                return entry['text']
+
+        try:
+            # Per-domain slot first, so a slow site's queue never holds global slots
+            async with self._domain_semaphore(url), self._semaphore:
+                status_code, body = await self._download(url)
+        except (httpx.HTTPError, UnicodeDecodeError, LookupError) as e:
+            self.failed += 1
+            logger.warning(f"Could not download full text of {url}: {e!r}")
+            return None
+        if status_code >= 500 or status_code == 429:
+            self.failed += 1
+            logger.warning(f"Full text download of {url} returned {status_code}; will retry on a later run")
+            return None
+
+        self.downloaded += 1
+        text = await loop.run_in_executor(None, html_to_text, body, 40, self.max_chars) if body else ''
+        text = text or None
+        if self.store is not None:
+            entry = {'url': canonicalize_url(url), 'status_code': status_code, 'text': text, 'stored_at': time.time()}
+            await loop.run_in_executor(None, self.store.put, key, entry)
+        return text
+
+    async def fetch_all(self, urls):
+        """fetch() for every URL concurrently (within the limits); results line up with `urls`."""
+        return await asyncio.gather(*(self.fetch(url) for url in urls))
+
+    def stats(self):
+        return {"downloaded": self.downloaded, "cache_hits": self.cache_hits, "skipped": self.skipped, "failed": self.failed}
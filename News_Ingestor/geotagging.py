@@ -0,0 +1,143 @@
+# geotagging.py
+import json
+import re
+from collections import deque
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+# A mention in the title says more about where a story happened than one in the body
+FIELD_WEIGHTS = (('title', 3), ('description', 2), ('content', 1))
+# Tie-breaks between equally-mentioned places: the more precise place wins
+TYPE_PRIORITY = {'landmark': 3, 'locality': 2, 'road': 1, 'city': 0}
+
+
+def tokenize(text):
+    return _TOKEN_RE.findall(text.lower())
+
+
+class Gazetteer:
+    """
+    Place names (with aliases) matched in a single pass with an Aho-Corasick automaton.
+
+    The automaton runs over word tokens rather than characters: matches always fall on
+    word boundaries ("Adyar" never matches inside "Adyarbridge"), punctuation variants
+    collapse ("T. Nagar" == "T Nagar") and an article costs one step per word, whatever
+    the number of names. Overlapping matches resolve leftmost-longest, so "Besant Nagar
+    Beach" is the landmark, not the locality.
+
+    `places` is a list of {"name", "type", "lat", "lng", "aliases"?} dicts.
+    """
+
+    def __init__(self, places):
+        self.places = list(places)
+        self._goto = [{}]
+        self._fail = [0]
+        self._outputs = [()]  # state -> ((place index, pattern length in tokens), ...)
+        self._vocabulary = set()
+        for index, place in enumerate(self.places):
+            for name in [place['name'], *place.get('aliases', ())]:
+                self._add_pattern(tokenize(name), index)
+        self._build_failure_links()
+
+    @classmethod
+    def from_file(cls, path):
+        with open(path, 'r') as f:
+            return cls(json.load(f)['places'])
+
+    def __len__(self):
+        return len(self.places)
+
+    def _add_pattern(self, tokens, place_index):
+        if not tokens:
+            return
+        self._vocabulary.update(tokens)
+        state = 0
+        for token in tokens:
+            next_state = self._goto[state].get(token)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][token] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._outputs.append(())
+            state = next_state
+        if all(existing != place_index for existing, _ in self._outputs[state]):
+            self._outputs[state] += ((place_index, len(tokens)),)
+
+    def _build_failure_links(self):
+        # Depth-1 states fail to the root (already 0); deeper ones are filled breadth-first
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for token, child in self._goto[state].items():
+                queue.append(child)
+                fallback = self._fail[state]
+                while fallback and token not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[child] = self._goto[fallback].get(token, 0)
+                # Inherit the matches of the longest proper suffix
+                self._outputs[child] += self._outputs[self._fail[child]]
+
+    def find(self, text):
+        """Returns non-overlapping (start token, end token, place index) matches, leftmost-longest."""
+        goto, fail, outputs, vocabulary = self._goto, self._fail, self._outputs, self._vocabulary
+        matches = []
+        state = 0
+        for position, token in enumerate(tokenize(text)):
+            if token not in vocabulary:
+                # Most words are in no place name: no transition anywhere, back to the root
+                state = 0
+                continue
+            while state and token not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(token, 0)
+            for place_index, length in outputs[state]:
+                matches.append((position + 1 - length, position + 1, place_index))
+        if len(matches) < 2:
+            return matches
+        matches.sort(key=lambda match: (match[0], -match[1]))
+        selected = []
+        last_end = 0
+        for match in matches:
+            if match[0] >= last_end:
+                selected.append(match)
+                last_end = match[1]
+        return selected
+
+    def tag(self, article):
+        """
+        Geotags an article dict (title / description / content). Returns
+        {"location": {"latitude", "longitude"} or None, "location_name", "location_type",
+        "localities": [matched place names, best first]}.
+
+        The best place has the highest field-weighted mention count, then the most
+        precise type, then the earliest mention. The city-level entry only wins when
+        nothing more specific was mentioned.
+        """
+        scores = {}
+        first_seen = {}
+        for field_index, (field, weight) in enumerate(FIELD_WEIGHTS):
+            text = article.get(field)
+            if not text:
+                continue
+            for start, _, place_index in self.find(text):
+                scores[place_index] = scores.get(place_index, 0) + weight
+                first_seen.setdefault(place_index, (field_index, start))
+
+        if not scores:
+            return {"location": None, "location_name": None, "location_type": None, "localities": []}
+
+        places = self.places
+
+        def rank(place_index):
+            place_type = places[place_index].get('type')
+            return (place_type == 'city', -scores[place_index], -TYPE_PRIORITY.get(place_type, 0), first_seen[place_index])
+
+        ranked = sorted(scores, key=rank)
+        best = places[ranked[0]]
+        return {
+            "location": {"latitude": best['lat'], "longitude": best['lng']},
+            "location_name": best['name'],
+            "location_type": best.get('type'),
+            "localities": [places[place_index]['name'] for place_index in ranked],
+        }
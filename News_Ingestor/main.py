@@ -1,15 +1,28 @@
 import os
 import json
 import logging
+import tempfile
 import httpx
 from datetime import datetime, timedelta, timezone 
 import asyncio
+import threading
+from contextlib import asynccontextmanager
 
 from fastapi import FastAPI, Request
 from fastapi.responses import JSONResponse
 
-from google.cloud import pubsub_v1
-from google.cloud import firestore
+from article_ids import BloomFilter, article_id_for_url, canonicalize_url
+from response_cache import DiskResponseStore, build_http_transport
+from newsapi_client import NewsApiClient, RequestBudget, RequestBudgetExceeded, TokenBucket
+from near_duplicates import NearDuplicateIndex, article_text
+from geotagging import Gazetteer
+from classifier import RuleClassifier, category_attributes
+from codec import MessageCodec
+from fulltext import FullTextFetcher, SkipList
+from publishing import create_batch_publisher
+from poller import AdaptivePoller, install_stop_signals
+from sinks import FanOutSink, FirestoreBatchSink, JsonlFileSink, ParquetFileSink, PubSubSink
+from watermark import FirestoreWatermarkStore, JsonFileWatermarkStore
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
@@ -23,20 +36,302 @@ DEFAULT_SEARCH_QUERY_ENV = os.environ.get('DEFAULT_SEARCH_QUERY', None)
 
 QUERY_NAME_TO_USE = os.environ.get('QUERY_NAME_TO_USE', 'default_search_query')
 
-db = firestore.Client()
+# Multi-query mode: run several queries from queries.json in parallel and merge the results.
+# QUERY_NAMES_TO_USE is a comma-separated list of query names, or 'all'.
+MULTI_QUERY_MODE = os.environ.get('MULTI_QUERY_MODE', 'false').lower() == 'true'
+QUERY_NAMES_TO_USE = os.environ.get('QUERY_NAMES_TO_USE', 'all')
 
-from_date = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
-HARDCODED_FROM_DATE = "2025-09-24T00:00:00Z"
 HARDCODED_PAGE_SIZE = 1
 
+# Per-query ingestion watermark: each run fetches only articles newer than the last one seen.
+# WATERMARK_BACKEND is 'firestore' or 'file' (local JSON file, for tests and local runs).
+WATERMARK_BACKEND = os.environ.get('WATERMARK_BACKEND', 'firestore')
+WATERMARK_FILE = os.environ.get('WATERMARK_FILE', os.path.join(os.path.dirname(__file__), 'watermarks.json'))
+WATERMARK_OVERLAP_MINUTES = int(os.environ.get('WATERMARK_OVERLAP_MINUTES', '10'))
+WATERMARK_FIRST_RUN_LOOKBACK_HOURS = int(os.environ.get('WATERMARK_FIRST_RUN_LOOKBACK_HOURS', '24'))
+
+# Paginated fetch: read totalResults from page 1, then pull the remaining pages concurrently.
+# On by default: watermarks only advance after a complete fetch, and a single page of
+# HARDCODED_PAGE_SIZE articles rarely covers a query's window, so with PAGINATED_FETCH=false
+# the watermarks mostly stay put and each run refetches from the first-run lookback.
+PAGINATED_FETCH = os.environ.get('PAGINATED_FETCH', 'true').lower() == 'true'
+NEWS_PAGE_SIZE = min(int(os.environ.get('NEWS_PAGE_SIZE', '100')), 100)  # NewsAPI caps pageSize at 100
+NEWS_MAX_PAGES = int(os.environ.get('NEWS_MAX_PAGES', '5'))
+NEWS_FETCH_CONCURRENCY = int(os.environ.get('NEWS_FETCH_CONCURRENCY', '4'))
+
+# Batched Firestore writes for ingested articles
+NEWS_COLLECTION_NAME = os.environ.get('NEWS_COLLECTION_NAME', 'news')
+FIRESTORE_FLUSH_SIZE = int(os.environ.get('FIRESTORE_FLUSH_SIZE', '500'))
+FIRESTORE_FLUSH_INTERVAL_SECONDS = float(os.environ.get('FIRESTORE_FLUSH_INTERVAL_SECONDS', '2.0'))
+
+# Idempotent storage: articles are keyed by a hash of their canonical URL, and a
+# per-process Bloom filter (warmed from the most recent IDs) skips known articles.
+BLOOM_CAPACITY = int(os.environ.get('BLOOM_CAPACITY', '200000'))
+BLOOM_ERROR_RATE = float(os.environ.get('BLOOM_ERROR_RATE', '0.001'))
+BLOOM_WARM_LIMIT = int(os.environ.get('BLOOM_WARM_LIMIT', '5000'))
+
+# Near-duplicate detection: the same wire story from several sources is grouped under one cluster_id
+NEAR_DUP_ENABLED = os.environ.get('NEAR_DUP_ENABLED', 'true').lower() == 'true'
+NEAR_DUP_THRESHOLD = float(os.environ.get('NEAR_DUP_THRESHOLD', '0.7'))
+NEAR_DUP_MAX_ENTRIES = int(os.environ.get('NEAR_DUP_MAX_ENTRIES', '50000'))
+NEAR_DUP_TTL_HOURS = int(os.environ.get('NEAR_DUP_TTL_HOURS', '72'))
+
+# Geotagging: place names from a local gazetteer of Chennai localities, roads and landmarks
+GEOTAGGING_ENABLED = os.environ.get('GEOTAGGING_ENABLED', 'true').lower() == 'true'
+GAZETTEER_FILE = os.environ.get('GAZETTEER_FILE', os.path.join(os.path.dirname(__file__), 'gazetteer.json'))
+
+# Keyword-rule categories (traffic, accident, crime, ...), stored on the article and
+# published as Pub/Sub attributes so subscriptions can filter on them server-side
+CLASSIFY_ARTICLES = os.environ.get('CLASSIFY_ARTICLES', 'true').lower() == 'true'
+CATEGORIES_FILE = os.environ.get('CATEGORIES_FILE', os.path.join(os.path.dirname(__file__), 'categories.json'))
+
+# Optional full-text stage: NewsAPI truncates `content` to ~200 characters, so each
+# article page is downloaded (politely, per domain) and its main text stored as `full_text`.
+# FULLTEXT_SKIP_RULES is a comma-separated robots-style list: "site.com" or "site.com/path/prefix".
+FULLTEXT_ENABLED = os.environ.get('FULLTEXT_ENABLED', 'false').lower() == 'true'
+FULLTEXT_PER_DOMAIN_CONCURRENCY = int(os.environ.get('FULLTEXT_PER_DOMAIN_CONCURRENCY', '2'))
+FULLTEXT_MAX_CONCURRENCY = int(os.environ.get('FULLTEXT_MAX_CONCURRENCY', '16'))
+FULLTEXT_MAX_BYTES = int(os.environ.get('FULLTEXT_MAX_BYTES', str(2 * 1024 * 1024)))
+FULLTEXT_TIMEOUT_SECONDS = float(os.environ.get('FULLTEXT_TIMEOUT_SECONDS', '10.0'))
+FULLTEXT_MAX_CHARS = int(os.environ.get('FULLTEXT_MAX_CHARS', '20000'))
+FULLTEXT_SKIP_RULES = [rule for rule in os.environ.get('FULLTEXT_SKIP_RULES', '').split(',') if rule.strip()]
+FULLTEXT_CACHE_DIR = os.environ.get('FULLTEXT_CACHE_DIR', os.path.join(tempfile.gettempdir(), 'fulltext_cache'))
+FULLTEXT_CACHE_MAX_BYTES = int(os.environ.get('FULLTEXT_CACHE_MAX_BYTES', str(100 * 1024 * 1024)))
+
+# Outputs for ingested articles, all fed in one pass: any of firestore, pubsub (RAW_NEWS_TOPIC_NAME),
+# jsonl and parquet (local files under NEWS_OUTPUT_DIR, for runs and benchmarks without cloud services).
+# PUBLISH_RAW_NEWS=true adds pubsub for compatibility with older deployments.
+NEWS_SINKS = [name.strip() for name in os.environ.get('NEWS_SINKS', 'firestore').split(',') if name.strip()]
+PUBLISH_RAW_NEWS = os.environ.get('PUBLISH_RAW_NEWS', 'false').lower() == 'true'
+if PUBLISH_RAW_NEWS and 'pubsub' not in NEWS_SINKS:
+    NEWS_SINKS.append('pubsub')
+NEWS_OUTPUT_DIR = os.environ.get('NEWS_OUTPUT_DIR', os.path.join(tempfile.gettempdir(), 'news_output'))
+SINK_MAX_BUFFERED = int(os.environ.get('SINK_MAX_BUFFERED', '2000'))
+
+# Batched, flow-controlled publishing of ingested articles to RAW_NEWS_TOPIC_NAME
+PUBSUB_BATCH_MAX_MESSAGES = int(os.environ.get('PUBSUB_BATCH_MAX_MESSAGES', '100'))
+PUBSUB_BATCH_MAX_BYTES = int(os.environ.get('PUBSUB_BATCH_MAX_BYTES', str(1024 * 1024)))
+PUBSUB_BATCH_MAX_LATENCY_SECONDS = float(os.environ.get('PUBSUB_BATCH_MAX_LATENCY_SECONDS', '0.05'))
+PUBSUB_FLOW_CONTROL_MESSAGES = int(os.environ.get('PUBSUB_FLOW_CONTROL_MESSAGES', '1000'))
+PUBSUB_FLOW_CONTROL_BYTES = int(os.environ.get('PUBSUB_FLOW_CONTROL_BYTES', str(10 * 1024 * 1024)))
+
+# Encoding of published messages: PUBSUB_MESSAGE_CODEC is 'json' (compact) or 'msgpack', and
+# payloads of at least PUBSUB_COMPRESS_THRESHOLD_BYTES are zstd-compressed (0 = never). The
+# codec goes in the 'codec' message attribute; keep the defaults while any subscriber reads plain JSON.
+PUBSUB_MESSAGE_CODEC = os.environ.get('PUBSUB_MESSAGE_CODEC', 'json')
+PUBSUB_COMPRESS_THRESHOLD_BYTES = int(os.environ.get('PUBSUB_COMPRESS_THRESHOLD_BYTES', '0'))
+
+# Response cache under the shared httpx client for NewsAPI calls.
+# NEWS_API_CACHE_MODE is 'off', 'cache' (TTL + ETag/If-Modified-Since revalidation)
+# or 'replay' (strictly offline: serve recorded responses only, for deterministic benchmarks).
+NEWS_API_CACHE_MODE = os.environ.get('NEWS_API_CACHE_MODE', 'off')
+NEWS_API_CACHE_DIR = os.environ.get('NEWS_API_CACHE_DIR', os.path.join(tempfile.gettempdir(), 'newsapi_cache'))
+NEWS_API_CACHE_TTL_SECONDS = int(os.environ.get('NEWS_API_CACHE_TTL_SECONDS', '300'))
+NEWS_API_CACHE_MAX_BYTES = int(os.environ.get('NEWS_API_CACHE_MAX_BYTES', str(50 * 1024 * 1024)))
+
+# Shared NewsAPI rate limiter, retry policy and per-run request budget
+NEWS_API_RATE_PER_SECOND = float(os.environ.get('NEWS_API_RATE_PER_SECOND', '2.0'))
+NEWS_API_BURST = int(os.environ.get('NEWS_API_BURST', '5'))
+NEWS_API_MAX_RETRIES = int(os.environ.get('NEWS_API_MAX_RETRIES', '4'))
+NEWS_API_BACKOFF_BASE_SECONDS = float(os.environ.get('NEWS_API_BACKOFF_BASE_SECONDS', '1.0'))
+NEWS_API_BACKOFF_MAX_SECONDS = float(os.environ.get('NEWS_API_BACKOFF_MAX_SECONDS', '30.0'))
+NEWS_API_REQUEST_BUDGET = int(os.environ.get('NEWS_API_REQUEST_BUDGET', '50'))
+
+# Poller mode: instead of waiting for Cloud Scheduler, poll NewsAPI on an interval that
+# tightens while new articles keep arriving and backs off exponentially when runs come back empty
+POLLER_MODE = os.environ.get('POLLER_MODE', 'false').lower() == 'true'
+POLL_MIN_INTERVAL_SECONDS = float(os.environ.get('POLL_MIN_INTERVAL_SECONDS', '60'))
+POLL_MAX_INTERVAL_SECONDS = float(os.environ.get('POLL_MAX_INTERVAL_SECONDS', '3600'))
+POLL_INITIAL_INTERVAL_SECONDS = float(os.environ.get('POLL_INITIAL_INTERVAL_SECONDS', '900'))
+POLL_BACKOFF_FACTOR = float(os.environ.get('POLL_BACKOFF_FACTOR', '2.0'))
+POLL_TIGHTEN_FACTOR = float(os.environ.get('POLL_TIGHTEN_FACTOR', '0.5'))
+POLL_BURST_THRESHOLD = int(os.environ.get('POLL_BURST_THRESHOLD', '10'))
+
 DEFAULT_LANGUAGE = os.environ.get('DEFAULT_LANGUAGE', 'en')
 DEFAULT_SORT_BY = os.environ.get('DEFAULT_SORT_BY', 'publishedAt') 
 
-app = FastAPI()
+# Cloud clients are created lazily (on first use, or by the optional background
+# pre-warm in the lifespan handler) so a cold start can route its first request
+# without paying for credential discovery and gRPC channel setup at import time.
+# The getters block on _client_lock while another thread builds a client, so
+# coroutines call them through run_in_executor unless the client already exists.
+PREWARM_CLIENTS = os.environ.get('PREWARM_CLIENTS', 'true').lower() == 'true'
+
+_client_lock = threading.Lock()
+_db = None
+_publisher = None
+_http_client = None
+_news_api = None
+_watermark_store = None
+_gazetteer = None
+_classifier = None
+_fulltext_fetcher = None
+
+
+def get_db():
+    global _db
+    with _client_lock:
+        if _db is None:
+            from google.cloud import firestore
+            _db = firestore.Client()
+            logger.info("Firestore client initialized.")
+    return _db
+
+
+def get_publisher():
+    global _publisher
+    with _client_lock:
+        if _publisher is None:
+            _publisher = create_batch_publisher(
+                max_messages=PUBSUB_BATCH_MAX_MESSAGES,
+                max_bytes=PUBSUB_BATCH_MAX_BYTES,
+                max_latency=PUBSUB_BATCH_MAX_LATENCY_SECONDS,
+                flow_control_messages=PUBSUB_FLOW_CONTROL_MESSAGES,
+                flow_control_bytes=PUBSUB_FLOW_CONTROL_BYTES,
+            )
+            logger.info("Pub/Sub publisher client initialized.")
+    return _publisher
+
+
+def get_http_client():
+    global _http_client
+    with _client_lock:
+        if _http_client is None:
+            _http_client = httpx.AsyncClient(transport=build_http_transport(
+                NEWS_API_CACHE_MODE,
+                NEWS_API_CACHE_DIR,
+                NEWS_API_CACHE_TTL_SECONDS,
+                NEWS_API_CACHE_MAX_BYTES,
+                cacheable_hosts={httpx.URL(NEWS_API_BASE_URL).host},
+            ))
+    return _http_client
+
+
+def get_news_api():
+    global _news_api
+    http_client = get_http_client()
+    with _client_lock:
+        if _news_api is None:
+            _news_api = NewsApiClient(
+                http_client,
+                NEWS_API_BASE_URL,
+                NEWS_API_KEY,
+                rate_limiter=TokenBucket(rate=NEWS_API_RATE_PER_SECOND, capacity=NEWS_API_BURST),
+                max_retries=NEWS_API_MAX_RETRIES,
+                backoff_base=NEWS_API_BACKOFF_BASE_SECONDS,
+                backoff_max=NEWS_API_BACKOFF_MAX_SECONDS,
+            )
+    return _news_api
+
+
+def get_watermark_store():
+    global _watermark_store
+    if _watermark_store is None:
+        if WATERMARK_BACKEND == 'file':
+            _watermark_store = JsonFileWatermarkStore(WATERMARK_FILE)
+        else:
+            _watermark_store = FirestoreWatermarkStore(get_db())
+    return _watermark_store
+
+
+def get_gazetteer():
+    """The place-name matcher, built on first use; None when geotagging is off or the gazetteer is missing."""
+    global _gazetteer
+    if _gazetteer is None and GEOTAGGING_ENABLED:
+        with _client_lock:
+            if _gazetteer is None:
+                try:
+                    _gazetteer = Gazetteer.from_file(GAZETTEER_FILE)
+                    logger.info(f"Gazetteer loaded with {len(_gazetteer)} places from {GAZETTEER_FILE}.")
+                except (FileNotFoundError, json.JSONDecodeError, KeyError) as e:
+                    logger.warning(f"Could not load gazetteer from {GAZETTEER_FILE}; articles will not be geotagged: {e}")
+                    _gazetteer = False
+    return _gazetteer or None
+
+
+def get_classifier():
+    """The category rule classifier, compiled on first use; None when classification is off or the rules are missing."""
+    global _classifier
+    if _classifier is None and CLASSIFY_ARTICLES:
+        with _client_lock:
+            if _classifier is None:
+                try:
+                    _classifier = RuleClassifier.from_file(CATEGORIES_FILE)
+                    logger.info(f"Category rules loaded for {_classifier.categories} from {CATEGORIES_FILE}.")
+                except (FileNotFoundError, json.JSONDecodeError) as e:
+                    logger.warning(f"Could not load category rules from {CATEGORIES_FILE}; articles will not be categorized: {e}")
+                    _classifier = False
+    return _classifier or None
+
+
+def get_fulltext_fetcher():
+    """Full-text fetcher on the shared HTTPX client; None unless FULLTEXT_ENABLED."""
+    global _fulltext_fetcher
+    if not FULLTEXT_ENABLED:
+        return None
+    http_client = get_http_client()
+    with _client_lock:
+        if _fulltext_fetcher is None:
+            _fulltext_fetcher = FullTextFetcher(
+                http_client,
+                store=DiskResponseStore(FULLTEXT_CACHE_DIR, FULLTEXT_CACHE_MAX_BYTES),
+                skip_list=SkipList(FULLTEXT_SKIP_RULES),
+                per_domain_concurrency=FULLTEXT_PER_DOMAIN_CONCURRENCY,
+                max_concurrency=FULLTEXT_MAX_CONCURRENCY,
+                max_bytes=FULLTEXT_MAX_BYTES,
+                timeout=FULLTEXT_TIMEOUT_SECONDS,
+                max_chars=FULLTEXT_MAX_CHARS,
+            )
+            logger.info(f"Full-text fetcher initialized (cache={FULLTEXT_CACHE_DIR}, {len(_fulltext_fetcher.skip_list)} skip rules).")
+    return _fulltext_fetcher
+
+
+async def prewarm_clients():
+    """Builds the cloud clients and warms the Bloom filter in the background after startup."""
+    loop = asyncio.get_running_loop()
+    try:
+        clients = []
+        if 'firestore' in NEWS_SINKS or WATERMARK_BACKEND != 'file':
+            clients.append(loop.run_in_executor(None, get_db))
+        if 'pubsub' in NEWS_SINKS:
+            clients.append(loop.run_in_executor(None, get_publisher))
+        await asyncio.gather(*clients)
+        for getter in (get_news_api, get_gazetteer, get_classifier):
+            await loop.run_in_executor(None, getter)
+        await warm_seen_articles()
+        logger.info("Client pre-warm complete.")
+    except Exception as e:
+        logger.warning(f"Client pre-warm failed; clients will be created on first use: {e}")
+
+
+async def close_clients():
+    """Closes whatever clients were created; they are rebuilt on next use."""
+    global _http_client, _news_api, _fulltext_fetcher, _publisher
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
+        _news_api = None
+        _fulltext_fetcher = None
+    if _publisher is not None:
+        publisher, _publisher = _publisher, None
+        await asyncio.get_running_loop().run_in_executor(None, publisher.stop)
+
 
-publisher = pubsub_v1.PublisherClient()
+@asynccontextmanager
+async def lifespan(app):
+    prewarm_task = asyncio.create_task(prewarm_clients()) if PREWARM_CLIENTS else None
+    yield
+    if prewarm_task is not None and not prewarm_task.done():
+        prewarm_task.cancel()
+    await close_clients()
 
-http_client = httpx.AsyncClient()
+
+app = FastAPI(lifespan=lifespan)
+
+seen_articles = BloomFilter(capacity=BLOOM_CAPACITY, error_rate=BLOOM_ERROR_RATE)
+_bloom_warmed = False
+
+near_duplicate_index = NearDuplicateIndex(threshold=NEAR_DUP_THRESHOLD, max_entries=NEAR_DUP_MAX_ENTRIES, ttl_seconds=NEAR_DUP_TTL_HOURS * 3600)
 
 _queries = {}
 try:
@@ -57,109 +352,428 @@ except json.JSONDecodeError:
     }
 
 
-@app.on_event("shutdown")
-async def shutdown_event():
-    await http_client.aclose()
+@app.get("/healthz")
+async def healthz():
+    return {"status": "ok"}
 
-@app.post("/")
-async def ingest_news(request: Request):
+
+def _load_recent_article_ids(limit):
+    from google.cloud import firestore
+    query = (get_db().collection(NEWS_COLLECTION_NAME)
+             .order_by("ingestedAt", direction=firestore.Query.DESCENDING)
+             .limit(limit)
+             .select([]))
+    return [snapshot.id for snapshot in query.stream()]
+
+
+async def warm_seen_articles():
     """
-    Cloud Run service endpoint to fetch news articles from NewsAPI.org
-    and publish them to Pub/Sub.
-    Triggered by HTTP (e.g., from Cloud Scheduler).
+    Loads the IDs of the most recently ingested articles into the Bloom filter,
+    once per process. Failures are logged; writes stay idempotent either way.
     """
-    logger.info("News Ingestor Cloud Run service triggered.")
+    global _bloom_warmed
+    if _bloom_warmed:
+        return
+    _bloom_warmed = True
+    if 'firestore' not in NEWS_SINKS:
+        # Nothing to warm from; the filter still dedupes within this process
+        return
+    try:
+        recent_ids = await asyncio.get_running_loop().run_in_executor(None, _load_recent_article_ids, BLOOM_WARM_LIMIT)
+        for article_id in recent_ids:
+            seen_articles.add(article_id)
+        logger.info(f"Warmed seen-article Bloom filter with {len(recent_ids)} recent IDs.")
+    except Exception as e:
+        logger.warning(f"Could not warm seen-article Bloom filter: {e}")
 
-    if not NEWS_API_KEY or NEWS_API_KEY == 'YOUR_NEWSAPI_KEY':
-        logger.error("NewsAPI.org API Key is not configured. Please set NEWS_API_KEY environment variable.")
-        return JSONResponse(content={"error": "NewsAPI.org API Key not configured"}, status_code=500)
 
+async def fetch_news_page(query, from_date, page, page_size, budget=None, to_date=None):
+    """
+    Fetches a single page of results from NewsAPI.org and returns the decoded JSON body.
+    Goes through the shared rate limiter and retry policy; `budget` caps requests per run.
+    """
+    params = {
+        "q": query,
+        "language": DEFAULT_LANGUAGE,
+        "sortBy": DEFAULT_SORT_BY,
+        "from": from_date,
+        "pageSize": page_size,
+        "page": page
+    }
+    if to_date:
+        params["to"] = to_date
+    news_api = _news_api or await asyncio.get_running_loop().run_in_executor(None, get_news_api)
+    return await news_api.get_json(params, budget=budget)
+
+
+async def fetch_all_articles(query, from_date, page_size=NEWS_PAGE_SIZE, max_pages=NEWS_MAX_PAGES, concurrency=NEWS_FETCH_CONCURRENCY, semaphore=None, budget=None, to_date=None):
+    """
+    Fetches the first page, reads totalResults, then pulls the remaining pages
+    concurrently on the shared http_client (bounded by a semaphore).
+    Errors on the first page propagate; errors on later pages are logged and skipped
+    so a single bad page does not discard the articles already fetched.
+    Pass a shared semaphore to bound requests across several concurrent queries.
+    Returns (articles, complete): complete is False when a page failed or max_pages
+    stopped short of totalResults, i.e. older articles in the window were not fetched.
+    """
+    if semaphore is None:
+        semaphore = asyncio.Semaphore(max(1, concurrency))
+
+    async with semaphore:
+        first_page = await fetch_news_page(query, from_date, 1, page_size, budget=budget, to_date=to_date)
+    articles = list(first_page.get('articles', []))
+    total_results = first_page.get('totalResults', 0) or 0
+
+    total_pages = min(-(-total_results // page_size), max_pages)
+    if total_pages <= 1:
+        return articles, total_results <= len(articles)
+
+    logger.info(f"totalResults={total_results} for query '{query}'; fetching pages 2..{total_pages}")
+
+    async def fetch_page(page):
+        async with semaphore:
+            try:
+                return (await fetch_news_page(query, from_date, page, page_size, budget=budget, to_date=to_date)).get('articles', [])
+            except (httpx.HTTPStatusError, httpx.RequestError, json.JSONDecodeError, RequestBudgetExceeded) as e:
+                logger.warning(f"Failed to fetch page {page} for query '{query}': {e}")
+                return None
+
+    pages = await asyncio.gather(*(fetch_page(page) for page in range(2, total_pages + 1)))
+    for page_articles in pages:
+        articles.extend(page_articles or [])
+    complete = None not in pages and total_results <= len(articles)
+    if not complete:
+        logger.warning(f"Fetched {len(articles)} of {total_results} results for query '{query}' "
+                       f"({pages.count(None)} failed pages, max_pages={max_pages}).")
+    return articles, complete
+
+
+def resolve_named_queries():
+    """
+    Returns the list of (query_name, query_string) pairs to run for this invocation.
+    DEFAULT_SEARCH_QUERY takes priority, then MULTI_QUERY_MODE, then QUERY_NAME_TO_USE.
+    """
     if DEFAULT_SEARCH_QUERY_ENV:
-        current_search_query = DEFAULT_SEARCH_QUERY_ENV
-        logger.info(f"Using direct search query from environment variable: '{current_search_query}'")
-    else:
-        current_search_query = _queries.get(QUERY_NAME_TO_USE, _queries.get('default_search_query'))
-        logger.info(f"Using search query from queries.json (via QUERY_NAME_TO_USE='{QUERY_NAME_TO_USE}'): '{current_search_query}'")
+        logger.info(f"Using direct search query from environment variable: '{DEFAULT_SEARCH_QUERY_ENV}'")
+        return [("env_search_query", DEFAULT_SEARCH_QUERY_ENV)]
 
+    if MULTI_QUERY_MODE:
+        if QUERY_NAMES_TO_USE.strip().lower() == 'all':
+            names = list(_queries.keys())
+        else:
+            names = [name.strip() for name in QUERY_NAMES_TO_USE.split(',') if name.strip()]
+        named_queries = [(name, _queries[name]) for name in names if _queries.get(name)]
+        missing = [name for name in names if not _queries.get(name)]
+        if missing:
+            logger.warning(f"Ignoring unknown query names from QUERY_NAMES_TO_USE: {missing}")
+        logger.info(f"Multi-query mode: running {[name for name, _ in named_queries]}")
+        return named_queries
+
+    current_search_query = _queries.get(QUERY_NAME_TO_USE, _queries.get('default_search_query'))
+    logger.info(f"Using search query from queries.json (via QUERY_NAME_TO_USE='{QUERY_NAME_TO_USE}'): '{current_search_query}'")
     if not current_search_query:
-        logger.error("Search query could not be determined from environment or queries.json.")
-        return JSONResponse(content={"error": "Search query not configured"}, status_code=500)
+        return []
+    return [(QUERY_NAME_TO_USE, current_search_query)]
 
 
-    try:
-        params = {
-            "q": current_search_query,
-            "language": DEFAULT_LANGUAGE,
-            "sortBy": DEFAULT_SORT_BY,
-            "from": HARDCODED_FROM_DATE, 
-            "pageSize": HARDCODED_PAGE_SIZE, 
-            "page": 1,
-            "apiKey": NEWS_API_KEY
-        }
-        
-        logger.info(f"Fetching news with query: '{current_search_query}' from {HARDCODED_FROM_DATE} with pageSize={HARDCODED_PAGE_SIZE}")
-        
-        response = await http_client.get(NEWS_API_BASE_URL, params=params, timeout=30.0)
-        response.raise_for_status() 
-        
-        news_data = response.json()
-        articles = news_data.get('articles', [])
-
-        if not articles:
-            logger.info(f"No articles found for query: '{current_search_query}' from {HARDCODED_FROM_DATE} with pageSize={HARDCODED_PAGE_SIZE}.")
-            return JSONResponse(content={"status": "No articles"}, status_code=200)
-
-        articles_published_count = 0
-        topic_path = publisher.topic_path(GCP_PROJECT_ID, RAW_NEWS_TOPIC_NAME)
-        today_str = datetime.now(timezone.utc).strftime("%Y-%m-%d")
-        published_today = (today_str)
+async def fetch_articles_for_queries(named_queries, from_dates, page_size, paginated=PAGINATED_FETCH, budget=None):
+    """
+    Runs every query concurrently under one shared semaphore, each from its own
+    from_dates[query_name], merges the article
+    streams and dedupes them by URL. Returns (tagged_articles, incomplete_queries):
+    a list of (article, matched_query_names) in first-seen order, where an article matched
+    by several queries is tagged with all of them, and the names of queries whose window
+    was not fetched in full (see fetch_all_articles).
+    """
+    semaphore = asyncio.Semaphore(max(1, NEWS_FETCH_CONCURRENCY))
+
+    async def run_query(name, query):
+        from_date = from_dates[name]
+        if paginated:
+            return await fetch_all_articles(query, from_date, page_size=page_size, semaphore=semaphore, budget=budget)
+        async with semaphore:
+            page = await fetch_news_page(query, from_date, 1, page_size, budget=budget)
+        articles = page.get('articles', [])
+        return articles, (page.get('totalResults', 0) or 0) <= len(articles)
+
+    if len(named_queries) == 1:
+        results = [await run_query(*named_queries[0])]
+    else:
+        results = await asyncio.gather(*(run_query(name, query) for name, query in named_queries), return_exceptions=True)
+
+    merged = {}
+    incomplete_queries = set()
+    for (name, query), result in zip(named_queries, results):
+        if isinstance(result, BaseException):
+            logger.error(f"Query '{name}' failed: {result}")
+            continue
+        articles, complete = result
+        if not complete:
+            incomplete_queries.add(name)
         for article in articles:
-            if not article.get('title') or not article.get('url'):
-                logger.warning(f"Skipping article due to missing title or URL: {article}")
+            url = canonicalize_url(article['url']) if article.get('url') else None
+            if not url:
+                merged[id(article)] = (article, [name])
                 continue
+            if url in merged:
+                if name not in merged[url][1]:
+                    merged[url][1].append(name)
+            else:
+                merged[url] = (article, [name])
+
+    if results and all(isinstance(result, BaseException) for result in results):
+        raise results[0]
+    return list(merged.values()), incomplete_queries
+
+
+def normalize_article(article, matched_queries, query_strings):
+    """Maps a raw NewsAPI article onto the document stored in Firestore / published to Pub/Sub."""
+    return {
+        "title": article.get('title'),
+        "description": article.get('description'),
+        "url": article.get('url'),
+        "canonical_url": canonicalize_url(article['url']),
+        "publishedAt": article.get('publishedAt'),
+        "source_name": article.get('source', {}).get('name'),
+        "author": article.get('author'),
+        "content": article.get('content'),
+        "query_keywords": query_strings[matched_queries[0]],
+        "matched_queries": matched_queries,
+        "ingestedAt": datetime.now(timezone.utc).isoformat()
+    }
+
+
+def build_sinks():
+    """A fan-out over the outputs named in NEWS_SINKS, fresh for each run so its stats are per run."""
+    sinks = []
+    for name in NEWS_SINKS:
+        if name == 'firestore':
+            sinks.append(FirestoreBatchSink(get_db(), NEWS_COLLECTION_NAME, flush_size=FIRESTORE_FLUSH_SIZE,
+                                            flush_interval=FIRESTORE_FLUSH_INTERVAL_SECONDS, max_buffered=SINK_MAX_BUFFERED))
+        elif name == 'pubsub':
+            publisher = get_publisher()
+            sinks.append(PubSubSink(publisher, publisher.topic_path(GCP_PROJECT_ID, RAW_NEWS_TOPIC_NAME),
+                                    flush_size=PUBSUB_BATCH_MAX_MESSAGES, max_buffered=SINK_MAX_BUFFERED,
+                                    codec=MessageCodec(PUBSUB_MESSAGE_CODEC, PUBSUB_COMPRESS_THRESHOLD_BYTES)))
+        elif name == 'jsonl':
+            sinks.append(JsonlFileSink(os.path.join(NEWS_OUTPUT_DIR, f"{NEWS_COLLECTION_NAME}.jsonl"), max_buffered=SINK_MAX_BUFFERED))
+        elif name == 'parquet':
+            sinks.append(ParquetFileSink(os.path.join(NEWS_OUTPUT_DIR, NEWS_COLLECTION_NAME), max_buffered=SINK_MAX_BUFFERED))
+        else:
+            raise ValueError(f"Unknown sink '{name}' in NEWS_SINKS; use firestore, pubsub, jsonl or parquet")
+    return FanOutSink(sinks)
+
+
+async def store_articles(tagged_articles, query_strings):
+    """
+    Shared sink pipeline for the HTTP endpoint, the poller and the backfill command:
+    skips invalid and already-ingested articles, optionally downloads their full text,
+    geotags and categorizes them, tags near-duplicate clusters and writes the rest to
+    every sink in NEWS_SINKS in one pass (categories go along as Pub/Sub attributes).
+    Returns counts, sink stats and the newest publishedAt per query.
+    """
+    await warm_seen_articles()
+    loop = asyncio.get_running_loop()
+
+    articles_published_count = 0
+    skipped_known_count = 0
+    near_duplicate_count = 0
+    geotagged_count = 0
+    gazetteer = await loop.run_in_executor(None, get_gazetteer)
+    classifier = await loop.run_in_executor(None, get_classifier)
+    pending_ids = set()
+    newest_by_query = {}
+    sink = await loop.run_in_executor(None, build_sinks)
+    new_articles = []
+    for article, matched_queries in tagged_articles:
+        if not article.get('title') or not article.get('url'):
+            logger.warning(f"Skipping article due to missing title or URL: {article}")
+            continue
+
+        article_id = article_id_for_url(article['url'])
+        if article_id in seen_articles or article_id in pending_ids:
+            skipped_known_count += 1
+            continue
+        pending_ids.add(article_id)
+        new_articles.append((article_id, article, matched_queries))
+
+    fetcher = await loop.run_in_executor(None, get_fulltext_fetcher)
+    full_text_count = 0
+    if fetcher is not None and new_articles:
+        full_texts = await fetcher.fetch_all([article['url'] for _, article, _ in new_articles])
+        full_text_count = sum(1 for text in full_texts if text)
+        logger.info(f"Got full text for {full_text_count} of {len(new_articles)} articles (fetcher totals: {fetcher.stats()})")
+    else:
+        full_texts = [None] * len(new_articles)
+
+    for (article_id, article, matched_queries), full_text in zip(new_articles, full_texts):
+        article_data = normalize_article(article, matched_queries, query_strings)
+        # Geotagging and categorization read the full text when there is one
+        enrichment_view = article_data
+        if fetcher is not None:
+            article_data["full_text"] = full_text
+            if full_text:
+                enrichment_view = {**article_data, "content": full_text}
+        if gazetteer is not None:
+            article_data.update(gazetteer.tag(enrichment_view))
+            if article_data["location"] is not None:
+                geotagged_count += 1
+        if classifier is not None:
+            article_data["categories"] = classifier.classify(enrichment_view)
+        if NEAR_DUP_ENABLED:
+            cluster_id, similarity = near_duplicate_index.assign_cluster(article_id, article_text(article_data))
+            article_data["cluster_id"] = cluster_id
+            article_data["cluster_similarity"] = round(similarity, 3)
+            if cluster_id != article_id:
+                near_duplicate_count += 1
+
+        attributes = {"article_id": article_id}
+        if classifier is not None:
+            attributes.update(category_attributes(article_data["categories"]))
+        await sink.add(article_data, doc_id=article_id, attributes=attributes)
+        for query_name in matched_queries:
+            if article_data["publishedAt"] and article_data["publishedAt"] > newest_by_query.get(query_name, ''):
+                newest_by_query[query_name] = article_data["publishedAt"]
+        logger.info(f"Queued article '{article.get('title')[:50]}...' for {NEWS_SINKS}")
+        articles_published_count += 1
+
+    await sink.close()
+    sink_stats = sink.stats()
+
+    if skipped_known_count:
+        logger.info(f"Skipped {skipped_known_count} already-ingested articles.")
+    if gazetteer is not None:
+        logger.info(f"Geotagged {geotagged_count} of {articles_published_count} articles.")
+    if near_duplicate_count:
+        logger.info(f"Grouped {near_duplicate_count} near-duplicate articles into existing clusters.")
+    if sink_stats['docs_failed'] == 0:
+        for article_id in pending_ids:
+            seen_articles.add(article_id)
+    logger.info(f"Wrote {sink_stats['docs_written']} of {articles_published_count} articles to {NEWS_SINKS} ({sink_stats['docs_failed']} failed writes).")
+    return {
+        "skipped_known": skipped_known_count,
+        "near_duplicates": near_duplicate_count,
+        "geotagged": geotagged_count,
+        "full_text": full_text_count,
+        "sinks": sink_stats,
+        "newest_by_query": newest_by_query
+    }
 
-            article_data = {
-                "title": article.get('title'),
-                "description": article.get('description'),
-                "url": article.get('url'),
-                "publishedAt": article.get('publishedAt'),
-                "source_name": article.get('source', {}).get('name'),
-                "author": article.get('author'),
-                "content": article.get('content'),
-                "query_keywords": current_search_query,
-                "ingestedAt": datetime.now(timezone.utc).isoformat()
-            }
-            
-            message_data = json.dumps(article_data).encode('utf-8')
-            #future = publisher.publish(topic_path, message_data)
-            db.collection("news").add(article_data)
-            logger.info(f"Published article '{article.get('title')[:50]}...' to Pub/Sub topic '{RAW_NEWS_TOPIC_NAME}'")
-            articles_published_count += 1
-            if articles_published_count >= HARDCODED_PAGE_SIZE:
-                logger.info(f"Successfully published {articles_published_count} articles to Pub/Sub topic '{RAW_NEWS_TOPIC_NAME}'.")
-                return JSONResponse(content={"status": f"Successfully published {articles_published_count} articles"}, status_code=200)
-        logger.info(f"Successfully published {articles_published_count} articles to Pub/Sub topic '{RAW_NEWS_TOPIC_NAME}'.")
-        return JSONResponse(content={"status": f"Successfully published {articles_published_count} articles"}, status_code=200)
 
+async def run_ingestion():
+    """
+    One ingestion run: fetches news newer than the watermarks from NewsAPI.org and
+    stores it through store_articles(). Shared by the HTTP trigger and the poller.
+    Returns (response content, HTTP status code).
+    """
+    if not NEWS_API_KEY or NEWS_API_KEY == 'YOUR_NEWSAPI_KEY':
+        logger.error("NewsAPI.org API Key is not configured. Please set NEWS_API_KEY environment variable.")
+        return {"error": "NewsAPI.org API Key not configured"}, 500
+
+    named_queries = resolve_named_queries()
+    if not named_queries:
+        logger.error("Search query could not be determined from environment or queries.json.")
+        return {"error": "Search query not configured"}, 500
+    query_strings = dict(named_queries)
+
+
+    try:
+        page_size = NEWS_PAGE_SIZE if PAGINATED_FETCH else HARDCODED_PAGE_SIZE
+        watermark_store = _watermark_store or await asyncio.get_running_loop().run_in_executor(None, get_watermark_store)
+        from_dates = await watermark_store.from_dates(query_strings, WATERMARK_OVERLAP_MINUTES, WATERMARK_FIRST_RUN_LOOKBACK_HOURS)
+
+        logger.info(f"Fetching news for queries {from_dates} with pageSize={page_size} (paginated={PAGINATED_FETCH})")
+
+        budget = RequestBudget(NEWS_API_REQUEST_BUDGET)
+        tagged_articles, incomplete_queries = await fetch_articles_for_queries(named_queries, from_dates, page_size, budget=budget)
+        logger.info(f"Used {budget.used} of {budget.max_requests} NewsAPI requests for this run.")
+
+        if not tagged_articles:
+            logger.info(f"No articles found for queries {from_dates} with pageSize={page_size}.")
+            return {"status": "No articles"}, 200
+
+        result = await store_articles(tagged_articles, query_strings)
+        if result["sinks"]["docs_failed"] == 0:
+            # Results come newest first, so anything a partial fetch missed is older than what
+            # it got: moving those queries' watermarks would skip it for good
+            newest_by_query = result.pop("newest_by_query")
+            if incomplete_queries:
+                logger.warning(f"Fetch incomplete for {sorted(incomplete_queries)}; leaving their watermarks unchanged"
+                               f"{'' if PAGINATED_FETCH else ' (PAGINATED_FETCH is off, so only one page was fetched)'}.")
+            await watermark_store.advance({name: published_at for name, published_at in newest_by_query.items()
+                                                 if name not in incomplete_queries})
+        else:
+            result.pop("newest_by_query")
+            logger.warning(f"{result['sinks']['docs_failed']} article writes failed; leaving watermarks unchanged so they are refetched.")
+        return {"status": f"Successfully published {result['sinks']['docs_written']} articles", **result}, 200
+
+    except RequestBudgetExceeded as e:
+        logger.warning(f"Stopping run: {e}")
+        return {"status": f"Request budget exhausted: {e}"}, 200
     except httpx.HTTPStatusError as e:
         logger.error(f"HTTP error fetching news: {e.response.status_code} - {e.response.text}", exc_info=True)
-        return JSONResponse(content={"error": f"HTTP error fetching news: {e.response.status_code}"}, status_code=500)
+        return {"error": f"HTTP error fetching news: {e.response.status_code}"}, 500
     except httpx.RequestError as e:
         logger.error(f"Network error fetching news: {e}", exc_info=True)
-        return JSONResponse(content={"error": f"Network error fetching news: {e}"}, status_code=500)
+        return {"error": f"Network error fetching news: {e}"}, 500
     except json.JSONDecodeError as e:
         logger.error(f"JSON decoding error from NewsAPI response: {e}", exc_info=True)
-        return JSONResponse(content={"error": "Invalid JSON from NewsAPI"}, status_code=500)
+        return {"error": "Invalid JSON from NewsAPI"}, 500
     except Exception as e:
         logger.error(f"Unexpected error in news_ingestor: {e}", exc_info=True)
-        return JSONResponse(content={"error": f"Internal Server Error: {e}"}, status_code=500)
+        return {"error": f"Internal Server Error: {e}"}, 500
+
+
+@app.post("/")
+async def ingest_news(request: Request):
+    """
+    Cloud Run service endpoint to fetch news articles from NewsAPI.org
+    and publish them to Pub/Sub.
+    Triggered by HTTP (e.g., from Cloud Scheduler).
+    """
+    logger.info("News Ingestor Cloud Run service triggered.")
+    content, status_code = await run_ingestion()
+    return JSONResponse(content=content, status_code=status_code)
 
-# For local development
+
+async def poll_once():
+    """One poller iteration; returns how many new articles were stored (raises on a failed run)."""
+    content, status_code = await run_ingestion()
+    if status_code >= 500:
+        raise RuntimeError(content.get("error"))
+    return content.get("sinks", {}).get("docs_written", 0)
+
+
+async def run_poller():
+    """Long-running alternative to the Cloud Scheduler trigger: polls on an adaptive interval until SIGTERM / SIGINT."""
+    stop_event = asyncio.Event()
+    install_stop_signals(stop_event)
+    poller = AdaptivePoller(
+        poll_once,
+        min_interval=POLL_MIN_INTERVAL_SECONDS,
+        max_interval=POLL_MAX_INTERVAL_SECONDS,
+        initial_interval=POLL_INITIAL_INTERVAL_SECONDS,
+        backoff_factor=POLL_BACKOFF_FACTOR,
+        tighten_factor=POLL_TIGHTEN_FACTOR,
+        burst_threshold=POLL_BURST_THRESHOLD,
+    )
+    logger.info(f"Starting news poller (interval {POLL_MIN_INTERVAL_SECONDS:.0f}s .. {POLL_MAX_INTERVAL_SECONDS:.0f}s).")
+    try:
+        await poller.run(stop_event)
+    finally:
+        await close_clients()
+
+
+# For local development; `python main.py --poll` (or POLLER_MODE=true) runs the poller instead of the HTTP server
 if __name__ == '__main__':
-    import uvicorn
+    import sys
     from dotenv import load_dotenv
     load_dotenv()
-    
-    port = int(os.environ.get('PORT', 8080))
-    uvicorn.run(app, host='0.0.0.0',port=port)
+
+    if POLLER_MODE or '--poll' in sys.argv[1:]:
+        asyncio.run(run_poller())
+    else:
+        import uvicorn
+        port = int(os.environ.get('PORT', 8080))
+        uvicorn.run(app, host='0.0.0.0',port=port)
 
@@ -0,0 +1,147 @@
+# near_duplicates.py
+import re
+import time
+from array import array
+from collections import OrderedDict
+
+NUM_BINS = 64
+_BIN_BITS = 6
+_HASH_MASK = (1 << 64) - 1
+_EMPTY = 1 << 64
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+def article_text(article):
+    """The text used to fingerprint an article: title + description + content."""
+    return ' '.join(filter(None, (article.get('title'), article.get('description'), article.get('content'))))
+
+
+def shingles(text):
+    """Set of word bigrams (or the single word for one-word texts)."""
+    tokens = _TOKEN_RE.findall(text.lower())
+    if len(tokens) < 2:
+        return set(tokens)
+    return {f"{a} {b}" for a, b in zip(tokens, tokens[1:])}
+
+
+def minhash(text):
+    """
+    One-permutation MinHash signature of the text's shingle set: each shingle is
+    hashed once, the low bits pick one of NUM_BINS bins and each bin keeps its
+    minimum. Empty bins borrow from the next non-empty bin (rotation densification)
+    so every position is comparable. The fraction of positions where two signatures
+    agree estimates the Jaccard similarity of the two shingle sets.
+
+    Uses the built-in (per-process salted) string hash: signatures are only ever
+    compared within one process.
+    """
+    signature = [_EMPTY] * NUM_BINS
+    for shingle in shingles(text):
+        h = hash(shingle) & _HASH_MASK
+        b = h & (NUM_BINS - 1)
+        v = h >> _BIN_BITS
+        if v < signature[b]:
+            signature[b] = v
+    filled = [b for b in range(NUM_BINS) if signature[b] != _EMPTY]
+    if not filled:
+        return array('Q', [0] * NUM_BINS)
+    if len(filled) < NUM_BINS:
+        original = list(signature)
+        for b in range(NUM_BINS):
+            if original[b] == _EMPTY:
+                offset = 1
+                while original[(b + offset) % NUM_BINS] == _EMPTY:
+                    offset += 1
+                # Tag the borrowed value with the distance so it never equals a real minimum
+                signature[b] = original[(b + offset) % NUM_BINS] | (offset << (64 - _BIN_BITS))
+    return array('Q', signature)
+
+
+def estimated_similarity(a, b):
+    return sum(x == y for x, y in zip(a, b)) / NUM_BINS
+
+
+class NearDuplicateIndex:
+    """
+    LSH index over MinHash signatures. Each signature is cut into `bands` bands of
+    NUM_BINS // bands rows; articles that agree on every row of at least one
+    band land in the same bucket and are compared, so lookups never scan the whole
+    index. With the defaults (16 bands x 4 rows) a pair at 0.7 Jaccard similarity is
+    found ~99% of the time while unrelated stories (<0.2) almost never collide.
+
+    Memory is bounded by `max_entries` (oldest evicted first) and entries older
+    than `ttl_seconds` are dropped as new articles arrive.
+    """
+
+    def __init__(self, threshold=0.7, bands=16, max_entries=50000, ttl_seconds=72 * 3600):
+        if NUM_BINS % bands:
+            raise ValueError(f"bands must divide {NUM_BINS}")
+        self.threshold = threshold
+        self.bands = bands
+        self.rows = NUM_BINS // bands
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries = OrderedDict()  # key -> (signature, cluster_id, inserted_at)
+        self._buckets = [{} for _ in range(bands)]
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _band_keys(self, signature):
+        rows = self.rows
+        return [hash(tuple(signature[band * rows:(band + 1) * rows])) for band in range(self.bands)]
+
+    def _remove(self, key):
+        signature, _, _ = self._entries.pop(key)
+        for band, band_key in enumerate(self._band_keys(signature)):
+            bucket = self._buckets[band].get(band_key)
+            if bucket is not None:
+                bucket.discard(key)
+                if not bucket:
+                    del self._buckets[band][band_key]
+
+    def _evict(self, now):
+        while self._entries:
+            oldest_key, (_, _, inserted_at) = next(iter(self._entries.items()))
+            if len(self._entries) < self.max_entries and now - inserted_at <= self.ttl_seconds:
+                break
+            self._remove(oldest_key)
+            self.evictions += 1
+
+    def find_nearest(self, signature, band_keys=None):
+        """Returns (key, cluster_id, similarity) of the most similar indexed article above threshold, or None."""
+        best = None
+        seen = set()
+        for band, band_key in enumerate(band_keys or self._band_keys(signature)):
+            for key in self._buckets[band].get(band_key, ()):
+                if key in seen:
+                    continue
+                seen.add(key)
+                candidate, cluster_id, _ = self._entries[key]
+                similarity = estimated_similarity(signature, candidate)
+                if similarity >= self.threshold and (best is None or similarity > best[2]):
+                    best = (key, cluster_id, similarity)
+        return best
+
+    def assign_cluster(self, key, text, now=None):
+        """
+        Fingerprints `text`, indexes it under `key` and returns (cluster_id, similarity).
+        A near-duplicate joins the cluster of its closest match; otherwise the
+        article starts a new cluster named after its own key (similarity 1.0).
+        """
+        now = time.time() if now is None else now
+        self._evict(now)
+        if key in self._entries:
+            self._remove(key)
+
+        signature = minhash(text)
+        band_keys = self._band_keys(signature)
+        match = self.find_nearest(signature, band_keys)
+        cluster_id, similarity = (key, 1.0) if match is None else (match[1], match[2])
+
+        self._entries[key] = (signature, cluster_id, now)
+        for band, band_key in enumerate(band_keys):
+            self._buckets[band].setdefault(band_key, set()).add(key)
+        return cluster_id, similarity
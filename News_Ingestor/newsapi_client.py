@@ -0,0 +1,140 @@
+# newsapi_client.py
+import asyncio
+import logging
+import random
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+class RequestBudgetExceeded(Exception):
+    """Raised when a run has used up its NewsAPI request budget."""
+
+
+class RequestBudget:
+    """Caps how many NewsAPI requests (including retries) one run may make."""
+
+    def __init__(self, max_requests):
+        self.max_requests = max_requests
+        self.used = 0
+
+    @property
+    def remaining(self):
+        return max(0, self.max_requests - self.used)
+
+    def consume(self):
+        if self.used >= self.max_requests:
+            raise RequestBudgetExceeded(f"NewsAPI request budget of {self.max_requests} exhausted")
+        self.used += 1
+
+
+class TokenBucket:
+    """
+    Async token-bucket rate limiter shared by every request in the process.
+    Allows bursts of up to `capacity` requests and refills at `rate` per second.
+    pause_until() blocks all callers, e.g. until a server's Retry-After has passed.
+    """
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated_at = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = asyncio.Lock()
+
+    def pause_until(self, monotonic_deadline):
+        self._paused_until = max(self._paused_until, monotonic_deadline)
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                if now < self._paused_until:
+                    await asyncio.sleep(self._paused_until - now)
+                    continue
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self.rate)
+                self._updated_at = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+def parse_retry_after(value):
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP-date), or None."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+class NewsApiClient:
+    """
+    Thin wrapper around the shared httpx.AsyncClient for NewsAPI.org calls.
+    Every request waits on the shared TokenBucket; 429 and 5xx responses and network
+    errors are retried with jittered exponential backoff, honouring Retry-After.
+    Non-retryable errors, and the last error once retries run out, are raised as-is
+    (httpx.HTTPStatusError / httpx.RequestError) so callers keep their handling.
+    """
+
+    def __init__(self, http_client, base_url, api_key, rate_limiter, max_retries=4,
+                 backoff_base=1.0, backoff_max=30.0, timeout=30.0):
+        self.http_client = http_client
+        self.base_url = base_url
+        self.api_key = api_key
+        self.rate_limiter = rate_limiter
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.timeout = timeout
+
+    def _backoff(self, attempt):
+        # "Full jitter": uniform between 0 and the capped exponential delay
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    async def get_json(self, params, budget=None):
+        """GETs base_url with `params` (the API key is added here) and returns the decoded JSON body."""
+        request_params = {**params, "apiKey": self.api_key}
+        attempt = 0
+        while True:
+            if budget is not None:
+                budget.consume()
+            await self.rate_limiter.acquire()
+            try:
+                response = await self.http_client.get(self.base_url, params=request_params, timeout=self.timeout)
+                response.raise_for_status()
+                return response.json()
+            except httpx.HTTPStatusError as e:
+                status_code = e.response.status_code
+                if status_code not in RETRYABLE_STATUS_CODES or attempt >= self.max_retries:
+                    raise
+                delay = self._backoff(attempt)
+                retry_after = parse_retry_after(e.response.headers.get('Retry-After'))
+                if retry_after is not None:
+                    delay = max(delay, min(retry_after, self.backoff_max))
+                if status_code == 429:
+                    self.rate_limiter.pause_until(time.monotonic() + delay)
+                logger.warning(f"NewsAPI returned {status_code}; retry {attempt + 1}/{self.max_retries} in {delay:.1f}s")
+            except httpx.RequestError as e:
+                if attempt >= self.max_retries:
+                    raise
+                delay = self._backoff(attempt)
+                logger.warning(f"NewsAPI request failed ({e}); retry {attempt + 1}/{self.max_retries} in {delay:.1f}s")
+            attempt += 1
+            await asyncio.sleep(delay)
@@ -0,0 +1,114 @@
+# watermark.py
+import asyncio
+import json
+import logging
+import os
+from datetime import datetime, timedelta, timezone
+
+logger = logging.getLogger(__name__)
+
+
+def parse_timestamp(value):
+    """Parses an ISO-8601 timestamp (NewsAPI uses a trailing 'Z') into an aware datetime."""
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except (TypeError, ValueError):
+        return None
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+def format_timestamp(value):
+    """Formats an aware datetime the way NewsAPI expects the 'from' parameter."""
+    return value.astimezone(timezone.utc).isoformat(timespec='seconds').replace('+00:00', 'Z')
+
+
+class WatermarkStore:
+    """
+    Records the newest publishedAt seen for each query so the next run only
+    fetches what is newer. Subclasses implement _read() and _write().
+    """
+
+    async def load(self):
+        return await asyncio.get_running_loop().run_in_executor(None, self._read)
+
+    async def advance(self, newest_by_query):
+        """
+        Moves each query's watermark forward to the given publishedAt values.
+        Watermarks never move backwards, so replays and backfills are safe.
+        """
+        current = await self.load()
+        updates = {}
+        for query_name, published_at in newest_by_query.items():
+            candidate = parse_timestamp(published_at)
+            existing = parse_timestamp(current.get(query_name))
+            if candidate and (existing is None or candidate > existing):
+                updates[query_name] = format_timestamp(candidate)
+        if updates:
+            await asyncio.get_running_loop().run_in_executor(None, self._write, updates)
+            logger.info(f"Advanced ingestion watermarks: {updates}")
+        return updates
+
+    async def from_dates(self, query_names, overlap_minutes, first_run_lookback_hours):
+        """
+        Returns {query_name: 'from' timestamp} for the next fetch: the stored watermark
+        minus the overlap, or now minus first_run_lookback_hours when no watermark exists.
+        """
+        watermarks = await self.load()
+        now = datetime.now(timezone.utc)
+        result = {}
+        for query_name in query_names:
+            watermark = parse_timestamp(watermarks.get(query_name))
+            if watermark is None:
+                logger.info(f"No watermark for query '{query_name}'; fetching the last {first_run_lookback_hours} hours.")
+                start = now - timedelta(hours=first_run_lookback_hours)
+            else:
+                start = min(watermark - timedelta(minutes=overlap_minutes), now)
+            result[query_name] = format_timestamp(start)
+        return result
+
+    def _read(self):
+        raise NotImplementedError
+
+    def _write(self, updates):
+        raise NotImplementedError
+
+
+class FirestoreWatermarkStore(WatermarkStore):
+    """Keeps all watermarks as fields of a single Firestore document."""
+
+    def __init__(self, db, collection_name='ingestion_state', document_id='news_watermarks'):
+        self.doc_ref = db.collection(collection_name).document(document_id)
+
+    def _read(self):
+        snapshot = self.doc_ref.get()
+        return (snapshot.to_dict() or {}) if snapshot.exists else {}
+
+    def _write(self, updates):
+        self.doc_ref.set(updates, merge=True)
+
+
+class JsonFileWatermarkStore(WatermarkStore):
+    """Local JSON-file fallback, used for tests and local runs."""
+
+    def __init__(self, path):
+        self.path = path
+
+    def _read(self):
+        try:
+            with open(self.path, 'r') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+        except json.JSONDecodeError:
+            logger.error(f"Watermark file {self.path} is corrupt; treating as first run.")
+            return {}
+
+    def _write(self, updates):
+        watermarks = self._read()
+        watermarks.update(updates)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(watermarks, f, indent=2)
+        os.replace(tmp_path, self.path)
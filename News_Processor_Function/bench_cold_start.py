@@ -0,0 +1,43 @@
+# bench_cold_start.py
+# Measures cold-start cost of this service: `import main` plus the time until the
+# first request is served (lifespan startup + GET /healthz), each in a fresh interpreter.
+# Usage: python bench_cold_start.py [runs]
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+_PROBE = """
+import json, time
+start = time.perf_counter()
+import main
+imported = time.perf_counter()
+from fastapi.testclient import TestClient
+with TestClient(main.app) as client:
+    response = client.get('/healthz')
+    first_request = time.perf_counter()
+assert response.status_code == 200, response.text
+print(json.dumps({"import_ms": (imported - start) * 1000, "first_request_ms": (first_request - start) * 1000}))
+"""
+
+
+def run_once():
+    env = {**os.environ, "PYTHONDONTWRITEBYTECODE": "1"}
+    output = subprocess.run(
+        [sys.executable, "-c", _PROBE],
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+        env=env, capture_output=True, text=True, check=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main(runs=5):
+    samples = [run_once() for _ in range(runs)]
+    for key in ("import_ms", "first_request_ms"):
+        values = [sample[key] for sample in samples]
+        print(f"{key:18s} median {statistics.median(values):8.1f}  min {min(values):8.1f}  max {max(values):8.1f}")
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5)
@@ -0,0 +1,101 @@
+# classifier.py
+import json
+import re
+
+# A keyword in the title says more about what a story is about than one in the body
+FIELD_WEIGHTS = (('title', 3), ('description', 2), ('content', 1))
+UNCATEGORIZED = 'uncategorized'
+_END = object()
+
+
+def _normalize_keyword(keyword):
+    """Lowercases a keyword and joins its words with single spaces; a trailing '*' marks a stem."""
+    stem = keyword.endswith('*')
+    return ' '.join(re.split(r"[\s-]+", keyword.rstrip('*').strip().lower())), stem
+
+
+def _trie_pattern(node):
+    """
+    Regex for a character trie of keywords, factored on shared prefixes so the engine
+    rejects a position after one or two characters instead of trying every keyword.
+    Each keyword ends in an empty named group (k<index>) that identifies it.
+    """
+    alternatives = []
+    for char, child in sorted((char, child) for char, child in node.items() if char is not _END):
+        # Words inside a phrase may be separated by spaces or hyphens
+        alternatives.append((r"[\s-]+" if char == ' ' else re.escape(char)) + _trie_pattern(child))
+    # Terminals last, so a longer keyword is preferred over one that is its prefix
+    for index, stem in node.get(_END, ()):
+        alternatives.append((r"\w*" if stem else r"\b") + f"(?P<k{index}>)")
+    if len(alternatives) == 1:
+        return alternatives[0]
+    return f"(?:{'|'.join(alternatives)})"
+
+
+class RuleClassifier:
+    """
+    Assigns news categories from keyword rules ({category: [keyword, ...]}) without a
+    model call. All keywords are compiled into one regex, factored as a trie on their
+    shared prefixes, so each text field is scanned once however many keywords there
+    are; the named group that matched identifies the keyword and so the category.
+
+    Keywords are case-insensitive, start on a word boundary and match the whole
+    word, unless they end in '*', in which case they are stems ("flood*" matches
+    flooded / flooding / floods).
+    """
+
+    def __init__(self, rules):
+        self.categories = list(rules)
+        self._keyword_categories = []  # keyword index -> category
+        trie = {}
+        for category in self.categories:
+            for keyword in rules[category]:
+                text, stem = _normalize_keyword(keyword)
+                if not text:
+                    continue
+                node = trie
+                for char in text:
+                    node = node.setdefault(char, {})
+                node.setdefault(_END, []).append((len(self._keyword_categories), stem))
+                self._keyword_categories.append(category)
+        # Texts are lowercased before matching: much faster than re.IGNORECASE on a large pattern
+        self._regex = re.compile(r"\b" + _trie_pattern(trie)) if trie else None
+
+    @classmethod
+    def from_file(cls, path):
+        with open(path, 'r') as f:
+            return cls(json.load(f))
+
+    def scores(self, article):
+        """Field-weighted keyword hits per category for an article dict (title / description / content)."""
+        scores = {}
+        if self._regex is None:
+            return scores
+        for field, weight in FIELD_WEIGHTS:
+            text = article.get(field)
+            if not text:
+                continue
+            for match in self._regex.finditer(text.lower()):
+                category = self._keyword_categories[int(match.lastgroup[1:])]
+                scores[category] = scores.get(category, 0) + weight
+        return scores
+
+    def classify(self, article, min_score=1):
+        """Categories scoring at least `min_score`, best first (ties in config order)."""
+        scores = self.scores(article)
+        order = {category: index for index, category in enumerate(self.categories)}
+        return sorted((category for category, score in scores.items() if score >= min_score), key=lambda category: (-scores[category], order[category]))
+
+
+def category_attributes(categories):
+    """
+    Pub/Sub message attributes for an article's categories, so subscriptions can filter
+    server-side, e.g. `attributes:category_flood` or `attributes.primary_category = "crime"`.
+    """
+    attributes = {
+        "categories": ','.join(categories),
+        "primary_category": categories[0] if categories else UNCATEGORIZED,
+    }
+    for category in categories:
+        attributes[f"category_{category}"] = "true"
+    return attributes
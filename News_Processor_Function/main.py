@@ -2,13 +2,26 @@
 import os
 import json
 import logging
+import tempfile
 import httpx
+import asyncio
+import threading
+import time
+from contextlib import asynccontextmanager
 from datetime import datetime, timedelta, timezone
 
 from fastapi import FastAPI, Request
 from fastapi.responses import JSONResponse
 
-from google.cloud import pubsub_v1
+from article_ids import article_id_for_url, canonicalize_url
+from classifier import RuleClassifier, category_attributes
+from codec import MessageCodec
+from newsapi_client import NewsApiClient, RequestBudget, RequestBudgetExceeded, TokenBucket
+from response_cache import build_http_transport
+from poller import AdaptivePoller, install_stop_signals
+from publishing import create_batch_publisher
+from recently_published import FirestoreRecentStore, JsonFileRecentStore, RecentlyPublished
+from sinks import FanOutSink, JsonlFileSink, ParquetFileSink, PubSubSink
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
@@ -30,19 +43,220 @@ QUERY_NAME_TO_USE = os.environ.get('QUERY_NAME_TO_USE', 'default_search_query')
 
 FETCH_INTERVAL_MINUTES = int(os.environ.get('FETCH_INTERVAL_MINUTES', '60'))
 
+# Every article in the fetch window is published; the window is read in pages of
+# NEWS_PAGE_SIZE, up to NEWS_MAX_PAGES pages per run (NewsAPI caps pageSize at 100)
+NEWS_PAGE_SIZE = min(int(os.environ.get('NEWS_PAGE_SIZE', '100')), 100)
+NEWS_MAX_PAGES = int(os.environ.get('NEWS_MAX_PAGES', '5'))
+NEWS_FETCH_CONCURRENCY = int(os.environ.get('NEWS_FETCH_CONCURRENCY', '3'))
+
+# Poller mode: instead of waiting for Cloud Scheduler, poll NewsAPI on an interval that
+# tightens while new articles keep arriving and backs off exponentially when runs come back empty
+POLLER_MODE = os.environ.get('POLLER_MODE', 'false').lower() == 'true'
+POLL_MIN_INTERVAL_SECONDS = float(os.environ.get('POLL_MIN_INTERVAL_SECONDS', '60'))
+POLL_MAX_INTERVAL_SECONDS = float(os.environ.get('POLL_MAX_INTERVAL_SECONDS', '3600'))
+POLL_INITIAL_INTERVAL_SECONDS = float(os.environ.get('POLL_INITIAL_INTERVAL_SECONDS', str(FETCH_INTERVAL_MINUTES * 60)))
+POLL_BACKOFF_FACTOR = float(os.environ.get('POLL_BACKOFF_FACTOR', '2.0'))
+POLL_TIGHTEN_FACTOR = float(os.environ.get('POLL_TIGHTEN_FACTOR', '0.5'))
+POLL_BURST_THRESHOLD = int(os.environ.get('POLL_BURST_THRESHOLD', '10'))
+
 # Explicitly define language and sort_by as environment variables
 DEFAULT_LANGUAGE = os.environ.get('DEFAULT_LANGUAGE', 'en')
 DEFAULT_SORT_BY = os.environ.get('DEFAULT_SORT_BY', 'relevancy')
 
+# Response cache under the shared httpx client for NewsAPI calls.
+# NEWS_API_CACHE_MODE is 'off', 'cache' (TTL + ETag/If-Modified-Since revalidation)
+# or 'replay' (strictly offline: serve recorded responses only, for deterministic benchmarks).
+NEWS_API_CACHE_MODE = os.environ.get('NEWS_API_CACHE_MODE', 'off')
+NEWS_API_CACHE_DIR = os.environ.get('NEWS_API_CACHE_DIR', os.path.join(tempfile.gettempdir(), 'newsapi_cache'))
+NEWS_API_CACHE_TTL_SECONDS = int(os.environ.get('NEWS_API_CACHE_TTL_SECONDS', '300'))
+NEWS_API_CACHE_MAX_BYTES = int(os.environ.get('NEWS_API_CACHE_MAX_BYTES', str(50 * 1024 * 1024)))
 
-# Initialize FastAPI app
-app = FastAPI()
+# Shared NewsAPI rate limiter, retry policy and per-run request budget
+NEWS_API_RATE_PER_SECOND = float(os.environ.get('NEWS_API_RATE_PER_SECOND', '2.0'))
+NEWS_API_BURST = int(os.environ.get('NEWS_API_BURST', '5'))
+NEWS_API_MAX_RETRIES = int(os.environ.get('NEWS_API_MAX_RETRIES', '4'))
+NEWS_API_BACKOFF_BASE_SECONDS = float(os.environ.get('NEWS_API_BACKOFF_BASE_SECONDS', '1.0'))
+NEWS_API_BACKOFF_MAX_SECONDS = float(os.environ.get('NEWS_API_BACKOFF_MAX_SECONDS', '30.0'))
+NEWS_API_REQUEST_BUDGET = int(os.environ.get('NEWS_API_REQUEST_BUDGET', '10'))
+
+# Recently-published set of article IDs (hash of the canonical URL): articles from the
+# overlap between consecutive fetch windows are skipped before they are encoded or published.
+# RECENTLY_PUBLISHED_BACKEND is 'memory' (per instance), 'file' or 'firestore' (one small
+# document, shared between instances and surviving cold starts).
+RECENTLY_PUBLISHED_BACKEND = os.environ.get('RECENTLY_PUBLISHED_BACKEND', 'memory')
+RECENTLY_PUBLISHED_FILE = os.environ.get('RECENTLY_PUBLISHED_FILE', os.path.join(tempfile.gettempdir(), 'recently_published.json'))
+# Default: two full fetch windows (interval plus the 5-minute buffer)
+RECENTLY_PUBLISHED_TTL_SECONDS = int(os.environ.get('RECENTLY_PUBLISHED_TTL_SECONDS', str(2 * (FETCH_INTERVAL_MINUTES + 5) * 60)))
+RECENTLY_PUBLISHED_MAX_ENTRIES = int(os.environ.get('RECENTLY_PUBLISHED_MAX_ENTRIES', '5000'))
+
+# Keyword-rule categories published as message attributes, so subscriptions can
+# filter server-side (e.g. `attributes:category_flood`) instead of decoding every message
+CLASSIFY_ARTICLES = os.environ.get('CLASSIFY_ARTICLES', 'true').lower() == 'true'
+CATEGORIES_FILE = os.environ.get('CATEGORIES_FILE', os.path.join(os.path.dirname(__file__), 'categories.json'))
+
+# Outputs for the published article: any of pubsub (RAW_NEWS_TOPIC_NAME), jsonl and parquet
+# (local files under NEWS_OUTPUT_DIR, for runs and benchmarks without cloud services)
+NEWS_SINKS = [name.strip() for name in os.environ.get('NEWS_SINKS', 'pubsub').split(',') if name.strip()]
+NEWS_OUTPUT_DIR = os.environ.get('NEWS_OUTPUT_DIR', os.path.join(tempfile.gettempdir(), 'news_output'))
+
+# Pub/Sub client-side batching and publisher flow control
+PUBSUB_BATCH_MAX_MESSAGES = int(os.environ.get('PUBSUB_BATCH_MAX_MESSAGES', '100'))
+PUBSUB_BATCH_MAX_BYTES = int(os.environ.get('PUBSUB_BATCH_MAX_BYTES', str(1024 * 1024)))
+PUBSUB_BATCH_MAX_LATENCY_SECONDS = float(os.environ.get('PUBSUB_BATCH_MAX_LATENCY_SECONDS', '0.05'))
+PUBSUB_FLOW_CONTROL_MESSAGES = int(os.environ.get('PUBSUB_FLOW_CONTROL_MESSAGES', '1000'))
+PUBSUB_FLOW_CONTROL_BYTES = int(os.environ.get('PUBSUB_FLOW_CONTROL_BYTES', str(10 * 1024 * 1024)))
+
+# Encoding of published messages: PUBSUB_MESSAGE_CODEC is 'json' (compact) or 'msgpack', and
+# payloads of at least PUBSUB_COMPRESS_THRESHOLD_BYTES are zstd-compressed (0 = never). The
+# codec goes in the 'codec' message attribute; keep the defaults while any subscriber reads plain JSON.
+PUBSUB_MESSAGE_CODEC = os.environ.get('PUBSUB_MESSAGE_CODEC', 'json')
+PUBSUB_COMPRESS_THRESHOLD_BYTES = int(os.environ.get('PUBSUB_COMPRESS_THRESHOLD_BYTES', '0'))
+
+# Ordering keys: messages carry their article's ORDERING_KEY_FIELD (source_name) as the
+# ordering key, so subscriptions with message ordering enabled see each source's articles
+# in publishedAt order while different sources are published concurrently
+PUBSUB_MESSAGE_ORDERING = os.environ.get('PUBSUB_MESSAGE_ORDERING', 'true').lower() == 'true'
+ORDERING_KEY_FIELD = os.environ.get('ORDERING_KEY_FIELD', 'source_name')
+
+# Clients are created lazily (on first use, or by the optional background pre-warm
+# in the lifespan handler) so cold starts do not pay for credential discovery and
+# gRPC channel setup before the first request can be routed. The getters block on
+# _client_lock while another thread builds a client, so coroutines call them through
+# run_in_executor unless the client already exists.
+PREWARM_CLIENTS = os.environ.get('PREWARM_CLIENTS', 'true').lower() == 'true'
 
-# Initialize Pub/Sub Publisher Client globally
-publisher = pubsub_v1.PublisherClient()
+_client_lock = threading.Lock()
+_publisher = None
+_http_client = None
+_news_api = None
+_classifier = None
+_recently_published = None
 
-# Initialize HTTPX client globally for persistent connections
-http_client = httpx.AsyncClient()
+
+def get_publisher():
+    """Pub/Sub publisher client (batched, with flow control)."""
+    global _publisher
+    with _client_lock:
+        if _publisher is None:
+            _publisher = create_batch_publisher(
+                max_messages=PUBSUB_BATCH_MAX_MESSAGES,
+                max_bytes=PUBSUB_BATCH_MAX_BYTES,
+                max_latency=PUBSUB_BATCH_MAX_LATENCY_SECONDS,
+                flow_control_messages=PUBSUB_FLOW_CONTROL_MESSAGES,
+                flow_control_bytes=PUBSUB_FLOW_CONTROL_BYTES,
+                enable_message_ordering=PUBSUB_MESSAGE_ORDERING,
+            )
+            logger.info("Pub/Sub publisher client initialized.")
+    return _publisher
+
+
+def get_news_api():
+    """NewsAPI client on a shared HTTPX client; all calls go through one rate limiter."""
+    global _http_client, _news_api
+    with _client_lock:
+        if _news_api is None:
+            _http_client = httpx.AsyncClient(transport=build_http_transport(
+                NEWS_API_CACHE_MODE,
+                NEWS_API_CACHE_DIR,
+                NEWS_API_CACHE_TTL_SECONDS,
+                NEWS_API_CACHE_MAX_BYTES,
+                cacheable_hosts={httpx.URL(NEWS_API_BASE_URL).host},
+            ))
+            _news_api = NewsApiClient(
+                _http_client,
+                NEWS_API_BASE_URL,
+                NEWS_API_KEY,
+                rate_limiter=TokenBucket(rate=NEWS_API_RATE_PER_SECOND, capacity=NEWS_API_BURST),
+                max_retries=NEWS_API_MAX_RETRIES,
+                backoff_base=NEWS_API_BACKOFF_BASE_SECONDS,
+                backoff_max=NEWS_API_BACKOFF_MAX_SECONDS,
+            )
+    return _news_api
+
+
+def get_classifier():
+    """The category rule classifier, compiled on first use; None when classification is off or the rules are missing."""
+    global _classifier
+    if _classifier is None and CLASSIFY_ARTICLES:
+        with _client_lock:
+            if _classifier is None:
+                try:
+                    _classifier = RuleClassifier.from_file(CATEGORIES_FILE)
+                    logger.info(f"Category rules loaded for {_classifier.categories} from {CATEGORIES_FILE}.")
+                except (FileNotFoundError, json.JSONDecodeError) as e:
+                    logger.warning(f"Could not load category rules from {CATEGORIES_FILE}; articles will not be categorized: {e}")
+                    _classifier = False
+    return _classifier or None
+
+
+def get_recently_published():
+    """The recently-published set, with the store selected by RECENTLY_PUBLISHED_BACKEND."""
+    global _recently_published
+    with _client_lock:
+        if _recently_published is None:
+            if RECENTLY_PUBLISHED_BACKEND == 'firestore':
+                from google.cloud import firestore
+                store = FirestoreRecentStore(firestore.Client())
+            elif RECENTLY_PUBLISHED_BACKEND == 'file':
+                store = JsonFileRecentStore(RECENTLY_PUBLISHED_FILE)
+            else:
+                store = None
+            _recently_published = RecentlyPublished(RECENTLY_PUBLISHED_TTL_SECONDS, RECENTLY_PUBLISHED_MAX_ENTRIES, store)
+    return _recently_published
+
+
+async def prewarm_clients():
+    loop = asyncio.get_running_loop()
+    try:
+        if 'pubsub' in NEWS_SINKS:
+            await loop.run_in_executor(None, get_publisher)
+        for getter in (get_news_api, get_classifier, get_recently_published):
+            await loop.run_in_executor(None, getter)
+        logger.info("Client pre-warm complete.")
+    except Exception as e:
+        logger.warning(f"Client pre-warm failed; clients will be created on first use: {e}")
+
+
+async def close_clients():
+    global _http_client, _news_api, _publisher
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
+        _news_api = None
+    if _publisher is not None:
+        publisher, _publisher = _publisher, None
+        await asyncio.get_running_loop().run_in_executor(None, publisher.stop)
+
+
+def build_sinks():
+    """A fan-out over the outputs named in NEWS_SINKS."""
+    sinks = []
+    for name in NEWS_SINKS:
+        if name == 'pubsub':
+            publisher = get_publisher()
+            sinks.append(PubSubSink(publisher, publisher.topic_path(GCP_PROJECT_ID, RAW_NEWS_TOPIC_NAME), flush_size=PUBSUB_BATCH_MAX_MESSAGES,
+                                    ordering_key_field=ORDERING_KEY_FIELD if PUBSUB_MESSAGE_ORDERING else None,
+                                    codec=MessageCodec(PUBSUB_MESSAGE_CODEC, PUBSUB_COMPRESS_THRESHOLD_BYTES)))
+        elif name == 'jsonl':
+            sinks.append(JsonlFileSink(os.path.join(NEWS_OUTPUT_DIR, 'raw_news.jsonl')))
+        elif name == 'parquet':
+            sinks.append(ParquetFileSink(os.path.join(NEWS_OUTPUT_DIR, 'raw_news')))
+        else:
+            raise ValueError(f"Unknown sink '{name}' in NEWS_SINKS; use pubsub, jsonl or parquet")
+    return FanOutSink(sinks)
+
+
+@asynccontextmanager
+async def lifespan(app):
+    prewarm_task = asyncio.create_task(prewarm_clients()) if PREWARM_CLIENTS else None
+    yield
+    if prewarm_task is not None and not prewarm_task.done():
+        prewarm_task.cancel()
+    await close_clients()
+
+
+# Initialize FastAPI app
+app = FastAPI(lifespan=lifespan)
 
 # Load queries from JSON file at startup (will be used if DEFAULT_SEARCH_QUERY_ENV is not set)
 _queries = {}
@@ -64,22 +278,128 @@ except json.JSONDecodeError:
     }
 
 
-@app.on_event("shutdown")
-async def shutdown_event():
-    await http_client.aclose()
+@app.get("/healthz")
+async def healthz():
+    return {"status": "ok"}
 
-@app.post("/")
-async def ingest_news(request: Request):
+
+async def fetch_window_articles(query, from_iso, budget=None):
     """
-    Cloud Run service endpoint to fetch news articles from NewsAPI.org
-    and publish them to Pub/Sub.
-    Triggered by HTTP (e.g., from Cloud Scheduler).
+    Every article NewsAPI.org returns for `query` since `from_iso`: the first page, then
+    the remaining pages (up to NEWS_MAX_PAGES) concurrently. Errors on the first page
+    propagate; a failed later page is logged and skipped. Returns (articles, complete):
+    complete is False when a page failed or NEWS_MAX_PAGES stopped short of totalResults.
     """
-    logger.info("News Ingestor Cloud Run service triggered.")
+    news_api = _news_api or await asyncio.get_running_loop().run_in_executor(None, get_news_api)
+    params = {
+        "q": query,
+        "language": DEFAULT_LANGUAGE,
+        "sortBy": DEFAULT_SORT_BY,
+        "from": from_iso,
+        "pageSize": NEWS_PAGE_SIZE,
+    }
+    first_page = await news_api.get_json({**params, "page": 1}, budget=budget)
+    articles = list(first_page.get('articles', []))
+    total_results = first_page.get('totalResults', 0) or 0
+    total_pages = min(-(-total_results // NEWS_PAGE_SIZE), NEWS_MAX_PAGES)
+    if total_pages <= 1:
+        return articles, total_results <= len(articles)
+
+    semaphore = asyncio.Semaphore(max(1, NEWS_FETCH_CONCURRENCY))
 
+    async def fetch_page(page):
+        async with semaphore:
+            try:
+                return (await news_api.get_json({**params, "page": page}, budget=budget)).get('articles', [])
+            except (httpx.HTTPStatusError, httpx.RequestError, json.JSONDecodeError, RequestBudgetExceeded) as e:
+                logger.warning(f"Failed to fetch page {page} for query '{query}': {e}")
+                return None
+
+    pages = await asyncio.gather(*(fetch_page(page) for page in range(2, total_pages + 1)))
+    for page_articles in pages:
+        articles.extend(page_articles or [])
+    complete = None not in pages and total_results <= len(articles)
+    if not complete:
+        logger.warning(f"Fetched {len(articles)} of {total_results} results for query '{query}' "
+                       f"({pages.count(None)} failed pages, NEWS_MAX_PAGES={NEWS_MAX_PAGES}).")
+    return articles, complete
+
+
+def build_article_data(article, article_id, query):
+    return {
+        "article_id": article_id,
+        "title": article.get('title'),
+        "description": article.get('description'),
+        "url": article.get('url'),
+        "canonical_url": canonicalize_url(article['url']),
+        "publishedAt": article.get('publishedAt'),
+        "source_name": (article.get('source') or {}).get('name'),
+        "author": article.get('author'),
+        "content": article.get('content'),
+        "query_keywords": query,
+        "ingestedAt": datetime.now(timezone.utc).isoformat()
+    }
+
+
+async def publish_articles(articles, query):
+    """
+    Publishes every valid, not-yet-published article to the sinks in one pass and returns
+    one outcome per input article: {"status": "published" | "failed" | "skipped", ...}.
+    Articles go out oldest first, so with ordering keys each source's stream is chronological.
+    """
+    outcomes = []
+    queued = {}  # article_id -> its outcome, filled in once the sinks are closed
+    loop = asyncio.get_running_loop()
+    classifier = await loop.run_in_executor(None, get_classifier)
+    recently_published = await loop.run_in_executor(None, get_recently_published)
+    await recently_published.load()
+    sink = await loop.run_in_executor(None, build_sinks)
+
+    for article in sorted(articles, key=lambda article: article.get('publishedAt') or ''):
+        title = article.get('title')
+        if not title or not article.get('url'):
+            outcomes.append({"title": title, "url": article.get('url'), "status": "skipped", "reason": "missing title or URL"})
+            continue
+
+        article_id = article_id_for_url(article['url'])
+        outcome = {"article_id": article_id, "title": title, "source_name": (article.get('source') or {}).get('name')}
+        outcomes.append(outcome)
+        if article_id in queued or article_id in recently_published:
+            outcome.update(status="skipped", reason="already published")
+            continue
+
+        article_data = build_article_data(article, article_id, query)
+
+        attributes = {"article_id": article_id}
+        if classifier is not None:
+            article_data["categories"] = classifier.classify(article_data)
+            attributes.update(category_attributes(article_data["categories"]))
+        queued[article_id] = outcome
+        await sink.add(article_data, doc_id=article_id, attributes=attributes)
+
+    await sink.close()
+    failures = sink.failures
+    message_ids = sink.message_ids
+    for article_id, outcome in queued.items():
+        if article_id in failures:
+            outcome.update(status="failed", error=failures[article_id])
+        else:
+            outcome.update(status="published", message_id=message_ids.get(article_id))
+            recently_published.add(article_id)
+    await recently_published.save()
+    return outcomes
+
+
+async def run_ingestion(lookback_minutes=FETCH_INTERVAL_MINUTES):
+    """
+    One run: fetches every article of the last `lookback_minutes` (plus a buffer) from
+    NewsAPI.org and publishes each one not published before. Shared by the HTTP trigger
+    and the poller. Returns (response content with per-article outcomes, HTTP status code);
+    the status is 5xx when the window could not be fetched in full or nothing in it was published.
+    """
     if not NEWS_API_KEY or NEWS_API_KEY == 'YOUR_NEWSAPI_KEY':
         logger.error("NewsAPI.org API Key is not configured. Please set NEWS_API_KEY environment variable.")
-        return JSONResponse(content={"error": "NewsAPI.org API Key not configured"}, status_code=500)
+        return {"error": "NewsAPI.org API Key not configured"}, 500
 
     # Determine the search query: prioritize DEFAULT_SEARCH_QUERY_ENV, then QUERY_NAME_TO_USE, then default in JSON
     if DEFAULT_SEARCH_QUERY_ENV:
@@ -91,80 +411,112 @@ async def ingest_news(request: Request):
 
     if not current_search_query:
         logger.error("Search query could not be determined from environment or queries.json.")
-        return JSONResponse(content={"error": "Search query not configured"}, status_code=500)
+        return {"error": "Search query not configured"}, 500
 
 
     try:
         # Calculate time from which to fetch news (e.g., last 60 minutes + 5 minute buffer)
         # Adding a small buffer to ensure we don't miss articles due to indexing delays
-        from_time = datetime.now(timezone.utc) - timedelta(minutes=FETCH_INTERVAL_MINUTES + 5) # <--- ADDED +5 MINUTE BUFFER
+        from_time = datetime.now(timezone.utc) - timedelta(minutes=lookback_minutes + 5) # <--- ADDED +5 MINUTE BUFFER
         from_iso = from_time.isoformat(timespec='seconds').replace('+00:00', 'Z')
 
-        params = {
-            "q": current_search_query,
-            "language": DEFAULT_LANGUAGE,
-            "sortBy": DEFAULT_SORT_BY,
-            "from": from_iso,
-            "pageSize": 1,
-            "apiKey": NEWS_API_KEY
-        }
-        
-        logger.info(f"Fetching news with query: '{current_search_query}' from {from_iso} with pageSize=1")
-        
-        response = await http_client.get(NEWS_API_BASE_URL, params=params, timeout=30.0)
-        response.raise_for_status()
-        
-        news_data = response.json()
-        articles = news_data.get('articles', [])
-
-        if not articles:
-            logger.info(f"No new articles found for query: '{current_search_query}' in the last {FETCH_INTERVAL_MINUTES} minutes.")
-            return JSONResponse(content={"status": "No new articles"}, status_code=200)
-
-        article = articles[0]
-        
-        if not article.get('title') or not article.get('url'):
-            logger.warning(f"Skipping article due to missing title or URL: {article}")
-            return JSONResponse(content={"status": "Skipped article due to missing data"}, status_code=200)
-
-        article_data = {
-            "title": article.get('title'),
-            "description": article.get('description'),
-            "url": article.get('url'),
-            "publishedAt": article.get('publishedAt'),
-            "source_name": article.get('source', {}).get('name'),
-            "author": article.get('author'),
-            "content": article.get('content'),
-            "query_keywords": current_search_query,
-            "ingestedAt": datetime.now(timezone.utc).isoformat()
-        }
-        
-        message_data = json.dumps(article_data).encode('utf-8')
-        topic_path = publisher.topic_path(GCP_PROJECT_ID, RAW_NEWS_TOPIC_NAME)
-        future = publisher.publish(topic_path, message_data)
-        await future
-        
-        logger.info(f"Successfully published ONE article '{article.get('title')[:50]}...' to Pub/Sub topic '{RAW_NEWS_TOPIC_NAME}'.")
-        return JSONResponse(content={"status": f"Successfully published 1 article"}, status_code=200)
+        logger.info(f"Fetching news with query: '{current_search_query}' from {from_iso} with pageSize={NEWS_PAGE_SIZE}")
+
+        articles, complete = await fetch_window_articles(current_search_query, from_iso, budget=RequestBudget(NEWS_API_REQUEST_BUDGET))
+
+        if not articles and complete:
+            logger.info(f"No new articles found for query: '{current_search_query}' in the last {lookback_minutes:.0f} minutes.")
+            return {"status": "No new articles", "published": 0}, 200
+
+        outcomes = await publish_articles(articles, current_search_query)
+        counts = {status: sum(1 for outcome in outcomes if outcome["status"] == status) for status in ("published", "failed", "skipped")}
+        recent_stats = _recently_published.stats()  # built by publish_articles()
+        content = {"status": f"Published {counts['published']} of {len(articles)} articles", **counts,
+                   "recently_published": recent_stats, "articles": outcomes}
 
+        logger.info(f"Published {counts['published']} articles to {NEWS_SINKS} ({counts['failed']} failed, {counts['skipped']} skipped); "
+                    f"recently-published cache: {recent_stats}")
+        if counts["failed"] and not counts["published"]:
+            # Nothing got through: report an error so the trigger retries the window
+            return {"error": "Publish failed for every article", **content}, 500
+        if not complete:
+            # What was fetched is published (a retry skips it as recently published), but the
+            # window is retried so the pages that were not fetched are not lost
+            return {"error": "Fetched only part of the window", **content}, 503
+        return content, 200
+
+    except RequestBudgetExceeded as e:
+        # The window was not fetched: not a success, so the trigger retries it and the
+        # poller keeps looking back to its last successful poll
+        logger.warning(f"Stopping run: {e}")
+        return {"error": f"Request budget exhausted: {e}"}, 503
     except httpx.HTTPStatusError as e:
         logger.error(f"HTTP error fetching news: {e.response.status_code} - {e.response.text}", exc_info=True)
-        return JSONResponse(content={"error": f"HTTP error fetching news: {e.response.status_code}"}, status_code=500)
+        return {"error": f"HTTP error fetching news: {e.response.status_code}"}, 500
     except httpx.RequestError as e:
         logger.error(f"Network error fetching news: {e}", exc_info=True)
-        return JSONResponse(content={"error": f"Network error fetching news: {e}"}, status_code=500)
+        return {"error": f"Network error fetching news: {e}"}, 500
     except json.JSONDecodeError as e:
         logger.error(f"JSON decoding error from NewsAPI response: {e}", exc_info=True)
-        return JSONResponse(content={"error": "Invalid JSON from NewsAPI"}, status_code=500)
+        return {"error": "Invalid JSON from NewsAPI"}, 500
     except Exception as e:
         logger.error(f"Unexpected error in news_ingestor: {e}", exc_info=True)
-        return JSONResponse(content={"error": f"Internal Server Error: {e}"}, status_code=500)
+        return {"error": f"Internal Server Error: {e}"}, 500
+
 
-# For local development
+@app.post("/")
+async def ingest_news(request: Request):
+    """
+    Cloud Run service endpoint to fetch news articles from NewsAPI.org
+    and publish them to Pub/Sub.
+    Triggered by HTTP (e.g., from Cloud Scheduler).
+    """
+    logger.info("News Ingestor Cloud Run service triggered.")
+    content, status_code = await run_ingestion()
+    return JSONResponse(content=content, status_code=status_code)
+
+
+async def run_poller():
+    """Long-running alternative to the Cloud Scheduler trigger: polls on an adaptive interval until SIGTERM / SIGINT."""
+    stop_event = asyncio.Event()
+    install_stop_signals(stop_event)
+
+    async def poll_once():
+        # Look back to the start of the last successful poll, so no window is skipped as the interval grows
+        if poller.last_success_at is None:
+            lookback_minutes = FETCH_INTERVAL_MINUTES
+        else:
+            lookback_minutes = (time.time() - poller.last_success_at) / 60
+        content, status_code = await run_ingestion(lookback_minutes)
+        if status_code >= 500:
+            raise RuntimeError(content.get("error"))
+        return content.get("published", 0)
+
+    poller = AdaptivePoller(
+        poll_once,
+        min_interval=POLL_MIN_INTERVAL_SECONDS,
+        max_interval=POLL_MAX_INTERVAL_SECONDS,
+        initial_interval=POLL_INITIAL_INTERVAL_SECONDS,
+        backoff_factor=POLL_BACKOFF_FACTOR,
+        tighten_factor=POLL_TIGHTEN_FACTOR,
+        burst_threshold=POLL_BURST_THRESHOLD,
+    )
+    logger.info(f"Starting news poller (interval {POLL_MIN_INTERVAL_SECONDS:.0f}s .. {POLL_MAX_INTERVAL_SECONDS:.0f}s).")
+    try:
+        await poller.run(stop_event)
+    finally:
+        await close_clients()
+
+
+# For local development; `python main.py --poll` (or POLLER_MODE=true) runs the poller instead of the HTTP server
 if __name__ == '__main__':
-    import uvicorn
+    import sys
     from dotenv import load_dotenv
     load_dotenv()
-    
-    port = int(os.environ.get('PORT', 8080))
-    uvicorn.run(app, host='0.0.0.0', port=port)
+
+    if POLLER_MODE or '--poll' in sys.argv[1:]:
+        asyncio.run(run_poller())
+    else:
+        import uvicorn
+        port = int(os.environ.get('PORT', 8080))
+        uvicorn.run(app, host='0.0.0.0', port=port)
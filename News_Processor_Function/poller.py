@@ -0,0 +1,83 @@
+# poller.py
+import asyncio
+import logging
+import random
+import signal
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class AdaptivePoller:
+    """
+    Calls `poll_once()` (an async callable returning how many new articles it found)
+    in a loop, adapting the wait between polls to how busy the news is:
+
+    - new articles: the interval is multiplied by `tighten_factor`, and drops straight to
+      `min_interval` once `burst_threshold` or more arrive in one poll;
+    - nothing new, or an error: the interval is multiplied by `backoff_factor`;
+    - the interval always stays within [min_interval, max_interval] and each wait is
+      jittered by +/- `jitter` so several pollers do not fire in lockstep.
+    """
+
+    def __init__(self, poll_once, min_interval=60.0, max_interval=3600.0, initial_interval=None,
+                 backoff_factor=2.0, tighten_factor=0.5, burst_threshold=10, jitter=0.1):
+        if min_interval <= 0 or max_interval < min_interval:
+            raise ValueError("Poll intervals must satisfy 0 < min_interval <= max_interval")
+        self.poll_once = poll_once
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.interval = self._clamp(initial_interval if initial_interval is not None else min_interval)
+        self.backoff_factor = backoff_factor
+        self.tighten_factor = tighten_factor
+        self.burst_threshold = burst_threshold
+        self.jitter = jitter
+        self.polls = 0
+        self.errors = 0
+        self.last_success_at = None  # time.time() when the last successful poll started
+
+    def _clamp(self, interval):
+        return max(self.min_interval, min(self.max_interval, interval))
+
+    def next_interval(self, new_articles):
+        """Updates and returns the base interval after a poll that found `new_articles` (None on error)."""
+        if new_articles is None or new_articles <= 0:
+            self.interval = self._clamp(self.interval * self.backoff_factor)
+        elif new_articles >= self.burst_threshold:
+            self.interval = self.min_interval
+        else:
+            self.interval = self._clamp(self.interval * self.tighten_factor)
+        return self.interval
+
+    async def run(self, stop_event=None):
+        """Polls until `stop_event` is set (or forever)."""
+        stop_event = stop_event or asyncio.Event()
+        while not stop_event.is_set():
+            started_at = time.time()
+            self.polls += 1
+            try:
+                new_articles = await self.poll_once()
+                self.last_success_at = started_at
+            except Exception as e:
+                self.errors += 1
+                new_articles = None
+                logger.error(f"Poll {self.polls} failed: {e}", exc_info=True)
+
+            interval = self.next_interval(new_articles)
+            wait = interval * random.uniform(1 - self.jitter, 1 + self.jitter)
+            logger.info(f"Poll {self.polls} found {new_articles if new_articles is not None else 'error'}; next poll in {wait:.1f}s")
+            try:
+                await asyncio.wait_for(stop_event.wait(), timeout=wait)
+            except asyncio.TimeoutError:
+                pass
+        logger.info(f"Poller stopped after {self.polls} polls ({self.errors} failed).")
+
+
+def install_stop_signals(stop_event):
+    """Sets `stop_event` on SIGTERM / SIGINT so the loop finishes its current poll and exits cleanly."""
+    loop = asyncio.get_running_loop()
+    for signum in (signal.SIGTERM, signal.SIGINT):
+        try:
+            loop.add_signal_handler(signum, stop_event.set)
+        except (NotImplementedError, RuntimeError):
+            pass
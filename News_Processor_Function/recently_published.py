@@ -0,0 +1,132 @@
+# recently_published.py
+import asyncio
+import json
+import logging
+import os
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class RecentlyPublished:
+    """
+    Article IDs (canonical URL hashes) published in the last `ttl_seconds`, so the
+    overlap between consecutive fetch windows is skipped before anything is encoded
+    or published. Unlike a Bloom filter it is exact and forgets old articles, so it
+    stays small; at most `max_entries` are kept (oldest evicted first).
+
+    With a `store` (FirestoreRecentStore / JsonFileRecentStore), load() merges the
+    persisted entries in at the start of a run and save() merges this instance's
+    entries back, so the set survives cold starts and is shared between instances.
+    """
+
+    def __init__(self, ttl_seconds=7800, max_entries=5000, store=None):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.store = store
+        self._published_at = {}  # article_id -> time.time() of publish; insertion order is publish order
+        self.hits = self.misses = self.evictions = 0
+
+    def __len__(self):
+        return len(self._published_at)
+
+    def __contains__(self, article_id):
+        published_at = self._published_at.get(article_id)
+        if published_at is not None and published_at > time.time() - self.ttl_seconds:
+            self.hits += 1
+            return True
+        self.misses += 1
+        return False
+
+    def add(self, article_id, published_at=None):
+        self._published_at.pop(article_id, None)
+        self._published_at[article_id] = published_at or time.time()
+
+    def expire(self):
+        """Drops entries older than the TTL, then the oldest ones beyond max_entries."""
+        cutoff = time.time() - self.ttl_seconds
+        expired = [article_id for article_id, published_at in self._published_at.items() if published_at <= cutoff]
+        overflow = len(self._published_at) - len(expired) - self.max_entries
+        if overflow > 0:
+            # Entries are in publish order, so the first live ones are the oldest
+            live = (article_id for article_id, published_at in self._published_at.items() if published_at > cutoff)
+            expired.extend(next(live) for _ in range(overflow))
+        for article_id in expired:
+            del self._published_at[article_id]
+        self.evictions += len(expired)
+
+    def _merge(self, entries):
+        merged = {**entries}
+        for article_id, published_at in self._published_at.items():
+            merged[article_id] = max(published_at, merged.get(article_id, 0))
+        self._published_at = dict(sorted(merged.items(), key=lambda item: item[1]))
+        self.expire()
+
+    async def load(self):
+        if self.store is None:
+            return
+        try:
+            entries = await asyncio.get_running_loop().run_in_executor(None, self.store.read)
+        except Exception as e:
+            logger.warning(f"Could not load recently-published articles; using this instance's set only: {e}")
+            return
+        self._merge(entries)
+
+    async def save(self):
+        """Merges with whatever another instance saved meanwhile, expires old entries and writes the set back."""
+        self.expire()
+        if self.store is None:
+            return
+        loop = asyncio.get_running_loop()
+        try:
+            self._merge(await loop.run_in_executor(None, self.store.read))
+            await loop.run_in_executor(None, self.store.write, dict(self._published_at))
+        except Exception as e:
+            logger.warning(f"Could not save recently-published articles: {e}")
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._published_at),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else None,
+            "evictions": self.evictions,
+        }
+
+
+class FirestoreRecentStore:
+    """All entries in one small Firestore document ({"entries": {article_id: published_at}})."""
+
+    def __init__(self, db, collection_name='ingestion_state', document_id='recently_published'):
+        self.doc_ref = db.collection(collection_name).document(document_id)
+
+    def read(self):
+        snapshot = self.doc_ref.get()
+        return (snapshot.to_dict() or {}).get('entries', {}) if snapshot.exists else {}
+
+    def write(self, entries):
+        self.doc_ref.set({'entries': entries})
+
+
+class JsonFileRecentStore:
+    """Local JSON-file store, for local runs and a single long-lived poller."""
+
+    def __init__(self, path):
+        self.path = path
+
+    def read(self):
+        try:
+            with open(self.path, 'r') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+        except json.JSONDecodeError:
+            logger.error(f"Recently-published file {self.path} is corrupt; starting empty.")
+            return {}
+
+    def write(self, entries):
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(entries, f)
+        os.replace(tmp_path, self.path)
@@ -0,0 +1,189 @@
+# response_cache.py
+import asyncio
+import base64
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+# Parameters that never change the response and must never be written to disk
+EXCLUDED_PARAMS = {'apikey', 'api_key'}
+# The cached body is stored decoded, so these no longer describe it
+_DROPPED_HEADERS = {'content-encoding', 'content-length', 'transfer-encoding', 'connection'}
+
+
+def cache_key(request):
+    """Key for a request: method, host, path and sorted query params without the API key."""
+    params = sorted((key, value) for key, value in request.url.params.multi_items() if key.lower() not in EXCLUDED_PARAMS)
+    normalized = json.dumps([request.method, request.url.host, request.url.path, params])
+    return hashlib.sha256(normalized.encode('utf-8')).hexdigest()
+
+
+class DiskResponseStore:
+    """
+    One JSON file per cached response in `directory`, evicted least-recently-used
+    once the files add up to more than `max_bytes`.
+    """
+
+    def __init__(self, directory, max_bytes=50 * 1024 * 1024):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+        entries = []
+        for name in os.listdir(directory):
+            if name.endswith('.json'):
+                stat = os.stat(os.path.join(directory, name))
+                entries.append((stat.st_mtime, name[:-5], stat.st_size))
+        self._sizes = OrderedDict((key, size) for _, key, size in sorted(entries))
+        self._total_bytes = sum(self._sizes.values())
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.json")
+
+    def get(self, key):
+        with self._lock:
+            if key not in self._sizes:
+                return None
+            self._sizes.move_to_end(key)
+        try:
+            with open(self._path(key), 'r') as f:
+                entry = json.load(f)
+            os.utime(self._path(key))
+            return entry
+        except (OSError, json.JSONDecodeError):
+            self.delete(key)
+            return None
+
+    def put(self, key, entry):
+        data = json.dumps(entry).encode('utf-8')
+        tmp_path = f"{self._path(key)}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, self._path(key))
+        with self._lock:
+            self._total_bytes += len(data) - self._sizes.pop(key, 0)
+            self._sizes[key] = len(data)
+            while self._total_bytes > self.max_bytes and len(self._sizes) > 1:
+                oldest_key, size = self._sizes.popitem(last=False)
+                self._total_bytes -= size
+                try:
+                    os.remove(self._path(oldest_key))
+                except OSError:
+                    pass
+
+    def delete(self, key):
+        with self._lock:
+            self._total_bytes -= self._sizes.pop(key, 0)
+        try:
+            os.remove(self._path(key))
+        except OSError:
+            pass
+
+
+class CachingTransport(httpx.AsyncBaseTransport):
+    """
+    httpx transport that caches successful GET responses for `cacheable_hosts`.
+
+    mode='cache': fresh entries (younger than ttl_seconds) are served from disk; stale
+    entries with an ETag / Last-Modified are revalidated with If-None-Match /
+    If-Modified-Since and a 304 refreshes them; everything else goes to the network
+    and is recorded.
+    mode='replay': strictly offline; recorded responses are served regardless of age
+    and a miss returns a 404 (not retried by NewsApiClient) without touching the network.
+    """
+
+    def __init__(self, transport, store, ttl_seconds=300, mode='cache', cacheable_hosts=None):
+        if mode not in ('cache', 'replay'):
+            raise ValueError(f"Unknown cache mode: {mode}")
+        self.transport = transport
+        self.store = store
+        self.ttl_seconds = ttl_seconds
+        self.mode = mode
+        self.cacheable_hosts = set(cacheable_hosts) if cacheable_hosts else None
+        self.hits = self.misses = self.revalidated = 0
+
+    def _is_cacheable(self, request):
+        return request.method == 'GET' and (self.cacheable_hosts is None or request.url.host in self.cacheable_hosts)
+
+    @staticmethod
+    def _to_response(entry, request):
+        return httpx.Response(
+            entry['status_code'],
+            headers=entry['headers'],
+            content=base64.b64decode(entry['body']),
+            request=request,
+            extensions={'from_cache': True},
+        )
+
+    async def handle_async_request(self, request):
+        if not self._is_cacheable(request):
+            return await self.transport.handle_async_request(request)
+
+        loop = asyncio.get_running_loop()
+        key = cache_key(request)
+        entry = await loop.run_in_executor(None, self.store.get, key)
+
+        if self.mode == 'replay':
+            if entry is None:
+                self.misses += 1
+                logger.warning(f"No recorded response for {request.url.copy_remove_param('apiKey')} (replay mode)")
+                return httpx.Response(404, json={"status": "error", "code": "notRecorded", "message": "No recorded response (replay mode)"}, request=request)
+            self.hits += 1
+            return self._to_response(entry, request)
+
+        if entry is not None and time.time() - entry['stored_at'] < self.ttl_seconds:
+            self.hits += 1
+            return self._to_response(entry, request)
+
+        if entry is not None:
+            if entry.get('etag'):
+                request.headers['If-None-Match'] = entry['etag']
+            if entry.get('last_modified'):
+                request.headers['If-Modified-Since'] = entry['last_modified']
+
+        response = await self.transport.handle_async_request(request)
+
+        if response.status_code == 304 and entry is not None:
+            await response.aclose()
+            self.revalidated += 1
+            entry['stored_at'] = time.time()
+            await loop.run_in_executor(None, self.store.put, key, entry)
+            return self._to_response(entry, request)
+
+        self.misses += 1
+        body = await response.aread()
+        headers = {name: value for name, value in response.headers.items() if name.lower() not in _DROPPED_HEADERS}
+        if response.status_code == 200:
+            new_entry = {
+                'status_code': response.status_code,
+                'headers': headers,
+                'body': base64.b64encode(body).decode('ascii'),
+                'etag': response.headers.get('ETag'),
+                'last_modified': response.headers.get('Last-Modified'),
+                'stored_at': time.time(),
+            }
+            await loop.run_in_executor(None, self.store.put, key, new_entry)
+        return httpx.Response(response.status_code, headers=headers, content=body, request=request, extensions=response.extensions)
+
+    async def aclose(self):
+        await self.transport.aclose()
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses, "revalidated": self.revalidated}
+
+
+def build_http_transport(mode, directory, ttl_seconds, max_bytes, cacheable_hosts=None):
+    """Returns the transport for the shared httpx.AsyncClient: plain, or wrapped in the response cache."""
+    transport = httpx.AsyncHTTPTransport()
+    if mode == 'off':
+        return transport
+    logger.info(f"Response cache enabled (mode={mode}, dir={directory}, ttl={ttl_seconds}s, max_bytes={max_bytes})")
+    return CachingTransport(transport, DiskResponseStore(directory, max_bytes), ttl_seconds=ttl_seconds, mode=mode, cacheable_hosts=cacheable_hosts)
@@ -0,0 +1,324 @@
+# sinks.py
+import asyncio
+import json
+import logging
+import os
+import time
+
+from codec import MessageCodec
+from publishing import publish_all
+
+logger = logging.getLogger(__name__)
+
+# Firestore rejects batches with more than 500 writes
+FIRESTORE_MAX_BATCH_SIZE = 500
+
+
+class BatchSink:
+    """
+    Base class for article outputs. Records are (data, doc_id, attributes); they are
+    buffered and written in batches by the subclass's _write_batch(items).
+
+    A batch is written when `flush_size` records are buffered, when `flush_interval`
+    seconds have passed since the first buffered record, or on close().
+
+    Back-pressure: at most `max_buffered` records may be buffered or in flight at once;
+    add() waits for earlier batches to finish before accepting more, so a slow
+    destination slows the producer down instead of growing memory without bound.
+
+    Records with a doc_id that fail are listed in `failures` (doc_id -> error).
+    """
+
+    name = 'sink'
+
+    def __init__(self, flush_size=100, flush_interval=2.0, max_buffered=None):
+        self.flush_size = max(1, flush_size)
+        self.flush_interval = flush_interval
+        self.max_buffered = max(max_buffered or 4 * self.flush_size, self.flush_size)
+        self._outstanding = 0  # records buffered or being written
+        self._has_room = asyncio.Event()
+        self._has_room.set()
+        self._buffer = []
+        self._lock = asyncio.Lock()
+        self._timer_task = None
+        self.batches_committed = 0
+        self.docs_written = 0
+        self.docs_failed = 0
+        self.batch_stats = []
+        self.failures = {}
+        self.last_error = None
+
+    def _buffer_record(self, record):
+        self._buffer.append(record)
+        self._outstanding += 1
+        if self._outstanding >= self.max_buffered:
+            self._has_room.clear()
+
+    def try_add(self, data, doc_id=None, attributes=None):
+        """
+        Buffers one record without awaiting if that needs neither a flush nor waiting
+        for room; returns False (and buffers nothing) otherwise, so the caller can fall
+        back to add(). Saves a coroutine per record on the hot path.
+        """
+        if self._outstanding >= self.max_buffered or len(self._buffer) + 1 >= self.flush_size:
+            return False
+        self._buffer_record((data, doc_id, attributes))
+        if self._timer_task is None and self.flush_interval:
+            self._timer_task = asyncio.create_task(self._flush_after_interval())
+        return True
+
+    async def add(self, data, doc_id=None, attributes=None):
+        """Buffers one record, first waiting for room if max_buffered are outstanding; writes a batch once flush_size is reached."""
+        while self._outstanding >= self.max_buffered:
+            await self._has_room.wait()
+        self._buffer_record((data, doc_id, attributes))
+        if len(self._buffer) >= self.flush_size:
+            await self.flush()
+        elif self._timer_task is None and self.flush_interval:
+            self._timer_task = asyncio.create_task(self._flush_after_interval())
+
+    async def _flush_after_interval(self):
+        try:
+            await asyncio.sleep(self.flush_interval)
+            self._timer_task = None
+            await self.flush()
+        except asyncio.CancelledError:
+            pass
+
+    async def _write_batch(self, items):
+        """Writes one batch; returns how many records failed, or raises if the whole batch failed."""
+        raise NotImplementedError
+
+    async def flush(self):
+        """Writes everything currently buffered, in chunks of at most flush_size."""
+        async with self._lock:
+            if self._timer_task is not None and self._timer_task is not asyncio.current_task():
+                self._timer_task.cancel()
+            self._timer_task = None
+
+            while self._buffer:
+                items = self._buffer[:self.flush_size]
+                del self._buffer[:self.flush_size]
+
+                start = time.perf_counter()
+                try:
+                    failed = await self._write_batch(items)
+                except Exception as e:
+                    failed = len(items)
+                    self.last_error = f"{type(e).__name__}: {e}"
+                    self.failures.update((doc_id, self.last_error) for _, doc_id, _ in items if doc_id)
+                    logger.error(f"{self.name}: batch of {len(items)} records failed: {e}", exc_info=True)
+                finally:
+                    self._outstanding -= len(items)
+                    if self._outstanding < self.max_buffered:
+                        self._has_room.set()
+                latency_ms = (time.perf_counter() - start) * 1000
+
+                self.docs_failed += failed
+                if failed < len(items):
+                    self.batches_committed += 1
+                    self.docs_written += len(items) - failed
+                    self.batch_stats.append({"docs": len(items) - failed, "latency_ms": round(latency_ms, 1)})
+                    logger.info(f"{self.name}: wrote batch of {len(items) - failed} records in {latency_ms:.1f} ms")
+
+    async def close(self):
+        """Flushes any remaining records."""
+        await self.flush()
+
+    def stats(self):
+        return {
+            "batches_committed": self.batches_committed,
+            "docs_written": self.docs_written,
+            "docs_failed": self.docs_failed,
+            "batches": self.batch_stats
+        }
+
+
+class FirestoreBatchSink(BatchSink):
+    """
+    Commits documents to a Firestore collection in write batches of up to 500. Commits
+    run in the default executor so the event loop never blocks on the synchronous client.
+    """
+
+    name = 'firestore'
+
+    def __init__(self, db, collection_name, flush_size=FIRESTORE_MAX_BATCH_SIZE, flush_interval=2.0, max_buffered=None):
+        super().__init__(min(flush_size, FIRESTORE_MAX_BATCH_SIZE), flush_interval, max_buffered)
+        self.db = db
+        self.collection_name = collection_name
+
+    def _commit_batch(self, items):
+        collection = self.db.collection(self.collection_name)
+        batch = self.db.batch()
+        for data, doc_id, _ in items:
+            doc_ref = collection.document(doc_id) if doc_id else collection.document()
+            batch.set(doc_ref, data)
+        batch.commit()
+
+    async def _write_batch(self, items):
+        await asyncio.get_running_loop().run_in_executor(None, self._commit_batch, items)
+        return 0
+
+
+class PubSubSink(BatchSink):
+    """
+    Publishes each record to a Pub/Sub topic, encoded by `codec` (a codec.MessageCodec;
+    compact JSON by default), with its attributes plus the codec attribute as message
+    attributes. The publisher client does its own wire batching; this sink bounds how
+    many messages are outstanding and counts per-message failures.
+
+    With `ordering_key_field`, each message's ordering key is that field of the record
+    (e.g. source_name), so subscribers with message ordering see each key in publish
+    order; the publisher must have enable_message_ordering=True.
+    """
+
+    name = 'pubsub'
+
+    def __init__(self, publisher, topic_path, flush_size=100, flush_interval=0.05, max_buffered=None, ordering_key_field=None, codec=None):
+        super().__init__(flush_size, flush_interval, max_buffered)
+        self.publisher = publisher
+        self.topic_path = topic_path
+        self.ordering_key_field = ordering_key_field
+        self.codec = codec or MessageCodec()
+        self.message_ids = {}  # doc_id -> Pub/Sub message ID
+
+    async def _write_batch(self, items):
+        messages = []
+        for data, _, attributes in items:
+            ordering_key = (data.get(self.ordering_key_field) or '') if self.ordering_key_field else ''
+            payload, codec_attributes = self.codec.encode(data)
+            messages.append((payload, {**(attributes or {}), **codec_attributes}, ordering_key))
+        result = await publish_all(self.publisher, self.topic_path, messages)
+        for (_, doc_id, _), message_id, error in zip(items, result["message_ids"], result["errors"]):
+            if doc_id and error:
+                self.failures[doc_id] = error
+            elif doc_id:
+                self.message_ids[doc_id] = message_id
+        if result["failed"]:
+            self.last_error = next(error for error in result["errors"] if error)
+        return result["failed"]
+
+
+class JsonlFileSink(BatchSink):
+    """Appends one JSON object per line to a local file (doc_id as "_id"); no cloud services needed."""
+
+    name = 'jsonl'
+
+    def __init__(self, path, flush_size=500, flush_interval=2.0, max_buffered=None):
+        super().__init__(flush_size, flush_interval, max_buffered)
+        self.path = path
+        self._file = None
+
+    def _write_lines(self, items):
+        if self._file is None:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            self._file = open(self.path, 'a', encoding='utf-8')
+        self._file.write(''.join(json.dumps({"_id": doc_id, **data} if doc_id else data) + '\n' for data, doc_id, _ in items))
+        self._file.flush()
+
+    async def _write_batch(self, items):
+        await asyncio.get_running_loop().run_in_executor(None, self._write_lines, items)
+        return 0
+
+    async def close(self):
+        await super().close()
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+class ParquetFileSink(BatchSink):
+    """
+    Writes each batch as a Parquet part file (part-<n>.parquet) under `directory`.
+    Nested values (lists, dicts) are stored as JSON strings. Needs pyarrow, which is
+    not a service dependency; it is imported when the sink is created.
+    """
+
+    name = 'parquet'
+
+    def __init__(self, directory, flush_size=5000, flush_interval=5.0, max_buffered=None):
+        import pyarrow  # noqa: F401  (fail fast when pyarrow is missing)
+        super().__init__(flush_size, flush_interval, max_buffered)
+        self.directory = directory
+        self._parts = 0
+        os.makedirs(directory, exist_ok=True)
+
+    def _write_part(self, items, part):
+        import pyarrow
+        import pyarrow.parquet
+
+        rows = []
+        for data, doc_id, _ in items:
+            row = {key: json.dumps(value) if isinstance(value, (dict, list)) else value for key, value in data.items()}
+            if doc_id:
+                row["_id"] = doc_id
+            rows.append(row)
+        path = os.path.join(self.directory, f"part-{os.getpid()}-{part:05d}.parquet")
+        pyarrow.parquet.write_table(pyarrow.Table.from_pylist(rows), path)
+
+    async def _write_batch(self, items):
+        self._parts += 1
+        await asyncio.get_running_loop().run_in_executor(None, self._write_part, items, self._parts)
+        return 0
+
+
+class FanOutSink:
+    """
+    Sends every record to several sinks at once, so one pass over the articles feeds
+    e.g. Firestore and the processing topic. Each sink keeps its own batching and
+    back-pressure; add() returns once every sink has accepted the record.
+    """
+
+    def __init__(self, sinks):
+        self.sinks = list(sinks)
+        # Stats / failure labels: the sink's name, suffixed with its index when several share it
+        names = [sink.name for sink in self.sinks]
+        self.labels = [name if names.count(name) == 1 else f"{name}[{index}]" for index, name in enumerate(names)]
+
+    async def add(self, data, doc_id=None, attributes=None):
+        # Most adds just buffer; only sinks that must flush or wait get a coroutine, and those run concurrently
+        waiting = [sink for sink in self.sinks if not sink.try_add(data, doc_id, attributes)]
+        if len(waiting) == 1:
+            await waiting[0].add(data, doc_id=doc_id, attributes=attributes)
+        elif waiting:
+            await asyncio.gather(*(sink.add(data, doc_id=doc_id, attributes=attributes) for sink in waiting))
+
+    async def flush(self):
+        await asyncio.gather(*(sink.flush() for sink in self.sinks))
+
+    async def close(self):
+        await asyncio.gather(*(sink.close() for sink in self.sinks))
+
+    @property
+    def last_error(self):
+        return next((sink.last_error for sink in self.sinks if sink.last_error), None)
+
+    @property
+    def failures(self):
+        """doc_id -> "<sink>: <error>" for records that failed in any sink."""
+        failures = {}
+        for label, sink in zip(self.labels, self.sinks):
+            for doc_id, error in sink.failures.items():
+                failures.setdefault(doc_id, f"{label}: {error}")
+        return failures
+
+    @property
+    def message_ids(self):
+        """doc_id -> Pub/Sub message ID, from the Pub/Sub sinks."""
+        message_ids = {}
+        for sink in self.sinks:
+            message_ids.update(getattr(sink, 'message_ids', {}))
+        return message_ids
+
+    def stats(self):
+        """
+        Per-sink stats plus totals: docs_written is the smallest per-sink count (at most
+        that many records reached every sink) and docs_failed sums the per-sink failures,
+        so it is zero exactly when every sink wrote everything.
+        """
+        by_sink = {label: sink.stats() for label, sink in zip(self.labels, self.sinks)}
+        return {
+            "docs_written": min((stats["docs_written"] for stats in by_sink.values()), default=0),
+            "docs_failed": sum(stats["docs_failed"] for stats in by_sink.values()),
+            "by_sink": by_sink,
+        }